@@ -0,0 +1,97 @@
+"""Stop request work when the client disconnects or the request deadline passes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable
+from typing import TypeVar
+
+from fastapi import Request
+
+from ..infra.metrics import REQUEST_CANCELLATIONS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before its answer was ready."""
+
+
+class RequestDeadlineExceeded(TimeoutError):
+    """Raised when a request ran past `REQUEST_TIMEOUT_SECONDS`."""
+
+
+async def run_cancellable(
+    request: Request,
+    work: Awaitable[T],
+    *,
+    timeout_seconds: float,
+    poll_interval_seconds: float,
+) -> T:
+    """Await `work`, cancelling it if the client disconnects or the deadline passes.
+
+    Cancellation propagates through the orchestrator into pending LLM calls and
+    ClickHouse queries; `timeout_seconds` of 0 disables the deadline.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(_wait_for_disconnect(request, poll_interval_seconds))
+    try:
+        async with asyncio.timeout(timeout_seconds or None):
+            await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except TimeoutError:
+        task.cancel()
+        REQUEST_CANCELLATIONS.inc(reason="deadline")
+        logger.warning("request_deadline_exceeded path=%s", request.url.path)
+        raise RequestDeadlineExceeded(
+            f"Request did not complete within {timeout_seconds:g} seconds"
+        ) from None
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if task.done():
+        return task.result()
+    task.cancel()
+    REQUEST_CANCELLATIONS.inc(reason="disconnect")
+    logger.info("request_client_disconnected path=%s", request.url.path)
+    raise ClientDisconnected
+
+
+async def _wait_for_disconnect(request: Request, poll_interval_seconds: float) -> None:
+    # ASGI has no disconnect callback for a handler that is not reading the body.
+    while True:
+        if await request.is_disconnected():
+            return
+        await asyncio.sleep(poll_interval_seconds)
+
+
+async def iter_with_deadline(
+    events: AsyncIterator[T], *, timeout_seconds: float
+) -> AsyncIterator[T]:
+    """Re-yield `events`, cancelling the producer once `timeout_seconds` have passed.
+
+    Only the producer's steps are bounded, so time the consumer spends sending
+    events never cancels the consumer itself. Disconnects need no watcher here:
+    the streaming response cancels its producer when the client goes away.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds if timeout_seconds else None
+    iterator = aiter(events)
+    while True:
+        try:
+            async with asyncio.timeout_at(deadline):
+                item = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        except TimeoutError:
+            REQUEST_CANCELLATIONS.inc(reason="deadline")
+            logger.warning("request_deadline_exceeded stream=true")
+            raise RequestDeadlineExceeded(
+                f"Request did not complete within {timeout_seconds:g} seconds"
+            ) from None
+        yield item
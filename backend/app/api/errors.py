@@ -8,6 +8,7 @@ from slowapi.errors import RateLimitExceeded
 
 from ..infra.llm.factory import ProviderNotConfiguredError
 from ..infra.logging import get_request_id
+from .cancellation import RequestDeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,13 @@ def register_exception_handlers(app: FastAPI) -> None:
             content=_error_payload("LLM provider is not configured"),
         )
 
+    @app.exception_handler(RequestDeadlineExceeded)
+    async def _deadline_handler(request: Request, exc: RequestDeadlineExceeded) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content=_error_payload(str(exc)),
+        )
+
     @app.exception_handler(ValueError)
     async def _value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
         return JSONResponse(
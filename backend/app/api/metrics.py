@@ -0,0 +1,82 @@
+"""Prometheus scrape endpoint."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from ..domain.services.orchestrator import QueryOrchestrator
+from ..infra.cache.client import RedisCache
+from ..infra.clickhouse.client import ClickHouseClient
+from ..infra.metrics import GaugeFamily, registry
+from ..infra.sql.normalizer import normalize_cache_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(_component_families(request.app.state)), media_type=CONTENT_TYPE
+    )
+
+
+def _component_families(state: object) -> Iterator[GaugeFamily]:
+    """Snapshot the counters components already keep, so the hot path pays nothing."""
+    clickhouse = getattr(state, "clickhouse_client", None)
+    if isinstance(clickhouse, ClickHouseClient):
+        pool = clickhouse.pool.stats()
+        yield GaugeFamily("clickhouse_pool_size", "Configured connections.").add(pool.size)
+        yield GaugeFamily("clickhouse_pool_in_use", "Connections executing a query.").add(
+            pool.in_use
+        )
+        yield GaugeFamily(
+            "clickhouse_pool_acquisitions_total", "Connections handed out.", kind="counter"
+        ).add(pool.acquisitions)
+        yield GaugeFamily(
+            "clickhouse_pool_timeouts_total", "Waits that hit the pool timeout.", kind="counter"
+        ).add(pool.timeouts)
+        yield GaugeFamily(
+            "clickhouse_pool_wait_seconds_total", "Time spent waiting.", kind="counter"
+        ).add(pool.wait_seconds_total)
+
+    cache = getattr(state, "cache", None)
+    local = cache.local if isinstance(cache, RedisCache) else None
+    if local is not None:
+        stats = local.stats()
+        yield GaugeFamily(
+            "cache_l1_requests_total", "In-process cache lookups.", ("result",), kind="counter"
+        ).add(stats.hits, "hit").add(stats.misses, "miss")
+        yield GaugeFamily(
+            "cache_l1_evictions_total", "In-process cache evictions.", kind="counter"
+        ).add(stats.evictions)
+        yield GaugeFamily("cache_l1_entries", "In-process cache entries.").add(stats.entries)
+        yield GaugeFamily("cache_l1_bytes", "In-process cache size.").add(stats.bytes)
+
+    orchestrator = getattr(state, "orchestrator", None)
+    if isinstance(orchestrator, QueryOrchestrator):
+        llm_stats = orchestrator.llm_cache_stats()
+        if llm_stats:
+            family = GaugeFamily(
+                "llm_cache_requests_total",
+                "Completion cache lookups.",
+                ("cache", "result"),
+                kind="counter",
+            )
+            for name, stat in sorted(llm_stats.items()):
+                family.add(stat.hits, name, "hit")
+                family.add(stat.misses, name, "miss")
+                family.add(stat.bypassed, name, "bypass")
+            yield family
+
+    normalize = normalize_cache_stats()
+    yield GaugeFamily(
+        "sql_normalize_cache_requests_total",
+        "SQL normalization cache lookups.",
+        ("result",),
+        kind="counter",
+    ).add(normalize.hits, "hit").add(normalize.misses, "miss")
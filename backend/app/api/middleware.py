@@ -0,0 +1,41 @@
+"""Request-scoped ASGI middleware."""
+
+from __future__ import annotations
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..infra.logging import bind_request_id, clear_request_id
+from ..infra.tracing import tracer
+
+
+class RequestIdMiddleware:
+    """Binds a request id for logs, opens the request's root span and returns the id.
+
+    Written as plain ASGI rather than `BaseHTTPMiddleware`, which reads `receive`
+    from another task; behind it `Request.is_disconnected` never sees the client
+    go away, so disconnected requests would run to completion.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = bind_request_id()
+        try:
+            with tracer.start_trace(
+                "http.request", request_id, method=scope["method"], path=scope["path"]
+            ) as root:
+
+                async def send_with_request_id(message: Message) -> None:
+                    if message["type"] == "http.response.start":
+                        root.set(status_code=message["status"])
+                        MutableHeaders(scope=message)["X-Request-ID"] = request_id
+                    await send(message)
+
+                await self.app(scope, receive, send_with_request_id)
+        finally:
+            clear_request_id()
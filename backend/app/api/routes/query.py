@@ -1,21 +1,51 @@
 """Routes for the analytics query endpoint."""
 
 import logging
+from collections.abc import AsyncIterator, Awaitable
+from typing import TypeVar
 
 from fastapi import APIRouter, Body, Depends, Request, status
+from fastapi.responses import Response, StreamingResponse
 
-from ...domain.models import QueryRequest, QueryResponse
+from ...domain.models import (
+    BatchQueryItem,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    QueryRequest,
+    QueryResponse,
+)
 from ...domain.services.orchestrator import QueryOrchestrator
 from ...infra.config import get_settings
+from ...infra.serialization.sse import format_sse
+from ..cancellation import (
+    ClientDisconnected,
+    RequestDeadlineExceeded,
+    iter_with_deadline,
+    run_cancellable,
+)
 from ..deps import get_orchestrator_dep
 from . import limiter
 
 logger = logging.getLogger(__name__)
 
 RATE_LIMIT = f"{get_settings().rate_limit_per_minute}/minute"
+# Non-standard "client closed request" status; nobody receives it, but logs show it.
+CLIENT_CLOSED_REQUEST = 499
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+
+async def _cancellable(request: Request, work: Awaitable[T]) -> T:
+    settings = get_settings()
+    return await run_cancellable(
+        request,
+        work,
+        timeout_seconds=settings.request_timeout_seconds,
+        poll_interval_seconds=settings.request_disconnect_poll_ms / 1000,
+    )
+
 
 @router.post("", response_model=QueryResponse, status_code=status.HTTP_200_OK)
 @limiter.limit(RATE_LIMIT)
@@ -23,9 +53,20 @@ async def query_endpoint(
     request: Request,
     payload: QueryRequest = Body(...),
     orchestrator: QueryOrchestrator = Depends(get_orchestrator_dep),
-) -> QueryResponse:
+) -> QueryResponse | Response:
     try:
-        result = await orchestrator.run(question=payload.question, user_id=payload.user_id)
+        result = await _cancellable(
+            request,
+            orchestrator.run(
+                question=payload.question,
+                user_id=payload.user_id,
+                result_format=payload.format,
+            ),
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except RequestDeadlineExceeded:
+        raise
     except ValueError:
         logger.exception("Invalid SQL generated for question=%s", payload.question[:80])
         raise
@@ -37,3 +78,70 @@ async def query_endpoint(
             summary="Service is temporarily unavailable; showing placeholder data.",
         )
     return QueryResponse(**result)
+
+
+@router.post("/batch", response_model=BatchQueryResponse, status_code=status.HTTP_200_OK)
+@limiter.limit(RATE_LIMIT)
+async def query_batch_endpoint(
+    request: Request,
+    payload: BatchQueryRequest = Body(...),
+    orchestrator: QueryOrchestrator = Depends(get_orchestrator_dep),
+) -> BatchQueryResponse | Response:
+    questions = [item.question for item in payload.queries]
+    try:
+        outcomes = await _cancellable(
+            request,
+            orchestrator.run_batch(
+                questions, result_formats=[item.format for item in payload.queries]
+            ),
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    items: list[BatchQueryItem] = []
+    for question, outcome in zip(questions, outcomes, strict=True):
+        if isinstance(outcome, ValueError):
+            logger.warning("Batch item rejected question=%s error=%s", question[:80], outcome)
+            items.append(BatchQueryItem(question=question, error=str(outcome)))
+        elif isinstance(outcome, Exception):
+            logger.error("Batch item failed question=%s", question[:80], exc_info=outcome)
+            items.append(
+                BatchQueryItem(question=question, error="Service is temporarily unavailable")
+            )
+        else:
+            items.append(BatchQueryItem(question=question, result=QueryResponse(**outcome)))
+    return BatchQueryResponse(results=items)
+
+
+@router.post("/stream", status_code=status.HTTP_200_OK)
+@limiter.limit(RATE_LIMIT)
+async def query_stream_endpoint(
+    request: Request,
+    payload: QueryRequest = Body(...),
+    orchestrator: QueryOrchestrator = Depends(get_orchestrator_dep),
+) -> StreamingResponse:
+    async def _events() -> AsyncIterator[str]:
+        events = orchestrator.stream(
+            question=payload.question,
+            user_id=payload.user_id,
+            result_format=payload.format,
+        )
+        try:
+            async for event, data in iter_with_deadline(
+                events, timeout_seconds=get_settings().request_timeout_seconds
+            ):
+                yield format_sse(event, data)
+        except RequestDeadlineExceeded as exc:
+            yield format_sse("error", {"detail": str(exc)})
+        except ValueError as exc:
+            logger.exception("Invalid SQL generated for question=%s", payload.question[:80])
+            yield format_sse("error", {"detail": str(exc)})
+        except Exception:
+            logger.exception("Failed to stream query")
+            yield format_sse("error", {"detail": "Service is temporarily unavailable"})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -2,19 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from contextlib import asynccontextmanager
-from typing import Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from redis.asyncio import Redis
-from slowapi.middleware import SlowAPIMiddleware
-from starlette.responses import Response
+from slowapi.middleware import SlowAPIASGIMiddleware
 
 from .api.errors import register_exception_handlers
 from .api.health import router as health_router
+from .api.metrics import router as metrics_router
+from .api.middleware import RequestIdMiddleware
 from .api.routes import limiter
 from .api.routes import router as query_router
+from .domain.prompts import prompt_registry
+from .domain.services.cache_warmer import CacheWarmer
 from .domain.services.orchestrator import QueryOrchestrator
 from .infra.cache.client import RedisCache
 from .infra.clickhouse.bootstrap import bootstrap_clickhouse
@@ -22,7 +25,8 @@ from .infra.clickhouse.client import ClickHouseClient
 from .infra.config import Settings, get_settings
 from .infra.cors import configure_cors
 from .infra.llm.factory import get_llm_client
-from .infra.logging import bind_request_id, clear_request_id, configure_logging
+from .infra.logging import configure_logging
+from .infra.tracing import build_exporter, tracer
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,8 @@ logger = logging.getLogger(__name__)
 def create_app(settings: Settings | None = None) -> FastAPI:
     settings = settings or get_settings()
     configure_logging(settings)
+    prompt_registry.configure(reload=settings.prompt_reload_enabled)
+    tracer.configure(build_exporter(settings), min_duration_ms=settings.tracing_min_duration_ms)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
@@ -42,6 +48,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
             decode_responses=True,
         )
         cache = RedisCache(redis_client, settings)
+        invalidation_listener = cache.start_invalidation_listener()
         llm_client = get_llm_client(settings)
         orchestrator = QueryOrchestrator(
             settings=settings,
@@ -62,11 +69,23 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         except Exception:  # noqa: BLE001
             logger.exception("Failed to bootstrap ClickHouse dataset")
 
+        warmer_task = (
+            CacheWarmer(orchestrator, cache, settings).start()
+            if settings.cache_warm_enabled
+            else None
+        )
+
         logger.info("application_startup_complete")
         try:
             yield
         finally:
             logger.info("application_shutdown_begin")
+            for task in (warmer_task, invalidation_listener):
+                if task is not None:
+                    task.cancel()
+                    with suppress(asyncio.CancelledError):
+                        await task
+            await orchestrator.aclose()
             try:
                 await redis_client.close()
             except Exception:  # noqa: BLE001
@@ -75,28 +94,23 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                 await clickhouse_client.close()
             except Exception:  # noqa: BLE001
                 logger.exception("Error while closing ClickHouse client")
+            try:
+                await llm_client.aclose()
+            except Exception:  # noqa: BLE001
+                logger.exception("Error while closing LLM client")
             logger.info("application_shutdown_complete")
 
     app = FastAPI(title=settings.app_name, lifespan=lifespan)
     app.state.limiter = limiter
-    app.add_middleware(SlowAPIMiddleware)
+    # Only pure ASGI middleware, so handlers can still see the client disconnect.
+    app.add_middleware(SlowAPIASGIMiddleware)
     configure_cors(app, settings)
     register_exception_handlers(app)
-
-    @app.middleware("http")
-    async def request_id_middleware(
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        request_id = bind_request_id()
-        try:
-            response = await call_next(request)
-        finally:
-            clear_request_id()
-        response.headers["X-Request-ID"] = request_id
-        return response
+    app.add_middleware(RequestIdMiddleware)
 
     app.include_router(health_router)
+    if settings.metrics_enabled:
+        app.include_router(metrics_router)
     app.include_router(query_router, prefix=settings.api_prefix)
 
     return app
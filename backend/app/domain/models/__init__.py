@@ -1,5 +1,21 @@
 """Domain models exposed by the API layer."""
 
-from .dto import HealthResponse, QueryRequest, QueryResponse
+from .dto import (
+    BatchQueryItem,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    ColumnarData,
+    HealthResponse,
+    QueryRequest,
+    QueryResponse,
+)
 
-__all__ = ["HealthResponse", "QueryRequest", "QueryResponse"]
+__all__ = [
+    "BatchQueryItem",
+    "BatchQueryRequest",
+    "BatchQueryResponse",
+    "ColumnarData",
+    "HealthResponse",
+    "QueryRequest",
+    "QueryResponse",
+]
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -12,14 +12,49 @@ class QueryRequest(BaseModel):
 
     question: str = Field(..., min_length=3)
     user_id: str | None = Field(default=None, max_length=128)
+    format: Literal["rows", "columnar"] = "rows"
+
+
+class ColumnarData(BaseModel):
+    """Result set laid out column by column: `data[i]` holds the values of `columns[i]`."""
+
+    columns: list[str]
+    types: list[str]
+    data: list[list[Any]]
 
 
 class QueryResponse(BaseModel):
-    """Response payload containing generated SQL, result rows, and summary."""
+    """Response payload containing generated SQL, result rows, and summary.
+
+    `truncated` is true when the result hit the server-side row or byte cap. `stale`
+    is true when a cached answer past its TTL was served while it is being refreshed.
+    """
 
     sql: str
-    data: list[dict[str, Any]]
+    data: list[dict[str, Any]] | ColumnarData
     summary: str
+    truncated: bool = False
+    stale: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    """Incoming request payload for the /query/batch endpoint."""
+
+    queries: list[QueryRequest] = Field(..., min_length=1)
+
+
+class BatchQueryItem(BaseModel):
+    """Outcome for one question of a batch: either a result or an error."""
+
+    question: str
+    result: QueryResponse | None = None
+    error: str | None = None
+
+
+class BatchQueryResponse(BaseModel):
+    """Per-question outcomes, in the order the questions were submitted."""
+
+    results: list[BatchQueryItem]
 
 
 class HealthResponse(BaseModel):
@@ -31,5 +66,9 @@ class HealthResponse(BaseModel):
 
 
 QueryRequest.model_rebuild()
+ColumnarData.model_rebuild()
 QueryResponse.model_rebuild()
+BatchQueryRequest.model_rebuild()
+BatchQueryItem.model_rebuild()
+BatchQueryResponse.model_rebuild()
 HealthResponse.model_rebuild()
@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
+from string import Formatter
 
 _PROMPT_DIR = Path(__file__).resolve().parent
 
@@ -11,3 +15,80 @@ def load_prompt(name: str) -> str:
     """Load a prompt template file from disk."""
     path = _PROMPT_DIR / f"{name}.txt"
     return path.read_text(encoding="utf-8")
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPrompt:
+    """Template split into a pre-rendered static prefix and a format-string tail.
+
+    The prefix runs up to the first per-request placeholder, so every rendered
+    prompt starts with the same bytes and provider-side prefix caching applies.
+    """
+
+    prefix: str
+    tail: str
+
+    def render(self, **values: object) -> str:
+        return self.prefix + self.tail.format(**values)
+
+
+def compile_prompt(template: str, static: Mapping[str, object]) -> CompiledPrompt:
+    """Substitute `static` values once; other placeholders are left for `render`."""
+    prefix: list[str] = []
+    tail: list[str] = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if not tail:
+            prefix.append(literal)
+        else:
+            tail.append(_escape(literal))
+        if field is None:
+            continue
+        if field in static:
+            rendered = format(static[field], spec or "")
+            if tail:
+                tail.append(_escape(rendered))
+            else:
+                prefix.append(rendered)
+            continue
+        conversion_suffix = f"!{conversion}" if conversion else ""
+        spec_suffix = f":{spec}" if spec else ""
+        tail.append(f"{{{field}{conversion_suffix}{spec_suffix}}}")
+    return CompiledPrompt(prefix="".join(prefix), tail="".join(tail))
+
+
+class PromptRegistry:
+    """Loads and compiles prompt templates once per process.
+
+    With `reload` enabled the template file's mtime is checked on each lookup and
+    the prompt is recompiled when it changed, which is handy while editing prompts.
+    """
+
+    def __init__(self, directory: Path = _PROMPT_DIR, *, reload: bool = False) -> None:
+        self._directory = directory
+        self._reload = reload
+        self._lock = threading.Lock()
+        self._compiled: dict[str, tuple[float, CompiledPrompt]] = {}
+
+    def configure(self, *, reload: bool) -> None:
+        self._reload = reload
+
+    def get(self, name: str, static: Mapping[str, object] | None = None) -> CompiledPrompt:
+        """Return the compiled `name` template; `static` must be the same on every call."""
+        cached = self._compiled.get(name)
+        if cached is not None and not self._reload:
+            return cached[1]
+        path = self._directory / f"{name}.txt"
+        mtime = path.stat().st_mtime
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            compiled = compile_prompt(path.read_text(encoding="utf-8"), static or {})
+            self._compiled[name] = (mtime, compiled)
+        return compiled
+
+
+prompt_registry = PromptRegistry()
@@ -0,0 +1,183 @@
+"""Background pre-computation of frequently asked questions."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from ...infra.cache.client import RedisCache
+from ...infra.config import Settings, get_settings
+from ...infra.metrics import WARM_LAST_RUN, WARM_PENDING, WARM_QUESTIONS, WARM_RUN_SECONDS
+from .orchestrator import QueryOrchestrator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUESTIONS_PATH = Path(__file__).resolve().parents[1] / "warm_questions.txt"
+WARM_LEASE_KEY = "lease:cache-warm"
+# A cache miss costs one SQL completion and one summary completion.
+LLM_CALLS_PER_QUESTION = 2
+
+
+def load_questions_file(path: str | Path) -> list[str]:
+    """Questions from a text file, one per line; blank lines and `#` comments are skipped."""
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+@dataclass(frozen=True, slots=True)
+class WarmReport:
+    total: int
+    warmed: int
+    refreshed: int
+    skipped: int
+    failed: int
+    seconds: float
+
+
+class _CallBudget:
+    """Spaces out work so at most `per_minute` LLM calls start in any minute."""
+
+    def __init__(self, per_minute: int) -> None:
+        self._interval = 60.0 / per_minute
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, calls: int) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            wait = self._next_slot - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_slot = max(self._next_slot, loop.time()) + calls * self._interval
+
+
+class CacheWarmer:
+    """Keeps answers to a curated question list in the cache.
+
+    Each pass fills questions that are not cached and refreshes those whose
+    answer would expire before the next pass, so users never pay for the LLM and
+    ClickHouse round trips on these questions. Passes run at startup and every
+    `CACHE_WARM_INTERVAL_SECONDS`, with at most `CACHE_WARM_CONCURRENCY` questions
+    in flight and LLM calls paced to `CACHE_WARM_LLM_CALLS_PER_MINUTE`. When
+    several workers run a warmer, a Redis lease lets only one of them do a pass.
+    """
+
+    def __init__(
+        self,
+        orchestrator: QueryOrchestrator,
+        cache: RedisCache,
+        settings: Settings | None = None,
+    ) -> None:
+        self._orchestrator = orchestrator
+        self._cache = cache
+        self._settings = settings or get_settings()
+        self._budget = _CallBudget(self._settings.cache_warm_llm_calls_per_minute)
+
+    def start(self) -> asyncio.Task[None]:
+        """Run a pass now and then on the configured schedule, in the background."""
+        return asyncio.create_task(self._run_forever())
+
+    async def load_questions(self) -> list[str]:
+        """Questions from the configured file (or the bundled list) and Redis set."""
+        path = self._settings.cache_warm_questions_path or DEFAULT_QUESTIONS_PATH
+        try:
+            questions = load_questions_file(path)
+        except OSError:
+            logger.warning("cache_warm_questions_file_unreadable path=%s", path, exc_info=True)
+            questions = []
+        redis_key = self._settings.cache_warm_redis_key
+        if redis_key:
+            try:
+                members = await self._cache.redis.smembers(redis_key)  # type: ignore[misc]
+            except Exception:  # noqa: BLE001
+                logger.warning("cache_warm_questions_redis_failed key=%s", redis_key, exc_info=True)
+                members = set()
+            questions.extend(sorted(str(member).strip() for member in members))
+        # Keep order, drop duplicates and blanks.
+        return list(dict.fromkeys(question for question in questions if question))
+
+    async def warm(self, questions: Sequence[str] | None = None) -> WarmReport:
+        """Run one warming pass over `questions` (default: `load_questions()`)."""
+        started = time.perf_counter()
+        if questions is None:
+            questions = await self.load_questions()
+        semaphore = asyncio.Semaphore(self._settings.cache_warm_concurrency)
+        outcomes: list[str] = []
+        WARM_PENDING.set(len(questions))
+
+        async def _warm_one(question: str) -> None:
+            async with semaphore:
+                outcome = await self._warm_question(question)
+            outcomes.append(outcome)
+            WARM_QUESTIONS.inc(result=outcome)
+            WARM_PENDING.dec()
+
+        try:
+            await asyncio.gather(*(_warm_one(question) for question in questions))
+        finally:
+            WARM_PENDING.set(0)
+        elapsed = time.perf_counter() - started
+        WARM_RUN_SECONDS.observe(elapsed)
+        WARM_LAST_RUN.set(time.time())
+        report = WarmReport(
+            total=len(questions),
+            warmed=outcomes.count("warmed"),
+            refreshed=outcomes.count("refreshed"),
+            skipped=outcomes.count("skipped"),
+            failed=outcomes.count("failed"),
+            seconds=elapsed,
+        )
+        logger.info(
+            "cache_warm_complete total=%d warmed=%d refreshed=%d skipped=%d failed=%d "
+            "seconds=%.1f",
+            report.total,
+            report.warmed,
+            report.refreshed,
+            report.skipped,
+            report.failed,
+            report.seconds,
+        )
+        return report
+
+    async def _warm_question(self, question: str) -> str:
+        try:
+            remaining = await self._orchestrator.cached_ttl(question)
+            if remaining is not None and remaining > self._settings.cache_warm_interval_seconds:
+                return "skipped"
+            await self._budget.acquire(LLM_CALLS_PER_QUESTION)
+            if remaining is None:
+                await self._orchestrator.run(question=question, user_id=None)
+                return "warmed"
+            await self._orchestrator.refresh(question)
+            return "refreshed"
+        except Exception:  # noqa: BLE001
+            logger.warning("cache_warm_failed question=%s", question[:80], exc_info=True)
+            return "failed"
+
+    async def _run_forever(self) -> None:
+        interval = self._settings.cache_warm_interval_seconds
+        while True:
+            try:
+                await self._warm_as_leader()
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.warning("cache_warm_pass_failed", exc_info=True)
+            if not interval:
+                return
+            await asyncio.sleep(interval)
+
+    async def _warm_as_leader(self) -> None:
+        # The lease outlives the pass and is not released, so workers whose
+        # schedules are offset from ours skip until most of the interval has passed.
+        interval = self._settings.cache_warm_interval_seconds
+        lease_ttl = max(int(interval * 0.9), 1) if interval else 60
+        token = await self._cache.acquire_lease(WARM_LEASE_KEY, lease_ttl)
+        if token is None:
+            logger.info("cache_warm_skipped_not_leader")
+            return
+        await self.warm()
@@ -0,0 +1,233 @@
+"""Rule-based summaries for common result shapes, computed without an LLM call."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+import numpy.typing as npt
+
+from ...infra.clickhouse.schema import DERIVED_METRICS
+from ...infra.serialization.columnar import ColumnarResult, columnar_row_count
+
+ResultShape = Literal["empty", "scalar", "breakdown", "top_n", "time_series"]
+
+MAX_SCALAR_COLUMNS = 6
+MAX_TIME_SERIES_METRICS = 3
+
+_NUMERIC_TYPE = re.compile(r"^(U?Int\d+|Float\d+|Decimal)")
+_TEMPORAL_TYPE = re.compile(r"^(Date|DateTime)")
+_TYPE_WRAPPER = re.compile(r"^(Nullable|LowCardinality)\((?P<inner>.+)\)$")
+# Only a descending first sort key makes the limited rows the top ones.
+_TOP_N = re.compile(
+    r"\bORDER\s+BY\s+[^,]+?\s+DESC\b.*\bLIMIT\s+(?P<limit>\d+)\s*$", re.IGNORECASE | re.DOTALL
+)
+# Ratios and averages do not add up across rows, so they get no totals or shares.
+_NON_ADDITIVE = re.compile(
+    r"(^|_)(avg|average|mean|rate|ratio|share|pct|percent|cpm|cpa|"
+    + "|".join(DERIVED_METRICS)
+    + r")($|_)",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _Columns:
+    temporal: list[int]
+    numeric: list[int]
+    categorical: list[int]
+
+
+def classify_result(result: ColumnarResult, sql: str, *, max_categories: int) -> ResultShape | None:
+    """Shape of `result` if it is one `summarize_locally` handles, else `None`.
+
+    Truncated results are partial, so totals, shares and extremes computed from them
+    would be wrong; they are left to the LLM or the generic description.
+    """
+    if result.get("truncated"):
+        return None
+    rows = columnar_row_count(result)
+    if rows == 0:
+        return "empty"
+    columns = _classify_columns(result)
+    if rows == 1 and len(result["columns"]) <= MAX_SCALAR_COLUMNS:
+        return "scalar"
+    if not columns.numeric or (rows > max_categories and not columns.temporal):
+        return None
+    if len(columns.temporal) == 1 and not columns.categorical:
+        return "time_series"
+    if len(columns.categorical) == 1 and not columns.temporal:
+        match = _TOP_N.search(sql.strip())
+        if match is not None and rows == int(match.group("limit")):
+            return "top_n"
+        return "breakdown"
+    return None
+
+
+def summarize_locally(result: ColumnarResult, sql: str, *, max_categories: int) -> str | None:
+    """Describe simple results with totals, shares, extremes and trend; `None` otherwise."""
+    shape = classify_result(result, sql, max_categories=max_categories)
+    if shape is None:
+        return None
+    if shape == "empty":
+        return "The query returned no rows for this question."
+    columns = _classify_columns(result)
+    if shape == "scalar":
+        return _describe_scalar(result)
+    if shape == "time_series":
+        return _describe_time_series(result, columns)
+    return _describe_breakdown(result, columns, top_n=shape == "top_n")
+
+
+def describe_generically(result: ColumnarResult) -> str:
+    """Fallback used when the LLM is disabled and the shape is not recognised."""
+    rows = columnar_row_count(result)
+    names = ", ".join(result["columns"])
+    suffix = " (truncated)" if result.get("truncated") else ""
+    return f"The query returned {rows} rows{suffix} with columns: {names}."
+
+
+def _describe_scalar(result: ColumnarResult) -> str:
+    parts = [
+        f"{_label(name)} is {_format_value(column[0])}"
+        for name, column in zip(result["columns"], result["data"], strict=True)
+    ]
+    return _sentence("The query returned one row: " + "; ".join(parts))
+
+
+def _describe_breakdown(result: ColumnarResult, columns: _Columns, *, top_n: bool) -> str:
+    category_index = columns.categorical[0]
+    category = result["columns"][category_index]
+    labels = [str(value) for value in result["data"][category_index]]
+    metric_index = columns.numeric[0]
+    metric = result["columns"][metric_index]
+    values = _as_float(result["data"][metric_index])
+    count = len(labels)
+
+    if top_n:
+        opening = f"Top {count} {_label(category)} values by {_label(metric)}"
+    else:
+        opening = f"{count} {_label(category)} values were compared on {_label(metric)}"
+
+    if np.isnan(values).all():
+        return _sentence(f"{opening}, but no {_label(metric)} values were reported")
+
+    high = int(np.nanargmax(values))
+    low = int(np.nanargmin(values))
+    sentences = [opening]
+    if _is_additive(metric) and np.nanmin(values) >= 0:
+        total = float(np.nansum(values))
+        shares = values / total if total else np.zeros_like(values)
+        sentences.append(
+            f"The total is {_format_number(total)}; {labels[high]} leads with "
+            f"{_format_number(values[high])} ({shares[high]:.1%} of the total)"
+        )
+        top_three = np.argsort(-np.nan_to_num(values, nan=-np.inf))[:3]
+        if count > 3:
+            sentences.append(f"The top three account for {float(np.nansum(shares[top_three])):.1%}")
+    else:
+        sentences.append(
+            f"The highest is {labels[high]} at {_format_number(values[high])} and the "
+            f"average is {_format_number(float(np.nanmean(values)))}"
+        )
+    if count > 1:
+        sentences.append(f"The lowest is {labels[low]} at {_format_number(values[low])}")
+    return " ".join(_sentence(sentence) for sentence in sentences)
+
+
+def _describe_time_series(result: ColumnarResult, columns: _Columns) -> str:
+    time_index = columns.temporal[0]
+    time_name = result["columns"][time_index]
+    periods = np.asarray([str(value) for value in result["data"][time_index]])
+    order = np.argsort(periods, kind="stable")
+    periods = periods[order]
+    sentences = [f"{len(periods)} {_label(time_name)} periods from {periods[0]} to {periods[-1]}"]
+
+    for metric_index in columns.numeric[:MAX_TIME_SERIES_METRICS]:
+        metric = result["columns"][metric_index]
+        values = _as_float(result["data"][metric_index])[order]
+        valid = ~np.isnan(values)
+        if valid.sum() < 2:
+            continue
+        series = values[valid]
+        high = int(np.nanargmax(values))
+        low = int(np.nanargmin(values))
+        if _is_additive(metric):
+            lead = f"{_label(metric).capitalize()} totals {_format_number(float(series.sum()))}"
+        else:
+            lead = f"{_label(metric).capitalize()} averages {_format_number(float(series.mean()))}"
+        sentences.append(
+            f"{lead}, peaking at {_format_number(values[high])} on {periods[high]} with a low "
+            f"of {_format_number(values[low])} on {periods[low]}"
+        )
+        sentences.append(_trend(_label(metric), np.flatnonzero(valid), series))
+    return " ".join(_sentence(sentence) for sentence in sentences)
+
+
+def _trend(metric: str, positions: npt.NDArray[np.intp], series: npt.NDArray[np.float64]) -> str:
+    slope = float(np.polyfit(positions.astype(np.float64), series, 1)[0])
+    first, last = float(series[0]), float(series[-1])
+    scale = float(np.abs(series).mean()) or 1.0
+    # Slopes under 1% of the mean level per period read as flat.
+    if abs(slope) < 0.01 * scale:
+        direction = "is broadly flat"
+    else:
+        direction = "trends upward" if slope > 0 else "trends downward"
+    if first:
+        change = f"{(last - first) / abs(first):+.1%} from first to last period"
+    else:
+        change = f"from {_format_number(first)} to {_format_number(last)}"
+    return f"{metric.capitalize()} {direction} ({change})"
+
+
+def _classify_columns(result: ColumnarResult) -> _Columns:
+    columns = _Columns(temporal=[], numeric=[], categorical=[])
+    for index, (name, type_name) in enumerate(zip(result["columns"], result["types"], strict=True)):
+        base = _unwrap_type(type_name)
+        if _TEMPORAL_TYPE.match(base):
+            columns.temporal.append(index)
+        elif _NUMERIC_TYPE.match(base) and not name.lower().endswith("_id"):
+            columns.numeric.append(index)
+        else:
+            columns.categorical.append(index)
+    return columns
+
+
+def _unwrap_type(type_name: str) -> str:
+    while (match := _TYPE_WRAPPER.match(type_name)) is not None:
+        type_name = match.group("inner")
+    return type_name
+
+
+def _as_float(values: list[Any]) -> npt.NDArray[np.float64]:
+    return np.asarray([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def _is_additive(metric: str) -> bool:
+    return _NON_ADDITIVE.search(metric) is None
+
+
+def _label(name: str) -> str:
+    return name.replace("_", " ")
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        return "n/a" if value is None else str(value)
+    return _format_number(value)
+
+
+def _format_number(value: float) -> str:
+    if np.isnan(value):
+        return "n/a"
+    if float(value).is_integer():
+        return f"{int(value):,}"
+    # Keep significant digits for small ratios such as CTR.
+    return f"{value:,.2f}" if abs(value) >= 1 else f"{value:.3g}"
+
+
+def _sentence(text: str) -> str:
+    """Terminate a sentence; only fixed wording is capitalised, never data values."""
+    return text + "."
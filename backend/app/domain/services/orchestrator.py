@@ -2,26 +2,119 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from typing import Any
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, cast
 
 from ...infra.cache.client import RedisCache
-from ...infra.cache.keys import fingerprint_key, question_key
+from ...infra.cache.keys import (
+    fingerprint_key,
+    question_key,
+    result_key,
+    revalidation_lease_key,
+)
+from ...infra.cache.similarity import QuestionSimilarityIndex
+from ...infra.cache.singleflight import SingleFlight
 from ...infra.clickhouse.client import ClickHouseClient
+from ...infra.clickhouse.schema import TABLE_NAME
+from ...infra.clickhouse.streaming import estimate_size
 from ...infra.config import Settings, get_settings
-from ...infra.sql.normalizer import normalize_sql_for_clickhouse
+from ...infra.metrics import (
+    CACHE_LOOKUPS,
+    RESULT_BYTES,
+    REVALIDATIONS,
+    RESULT_ROWS,
+    ROLLUP_QUERIES,
+    SQL_REJECTIONS,
+    STAGE_SECONDS,
+    track_request,
+    track_stage,
+)
+from ...infra.serialization.columnar import (
+    ColumnarResult,
+    ResultFormat,
+    columnar_row_count,
+    columnar_to_rows,
+    present_result,
+)
+from ...infra.tracing import (
+    NOOP_SPAN,
+    AttributeValue,
+    Span,
+    Tracer,
+    span,
+    sql_hash,
+    start_span,
+)
+from ...infra.sql.normalizer import normalize_sql_statement
+from ...infra.sql.rollups import rewrite_for_rollups
+from ...infra.sql.validator import SQLPolicy
 from ...infra.llm.base import LLMClientProtocol
+from ...infra.llm.cached_client import CachedLLMClient, LLMCacheStats, build_completion_store
 from ...infra.llm.factory import get_llm_client
-from .prompt_builder import render_sql_prompt
+from .prompt_builder import DEFAULT_ROW_LIMIT, render_sql_prompt
 from .sql_builder import clean_sql_output
 from .summarizer import Summarizer
 
 logger = logging.getLogger(__name__)
 
 
+def _present(answer: dict[str, Any], result_format: ResultFormat) -> dict[str, Any]:
+    return {
+        "sql": answer["sql"],
+        "data": present_result(answer["result"], result_format),
+        "summary": answer["summary"],
+        "truncated": answer["result"].get("truncated", False),
+        "stale": _is_stale(answer),
+    }
+
+
+def _is_stale(answer: dict[str, Any]) -> bool:
+    """Whether a cached answer is past its soft TTL (only set with `CACHE_STALE_TTL_SECONDS`)."""
+    fresh_until = answer.get("fresh_until")
+    return isinstance(fresh_until, int | float) and fresh_until < time.time()
+
+
+class _Stage:
+    """Times a pipeline stage into the stage histogram and, when tracing, the active trace."""
+
+    __slots__ = ("_timer", "_span")
+
+    def __init__(self, name: str, attributes: dict[str, AttributeValue]) -> None:
+        self._timer = track_stage(name)
+        self._span = span(f"orchestrator.{name}", **attributes) if Tracer.configured else None
+
+    def __enter__(self) -> Span:
+        self._timer.__enter__()
+        return NOOP_SPAN if self._span is None else self._span.__enter__()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        try:
+            if self._span is not None:
+                self._span.__exit__(*exc_info)
+        finally:
+            self._timer.__exit__(*exc_info)
+
+
+def _stage(name: str, **attributes: AttributeValue) -> _Stage:
+    return _Stage(name, attributes)
+
+
+def _record_lookup(cache: str, payload: object | None, *, stale: bool = False) -> None:
+    result = "miss" if payload is None else "stale" if stale else "hit"
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+
 class QueryOrchestrator:
-    """Coordinates prompt generation, LLM calls, ClickHouse querying, and caching."""
+    """Coordinates prompt generation, LLM calls, ClickHouse querying, and caching.
+
+    With `CACHE_STALE_TTL_SECONDS` set, cached answers are kept for that long past
+    `CACHE_TTL_SECONDS`. Hits in that window are served immediately with `stale`
+    set, and the answer is refreshed in the background by re-running its cached
+    SQL; a Redis lease keeps workers from refreshing the same answer twice.
+    """
 
     def __init__(
         self,
@@ -32,51 +125,501 @@ class QueryOrchestrator:
         cache: RedisCache,
     ) -> None:
         self._settings = settings or get_settings()
-        self._llm = llm_client or get_llm_client(self._settings)
         self._clickhouse = clickhouse
         self._cache = cache
-        self._summarizer = Summarizer(self._llm)
+        self._sql_policy = (
+            SQLPolicy.from_schema(
+                database=clickhouse.database,
+                max_complexity=self._settings.sql_max_complexity,
+            )
+            if self._settings.sql_policy_enabled
+            else None
+        )
+        self._llm = llm = llm_client or get_llm_client(self._settings)
+        self._llm_caches: list[CachedLLMClient] = []
+        self._sql_cache: CachedLLMClient | None = None
+        summary_llm: LLMClientProtocol = llm
+        if self._settings.llm_cache_enabled:
+            # SQL and summary completions expire independently, so each gets its own wrapper.
+            # SQL completions are only stored once they pass validation, see `_generate_sql`.
+            self._sql_cache = self._cached_llm(llm, "sql", self._settings.llm_cache_sql_ttl_seconds)
+            summary_llm = self._cached_llm(
+                llm, "summary", self._settings.llm_cache_summary_ttl_seconds
+            )
+        self._summarizer = Summarizer(
+            summary_llm,
+            mode=self._settings.summary_mode,
+            max_categories=self._settings.summary_local_max_categories,
+        )
+        self._singleflight = SingleFlight(cache, self._settings)
+        self._similarity = (
+            QuestionSimilarityIndex(cache, self._settings)
+            if self._settings.similarity_enabled
+            else None
+        )
+        self._revalidations: dict[str, asyncio.Task[None]] = {}
+
+    def llm_cache_stats(self) -> dict[str, LLMCacheStats]:
+        """Hit/miss counters of the SQL and summary completion caches, when enabled."""
+        return {client.name: client.stats() for client in self._llm_caches}
+
+    async def run(
+        self,
+        *,
+        question: str,
+        user_id: str | None,
+        result_format: ResultFormat = "rows",
+    ) -> dict[str, Any]:
+        question = question.strip()
+        if not question:
+            raise ValueError("Question cannot be empty")
+
+        with (
+            track_request("run") as timer,
+            span("orchestrator.run", question_chars=len(question)) as run_span,
+        ):
+            cached = await self._try_read_cache(question)
+            stale = cached is not None and self._serve_stale(question, cached)
+            _record_lookup("answer", cached, stale=stale)
+            if cached:
+                logger.info("cache_hit question=%s stale=%s", question[:80], stale)
+                timer.outcome = "stale_hit" if stale else "cache_hit"
+                run_span.set(outcome=timer.outcome)
+                return _present(cached, result_format)
 
-    async def run(self, *, question: str, user_id: str | None) -> dict[str, Any]:
+            answer = await self._singleflight.do(
+                question_key(question),
+                lambda: self._compute(question),
+                lambda: self._try_read_cache(question),
+            )
+            timer.outcome = "computed"
+            run_span.set(outcome=timer.outcome)
+
+        logger.info("query_latency_seconds=%.3f", timer.elapsed)
+        return _present(answer, result_format)
+
+    async def refresh(self, question: str) -> dict[str, Any]:
+        """Recompute `question` against ClickHouse and overwrite its cached answer."""
         question = question.strip()
         if not question:
             raise ValueError("Question cannot be empty")
+        return await self._singleflight.do(
+            question_key(question),
+            lambda: self._compute(question, refresh=True),
+            lambda: self._try_read_cache(question),
+        )
+
+    async def cached_ttl(self, question: str) -> int | None:
+        """Seconds until the cached answer for `question` goes stale, or `None` if not cached."""
+        cached = await self._try_read_cache(question.strip())
+        if cached is None:
+            return None
+        fresh_until = cached.get("fresh_until")
+        if isinstance(fresh_until, int | float):
+            return max(int(fresh_until - time.time()), 0)
+        return await self._cache.ttl(question_key(question.strip()))
+
+    async def wait_for_revalidations(self) -> None:
+        """Wait for the background refreshes started by stale hits to finish."""
+        await asyncio.gather(*self._revalidations.values(), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancel pending background refreshes; stale answers are refreshed on a later hit."""
+        for task in list(self._revalidations.values()):
+            task.cancel()
+        await self.wait_for_revalidations()
+
+    async def run_batch(
+        self,
+        questions: Sequence[str],
+        *,
+        result_formats: Sequence[ResultFormat] | None = None,
+    ) -> list[dict[str, Any] | Exception]:
+        """Answer many questions at once, returning a payload or an error per item.
+
+        Identical questions are answered once, cached answers are looked up in
+        bulk, and the remaining work runs with at most `BATCH_CONCURRENCY`
+        computations in flight. `result_formats` selects the format per question
+        and defaults to rows.
+        """
+        if len(questions) > self._settings.batch_max_size:
+            raise ValueError(f"Batch size exceeds limit of {self._settings.batch_max_size}")
 
         start_time = time.perf_counter()
-        cached = await self._try_read_cache(question)
-        if cached:
-            logger.info("cache_hit question=%s", question[:80])
-            return cached
+        stripped = [question.strip() for question in questions]
+        unique: dict[str, str] = {}
+        for question in stripped:
+            if question:
+                unique.setdefault(question_key(question), question)
 
-        sql_prompt = render_sql_prompt(question, [f"Q: {question}"])
-        sql_raw = await self._llm.generate_text(sql_prompt)
-        sql_clean = clean_sql_output(sql_raw)
-        if not sql_clean:
-            logger.error("empty_sql_cleaned question=%s", question)
-            raise ValueError("No valid SQL generated by LLM")
+        keys = list(unique)
+        cached = await self._try_read_cache_many([unique[key] for key in keys])
+        for key, payload in zip(keys, cached, strict=True):
+            stale = payload is not None and self._serve_stale(unique[key], payload)
+            _record_lookup("answer", payload, stale=stale)
+        outcomes: dict[str, dict[str, Any] | Exception] = {
+            key: payload for key, payload in zip(keys, cached, strict=True) if payload
+        }
 
-        sql = normalize_sql_for_clickhouse(sql_clean)
-        rows = await self._clickhouse.query(sql)
+        semaphore = asyncio.Semaphore(self._settings.batch_concurrency)
 
-        summary = await self._summarizer.summarise(question, sql, rows)
+        async def _answer(key: str) -> dict[str, Any]:
+            question = unique[key]
+            async with semaphore:
+                with span("orchestrator.batch_item", question_chars=len(question)):
+                    return await self._singleflight.do(
+                        key,
+                        lambda: self._compute(question),
+                        lambda: self._try_read_cache(question),
+                    )
 
-        payload = {"sql": sql, "data": rows, "summary": summary}
-        await self._store_cache(question, sql, payload)
+        misses = [key for key in keys if key not in outcomes]
+        with span("orchestrator.batch", size=len(questions), unique=len(keys), misses=len(misses)):
+            answers = await asyncio.gather(
+                *(_answer(key) for key in misses), return_exceptions=True
+            )
+        for key, answer in zip(misses, answers, strict=True):
+            if isinstance(answer, BaseException) and not isinstance(answer, Exception):
+                raise answer
+            outcomes[key] = answer
 
-        elapsed = time.perf_counter() - start_time
-        logger.info("query_latency_seconds=%.3f", elapsed)
-        return payload
+        logger.info(
+            "batch_latency_seconds=%.3f size=%d unique=%d cache_hits=%d",
+            time.perf_counter() - start_time,
+            len(questions),
+            len(keys),
+            len(keys) - len(misses),
+        )
+        formats = result_formats or ["rows"] * len(stripped)
+        results: list[dict[str, Any] | Exception] = []
+        for question, result_format in zip(stripped, formats, strict=True):
+            if not question:
+                results.append(ValueError("Question cannot be empty"))
+                continue
+            outcome = outcomes[question_key(question)]
+            results.append(
+                outcome if isinstance(outcome, Exception) else _present(outcome, result_format)
+            )
+        return results
 
-    async def _try_read_cache(self, question: str) -> dict[str, Any] | None:
-        question_mapping = await self._cache.read(question_key(question))
-        if not question_mapping:
+    async def stream(
+        self,
+        *,
+        question: str,
+        user_id: str | None,
+        result_format: ResultFormat = "rows",
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Yield `(event, data)` pairs as each stage of the pipeline completes.
+
+        Emits `sql`, then `data`, then one or more `summary` deltas and a final
+        `done` carrying the full summary. Cache hits replay the stored payload.
+        Streaming callers bypass single-flight coalescing since each needs its own
+        token stream, but they read and populate the same cache entries.
+        """
+        question = question.strip()
+        if not question:
+            raise ValueError("Question cannot be empty")
+
+        # A span must not stay current across `yield`, so the stream's own span is
+        # recorded without activating it; stage spans attach to the caller's span.
+        stream_span = start_span("orchestrator.stream", question_chars=len(question))
+        try:
+            with track_request("stream") as timer:
+                cached = await self._try_read_cache(question)
+                stale = cached is not None and self._serve_stale(question, cached)
+                _record_lookup("answer", cached, stale=stale)
+                if cached:
+                    logger.info("cache_hit question=%s stale=%s", question[:80], stale)
+                    yield "sql", {"sql": cached["sql"]}
+                    yield "data", {
+                        "data": present_result(cached["result"], result_format),
+                        "truncated": cached["result"].get("truncated", False),
+                    }
+                    yield "summary", {"delta": cached["summary"]}
+                    yield "done", {"summary": cached["summary"], "cached": True, "stale": stale}
+                    timer.outcome = "stale_hit" if stale else "cache_hit"
+                    stream_span.set(outcome=timer.outcome)
+                    return
+
+                sql = await self._resolve_sql(question)
+                yield "sql", {"sql": sql}
+
+                result = await self._fetch_result(sql)
+                yield "data", {
+                    "data": present_result(result, result_format),
+                    "truncated": result.get("truncated", False),
+                }
+
+                summary_seconds = 0.0
+                local_summary = self._local_summary(sql, result)
+                if local_summary is not None:
+                    summary = local_summary
+                    yield "summary", {"delta": summary}
+                else:
+                    parts: list[str] = []
+                    sample = columnar_to_rows(result, limit=DEFAULT_ROW_LIMIT)
+                    # Only time spent waiting on the LLM counts, not time the client takes
+                    # to consume each delta.
+                    stream = aiter(self._summarizer.stream_summary(question, sql, sample))
+                    while True:
+                        started = time.perf_counter()
+                        delta = await anext(stream, None)
+                        summary_seconds += time.perf_counter() - started
+                        if delta is None:
+                            break
+                        parts.append(delta)
+                        yield "summary", {"delta": delta}
+                    STAGE_SECONDS.labels("summary_llm").observe(summary_seconds)
+                    summary = "".join(parts).strip()
+
+                await self._store_cache(question, sql, summary)
+                yield "done", {"summary": summary, "cached": False, "stale": False}
+                timer.outcome = "computed"
+                stream_span.set(outcome=timer.outcome, summary_llm_ms=summary_seconds * 1000)
+
+            logger.info(
+                "query_stream_latency_seconds=%.3f summary_llm_seconds=%.3f",
+                timer.elapsed,
+                summary_seconds,
+            )
+        except BaseException as exc:
+            stream_span.record_error(exc)
+            raise
+        finally:
+            stream_span.end()
+
+    async def _compute(self, question: str, *, refresh: bool = False) -> dict[str, Any]:
+        """Produce a format-neutral answer: SQL, columnar result and summary.
+
+        With `refresh` the shared result cache is not consulted, so the data is
+        re-read from ClickHouse.
+        """
+        sql = await self._resolve_sql(question)
+        result = await self._fetch_result(sql, refresh=refresh)
+        summary = await self._summarise(question, sql, result)
+        await self._store_cache(question, sql, summary)
+        return {"sql": sql, "result": result, "summary": summary}
+
+    async def _summarise(self, question: str, sql: str, result: ColumnarResult) -> str:
+        summary = self._local_summary(sql, result)
+        if summary is None:
+            sample = columnar_to_rows(result, limit=DEFAULT_ROW_LIMIT)
+            with _stage("summary_llm", sample_rows=len(sample)):
+                summary = await self._summarizer.summarise(question, sql, sample)
+        return summary
+
+    def _serve_stale(self, question: str, cached: dict[str, Any]) -> bool:
+        """Start a background refresh if `cached` is stale; returns whether it was."""
+        if not _is_stale(cached):
+            return False
+        key = question_key(question)
+        if key not in self._revalidations:
+            task = asyncio.create_task(self._revalidate(question, cached["sql"]))
+            self._revalidations[key] = task
+            task.add_done_callback(lambda _: self._revalidations.pop(key, None))
+        return True
+
+    async def _revalidate(self, question: str, sql: str) -> None:
+        """Re-run the cached SQL and rewrite the answer, unless another worker already is."""
+        # The lease is left to expire rather than released: once the refreshed
+        # answer is written nobody needs it, and after a failure it spaces out retries.
+        lease = revalidation_lease_key(question_key(question))
+        try:
+            token = await self._cache.acquire_lease(
+                lease, self._settings.singleflight_lease_ttl_seconds
+            )
+            if token is None:
+                REVALIDATIONS.inc(result="skipped")
+                return
+            with _stage("revalidate", sql_hash=sql_hash(sql)):
+                result = await self._fetch_result(sql, refresh=True)
+                summary = await self._summarise(question, sql, result)
+                await self._store_cache(question, sql, summary)
+        except Exception:  # noqa: BLE001
+            logger.warning("revalidate_failed question=%s", question[:80], exc_info=True)
+            REVALIDATIONS.inc(result="failed")
+            return
+        logger.info("revalidate_complete question=%s", question[:80])
+        REVALIDATIONS.inc(result="refreshed")
+
+    def _local_summary(self, sql: str, result: ColumnarResult) -> str | None:
+        if self._settings.summary_mode == "llm":
             return None
-        fp_key = question_mapping.get("fingerprint")
-        if not isinstance(fp_key, str):
+        with _stage("summary_local") as local_span:
+            summary = self._summarizer.local_summary(sql, result)
+            local_span.set(used=summary is not None)
+        return summary
+
+    async def _fetch_result(self, sql: str, *, refresh: bool = False) -> ColumnarResult:
+        cached = None
+        if not refresh:
+            with _stage("cache_read"):
+                cached = await self._cache.read(result_key(sql))
+                if cached is not None and await self._result_is_stale(sql):
+                    cached = None
+            _record_lookup("result", cached)
+        if cached is not None:
+            logger.info("result_cache_hit sql=%s", sql[:80])
+            return cast(ColumnarResult, cached)
+        with _stage("clickhouse_query") as query_span:
+            result = await self._clickhouse.query_columnar(self._route_to_rollup(sql, query_span))
+        RESULT_ROWS.observe(columnar_row_count(result))
+        RESULT_BYTES.observe(estimate_size(result["data"]))
+        with _stage("cache_write"):
+            await self._cache.write(
+                result_key(sql), cast(dict[str, Any], result), self._entry_ttl_seconds()
+            )
+        return result
+
+    def _route_to_rollup(self, sql: str, query_span: Span) -> str:
+        """SQL to execute for `sql`: a rollup rewrite when one applies.
+
+        Cache keys and responses keep the generated SQL; which table answers it
+        is an execution detail.
+        """
+        if not self._settings.clickhouse_rollups_enabled:
+            return sql
+        rewrite = rewrite_for_rollups(sql)
+        table = rewrite.rollup if rewrite is not None else TABLE_NAME
+        ROLLUP_QUERIES.inc(table=table)
+        query_span.set(table=table)
+        if rewrite is None:
+            return sql
+        logger.info("rollup_rewrite table=%s sql=%s", table, rewrite.sql[:80])
+        return rewrite.sql
+
+    async def _result_is_stale(self, sql: str) -> bool:
+        """Whether a shared result is only being kept for stale serving.
+
+        Fresh answers must not be built on it, so the query is re-run instead.
+        """
+        stale_seconds = self._settings.cache_stale_ttl_seconds
+        if not stale_seconds:
+            return False
+        remaining = await self._cache.ttl(result_key(sql))
+        return remaining is not None and remaining <= stale_seconds
+
+    def _entry_ttl_seconds(self) -> int:
+        """Hard expiry of answer entries: the soft TTL plus the stale-serving window."""
+        return self._settings.cache_ttl_seconds + self._settings.cache_stale_ttl_seconds
+
+    async def _resolve_sql(self, question: str) -> str:
+        sql = await self._find_similar_sql(question)
+        if sql is None:
+            sql = await self._generate_sql(question)
+            if self._similarity is not None:
+                await self._similarity.add(question, sql)
+        return sql
+
+    async def _generate_sql(self, question: str) -> str:
+        sql_prompt = render_sql_prompt(question, [f"Q: {question}"])
+        with _stage("sql_llm", prompt_chars=len(sql_prompt)):
+            cached = (
+                await self._sql_cache.cached_text(sql_prompt)
+                if self._sql_cache is not None
+                else None
+            )
+            sql_raw = cached if cached is not None else await self._llm.generate_text(sql_prompt)
+        with _stage("sql_normalize") as normalize_span:
+            sql_clean = clean_sql_output(sql_raw)
+            if not sql_clean:
+                logger.error("empty_sql_cleaned question=%s", question)
+                SQL_REJECTIONS.inc(reason="empty")
+                raise ValueError("No valid SQL generated by LLM")
+            try:
+                normalized = normalize_sql_statement(sql_clean, self._sql_policy)
+            except ValueError:
+                SQL_REJECTIONS.inc(reason="invalid")
+                raise
+            normalize_span.set(sql_hash=sql_hash(normalized.sql))
+        if self._sql_cache is not None and cached is None:
+            # Cached only once valid, so a rejected completion is regenerated next time.
+            await self._sql_cache.store_text(sql_prompt, sql_raw)
+        if normalized.analysis is not None:
+            normalize_span.set(complexity=normalized.analysis.complexity)
+            logger.info(
+                "sql_analysis complexity=%s joins=%s subquery_depth=%s has_limit=%s",
+                normalized.analysis.complexity,
+                normalized.analysis.joins,
+                normalized.analysis.subquery_depth,
+                normalized.analysis.has_limit,
+            )
+        return normalized.sql
+
+    async def _find_similar_sql(self, question: str) -> str | None:
+        if self._similarity is None:
             return None
-        return await self._cache.read(fp_key)
+        match = await self._similarity.lookup(question)
+        if match is None:
+            return None
+        logger.info(
+            "similar_question_hit score=%.2f question=%s matched=%s",
+            match.score,
+            question[:80],
+            match.question[:80],
+        )
+        return match.sql
+
+    async def _try_read_cache(self, question: str) -> dict[str, Any] | None:
+        return (await self._try_read_cache_many([question]))[0]
+
+    async def _try_read_cache_many(self, questions: Sequence[str]) -> list[dict[str, Any] | None]:
+        """Resolve cached answers with one MGET per level of indirection."""
+        with _stage("cache_read"):
+            return await self._read_cache_many(questions)
 
-    async def _store_cache(self, question: str, sql: str, payload: dict[str, Any]) -> None:
+    async def _read_cache_many(self, questions: Sequence[str]) -> list[dict[str, Any] | None]:
+        results: list[dict[str, Any] | None] = [None] * len(questions)
+        mappings = await self._cache.read_many([question_key(q) for q in questions])
+        fp_refs = {
+            index: mapping["fingerprint"]
+            for index, mapping in enumerate(mappings)
+            if mapping and isinstance(mapping.get("fingerprint"), str)
+        }
+        if not fp_refs:
+            return results
+
+        entries = dict(
+            zip(fp_refs, await self._cache.read_many(list(fp_refs.values())), strict=True)
+        )
+        result_refs = {
+            index: entry["result"]
+            for index, entry in entries.items()
+            if entry and isinstance(entry.get("result"), str)
+        }
+        if not result_refs:
+            return results
+
+        # Results live under the shared result key; only the summary is per question.
+        shared = await self._cache.read_many(list(result_refs.values()))
+        for index, result in zip(result_refs, shared, strict=True):
+            entry = entries[index]
+            if result and entry and "columns" in result:
+                answer = {"sql": entry["sql"], "result": result, "summary": entry["summary"]}
+                if "fresh_until" in entry:
+                    answer["fresh_until"] = entry["fresh_until"]
+                results[index] = answer
+        return results
+
+    async def _store_cache(self, question: str, sql: str, summary: str) -> None:
         fp_key = fingerprint_key(question, sql)
-        await self._cache.write(fp_key, payload)
-        await self._cache.write(question_key(question), {"fingerprint": fp_key})
+        entry: dict[str, Any] = {"sql": sql, "result": result_key(sql), "summary": summary}
+        if self._settings.cache_stale_ttl_seconds:
+            entry["fresh_until"] = time.time() + self._settings.cache_ttl_seconds
+        ttl_seconds = self._entry_ttl_seconds()
+        with _stage("cache_write"):
+            await self._cache.write(fp_key, entry, ttl_seconds)
+            await self._cache.write(question_key(question), {"fingerprint": fp_key}, ttl_seconds)
+
+    def _cached_llm(self, llm: LLMClientProtocol, name: str, ttl_seconds: int) -> CachedLLMClient:
+        client = CachedLLMClient(
+            llm,
+            build_completion_store(self._settings, self._cache, ttl_seconds=ttl_seconds),
+            name=name,
+            model=self._settings.llm_model,
+            default_temperature=self._settings.llm_temperature,
+            max_temperature=self._settings.llm_cache_max_temperature,
+            ttl_seconds=ttl_seconds,
+        )
+        self._llm_caches.append(client)
+        return client
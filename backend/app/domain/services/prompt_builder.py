@@ -6,7 +6,7 @@ from collections.abc import Iterable
 
 from ...infra.clickhouse.schema import COLUMNS, DERIVED_METRICS, TABLE_NAME, ColumnDefinition
 from ...infra.serialization.json_utils import to_json
-from ..prompts import load_prompt
+from ..prompts import prompt_registry
 
 DEFAULT_ROW_LIMIT = 100
 
@@ -22,22 +22,28 @@ def _format_history(history: list[str]) -> str:
     return "\n".join(numbered)
 
 
-def render_sql_prompt(question: str, history: list[str]) -> str:
-    template = load_prompt("sql_prompt")
-    return template.format(
-        table_name=TABLE_NAME,
-        table_description=_format_table(COLUMNS),
-        derived_description="\n".join(
+def _sql_static_context() -> dict[str, object]:
+    return {
+        "table_name": TABLE_NAME,
+        "table_description": _format_table(COLUMNS),
+        "derived_description": "\n".join(
             f"- {name} = {expression}" for name, expression in DERIVED_METRICS.items()
         ),
-        conversation_history=_format_history(history),
-        default_row_limit=DEFAULT_ROW_LIMIT,
-        question=question,
-    )
+        "default_row_limit": DEFAULT_ROW_LIMIT,
+    }
+
+
+# The schema never changes at runtime, so it is rendered into the template once.
+_SQL_STATIC_CONTEXT = _sql_static_context()
+
+
+def render_sql_prompt(question: str, history: list[str]) -> str:
+    template = prompt_registry.get("sql_prompt", _SQL_STATIC_CONTEXT)
+    return template.render(conversation_history=_format_history(history), question=question)
 
 
 def render_summary_prompt(question: str, sql: str, rows: list[dict[str, object]]) -> str:
-    template = load_prompt("summary_prompt")
+    template = prompt_registry.get("summary_prompt")
     truncated_rows = rows[: DEFAULT_ROW_LIMIT]
     dataset = to_json(truncated_rows, ensure_ascii=False)
-    return template.format(question=question, sql=sql, dataset=dataset)
+    return template.render(question=question, sql=sql, dataset=dataset)
@@ -16,6 +16,64 @@ def strip_think_blocks(text: str) -> str:
     return THINK_PATTERN.sub("", text).strip()
 
 
+class ThinkBlockFilter:
+    """Incrementally drop <think>...</think> scaffolding from streamed LLM output.
+
+    Tags may be split across chunks, so a possible partial tag at the end of the
+    buffer is held back until the next chunk arrives.
+    """
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        emitted: list[str] = []
+        while True:
+            if self._inside:
+                end = self._buffer.lower().find(self._CLOSE)
+                if end == -1:
+                    self._buffer = self._buffer[-(len(self._CLOSE) - 1) :]
+                    break
+                self._buffer = self._buffer[end + len(self._CLOSE) :]
+                self._inside = False
+                continue
+            start = self._buffer.lower().find(self._OPEN)
+            if start == -1:
+                held = _partial_tag_length(self._buffer, self._OPEN)
+                emitted.append(self._buffer[: len(self._buffer) - held])
+                self._buffer = self._buffer[len(self._buffer) - held :]
+                break
+            emitted.append(self._buffer[:start])
+            self._buffer = self._buffer[start + len(self._OPEN) :]
+            self._inside = True
+        return self._emit("".join(emitted))
+
+    def flush(self) -> str:
+        remainder = "" if self._inside else self._buffer
+        self._buffer = ""
+        return self._emit(remainder)
+
+    def _emit(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+
+def _partial_tag_length(text: str, tag: str) -> int:
+    lowered = text.lower()
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if tag.startswith(lowered[-length:]):
+            return length
+    return 0
+
+
 def strip_code_fences(text: str) -> str:
     """Remove markdown code fence wrappers, returning the enclosed snippet."""
     match = SQL_FENCE_PATTERN.match(text)
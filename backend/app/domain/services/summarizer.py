@@ -2,18 +2,61 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from typing import Literal
+
 from ...infra.llm.base import LLMClientProtocol
+from ...infra.serialization.columnar import ColumnarResult
+from .local_summarizer import describe_generically, summarize_locally
 from .prompt_builder import render_summary_prompt
-from .sql_builder import strip_think_blocks
+from .sql_builder import ThinkBlockFilter, strip_think_blocks
+
+SummaryMode = Literal["llm", "auto", "local"]
 
 
 class Summarizer:
-    """Generate natural language summaries for query results."""
+    """Generate natural language summaries for query results.
+
+    `mode` decides when the LLM is skipped: `llm` always calls it, `auto`
+    summarises recognised result shapes locally and calls the LLM for the rest,
+    and `local` never calls it, falling back to a generic description.
+    """
 
-    def __init__(self, llm_client: LLMClientProtocol) -> None:
+    def __init__(
+        self,
+        llm_client: LLMClientProtocol,
+        *,
+        mode: SummaryMode = "llm",
+        max_categories: int = 50,
+    ) -> None:
         self._llm = llm_client
+        self._mode = mode
+        self._max_categories = max_categories
+
+    def local_summary(self, sql: str, result: ColumnarResult) -> str | None:
+        """Summary computed without the LLM, or `None` when the LLM should write it."""
+        if self._mode == "llm":
+            return None
+        summary = summarize_locally(result, sql, max_categories=self._max_categories)
+        if summary is None and self._mode == "local":
+            summary = describe_generically(result)
+        return summary
 
     async def summarise(self, question: str, sql: str, rows: list[dict[str, object]]) -> str:
         prompt = render_summary_prompt(question, sql, rows)
         raw = await self._llm.generate_text(prompt)
         return strip_think_blocks(raw)
+
+    async def stream_summary(
+        self, question: str, sql: str, rows: list[dict[str, object]]
+    ) -> AsyncIterator[str]:
+        """Yield summary text as the LLM produces it, without think blocks."""
+        prompt = render_summary_prompt(question, sql, rows)
+        think_filter = ThinkBlockFilter()
+        async for chunk in self._llm.stream_text(prompt):
+            text = think_filter.feed(chunk)
+            if text:
+                yield text
+        tail = think_filter.flush()
+        if tail:
+            yield tail
@@ -2,33 +2,178 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import uuid
+from collections.abc import Awaitable, Sequence
 from typing import Any, cast
 
 from redis.asyncio import Redis
 
 from ..config import Settings, get_settings
 from ..serialization.json_utils import to_json
+from ..tracing import span
+from .local import LocalCache
+
+logger = logging.getLogger(__name__)
+
+# Delete the lease only while it still holds our token so an expired lease that
+# another worker has since re-acquired is left untouched.
+_RELEASE_LEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
 
 
 class RedisCache:
-    """Typed helper for JSON cache access with a default TTL."""
+    """Typed helper for JSON cache access with a default TTL.
+
+    When `CACHE_L1_ENABLED` is set, decoded payloads are also kept in an in-process
+    `LocalCache`. Writes publish the key on the invalidation channel so other
+    workers drop their L1 copy; `start_invalidation_listener` consumes them.
+    """
 
-    def __init__(self, redis: Redis, settings: Settings | None = None) -> None:
+    def __init__(
+        self,
+        redis: Redis,
+        settings: Settings | None = None,
+        *,
+        local: LocalCache | None = None,
+    ) -> None:
         self._redis = redis
         self._settings = settings or get_settings()
+        if local is None and self._settings.cache_l1_enabled:
+            local = LocalCache.from_settings(self._settings)
+        self._local = local
+        self._origin = uuid.uuid4().hex
 
     @property
     def redis(self) -> Redis:
         return self._redis
 
+    @property
+    def local(self) -> LocalCache | None:
+        return self._local
+
     async def read(self, key: str) -> dict[str, Any] | None:
-        raw = await self._redis.get(key)
-        if not raw:
-            return None
-        return cast(dict[str, Any], json.loads(raw))
+        with span("cache.read", key_type=_key_type(key)) as read_span:
+            if self._local is not None:
+                cached = self._local.get(key)
+                if cached is not None:
+                    read_span.set(tier="l1")
+                    return cast(dict[str, Any], cached)
+            raw = await self._redis.get(key)
+            if not raw:
+                read_span.set(tier="miss")
+                return None
+            read_span.set(tier="redis", bytes=len(raw))
+            value = cast(dict[str, Any], json.loads(raw))
+            if self._local is not None:
+                self._local.set(key, value, size=len(raw))
+            return value
+
+    async def read_many(self, keys: Sequence[str]) -> list[dict[str, Any] | None]:
+        """Read several keys with a single MGET, serving L1 hits locally."""
+        results: list[dict[str, Any] | None] = [None] * len(keys)
+        pending: list[int] = []
+        for index, key in enumerate(keys):
+            cached = self._local.get(key) if self._local is not None else None
+            if cached is not None:
+                results[index] = cast(dict[str, Any], cached)
+            else:
+                pending.append(index)
+        if not pending:
+            return results
+
+        with span(
+            "cache.read_many",
+            key_type=_key_type(keys[0]),
+            keys=len(keys),
+            l1_hits=len(keys) - len(pending),
+        ) as read_span:
+            raw_values = await self._redis.mget([keys[index] for index in pending])
+            redis_hits = 0
+            for index, raw in zip(pending, raw_values, strict=True):
+                if not raw:
+                    continue
+                redis_hits += 1
+                value = cast(dict[str, Any], json.loads(raw))
+                if self._local is not None:
+                    self._local.set(keys[index], value, size=len(raw))
+                results[index] = value
+            read_span.set(redis_hits=redis_hits)
+        return results
 
     async def write(self, key: str, value: dict[str, Any], ttl_seconds: int | None = None) -> None:
         payload = to_json(value)
         expiry = ttl_seconds or self._settings.cache_ttl_seconds
-        await self._redis.set(key, payload, ex=expiry)
+        with span("cache.write", key_type=_key_type(key), bytes=len(payload)):
+            await self._redis.set(key, payload, ex=expiry)
+        if self._local is not None:
+            # Keep the decoded form so L1 hits look exactly like Redis hits.
+            self._local.set(key, json.loads(payload), size=len(payload), ttl_seconds=expiry)
+            await self._publish_invalidation(key)
+
+    def start_invalidation_listener(self) -> asyncio.Task[None] | None:
+        """Spawn the pub/sub consumer that evicts keys written by other workers."""
+        if self._local is None:
+            return None
+        return asyncio.create_task(self._listen_for_invalidations())
+
+    async def _publish_invalidation(self, key: str) -> None:
+        channel = self._settings.cache_invalidation_channel
+        try:
+            await self._redis.publish(channel, f"{self._origin} {key}")
+        except Exception:  # noqa: BLE001
+            logger.warning("cache_invalidation_publish_failed key=%s", key, exc_info=True)
+
+    async def _listen_for_invalidations(self) -> None:
+        channel = self._settings.cache_invalidation_channel
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(channel)
+                    logger.info("cache_invalidation_listener_subscribed channel=%s", channel)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                # Missed messages may leave stale entries, so start from a clean slate.
+                logger.warning("cache_invalidation_listener_failed", exc_info=True)
+                if self._local is not None:
+                    self._local.clear()
+                await asyncio.sleep(1)
+
+    def _apply_invalidation(self, data: str | bytes) -> None:
+        text = data.decode("utf-8") if isinstance(data, bytes) else data
+        origin, _, key = text.partition(" ")
+        if origin != self._origin and key and self._local is not None:
+            self._local.discard(key)
+
+    async def acquire_lease(self, key: str, ttl_seconds: int) -> str | None:
+        """Take an exclusive, expiring lease on `key`, returning its token if acquired."""
+        token = uuid.uuid4().hex
+        acquired = await self._redis.set(key, token, px=ttl_seconds * 1000, nx=True)
+        return token if acquired else None
+
+    async def release_lease(self, key: str, token: str) -> None:
+        """Release a lease previously returned by `acquire_lease`."""
+        await cast(Awaitable[Any], self._redis.eval(_RELEASE_LEASE_SCRIPT, 1, key, token))
+
+    async def ttl(self, key: str) -> int | None:
+        """Seconds until `key` expires in Redis; `None` if it is missing or never expires."""
+        remaining = int(await self._redis.ttl(key))
+        return remaining if remaining >= 0 else None
+
+    async def lease_active(self, key: str) -> bool:
+        return bool(await self._redis.exists(key))
+
+
+def _key_type(key: str) -> str:
+    """Key namespace without the digest, e.g. `cache:result`, for span attributes."""
+    return key.rpartition(":")[0] or key
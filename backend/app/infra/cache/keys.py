@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from hashlib import sha256
 
+from ..sql.fingerprint import sql_fingerprint
+
 
 def normalize_sql(sql: str) -> str:
     """Collapse whitespace to produce a canonical SQL representation."""
@@ -23,3 +25,30 @@ def question_key(question: str) -> str:
 
 def fingerprint_key(question: str, sql: str) -> str:
     return f"cache:fingerprint:{fingerprint(question, sql)}"
+
+
+def result_key(sql: str) -> str:
+    """Key for result rows shared by every question that produces the same query."""
+    return f"cache:result:{sql_fingerprint(sql)}"
+
+
+def lease_key(key: str) -> str:
+    return f"lease:{key}"
+
+
+def revalidation_lease_key(key: str) -> str:
+    """Lease held by the worker refreshing a stale entry in the background."""
+    return f"lease:revalidate:{key}"
+
+
+# Versioned: entries written under an older canonical form must not be matched.
+def similarity_entry_key(digest: str) -> str:
+    return f"cache:similar:v2:entry:{digest}"
+
+
+def similarity_band_key(band: int, digest: str) -> str:
+    return f"cache:similar:v2:band:{band}:{digest}"
+
+
+def llm_completion_key(digest: str) -> str:
+    return f"cache:llm:{digest}"
@@ -0,0 +1,108 @@
+"""In-process LRU cache used as an L1 tier in front of Redis."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from ..config import Settings
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class LocalCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+class LocalCache:
+    """LRU cache bounded by entry count and byte budget with per-entry TTLs.
+
+    Values are stored by reference, so callers must treat returned objects as
+    read-only. Sizes are supplied by the caller (typically the length of the JSON
+    payload) rather than measured, which keeps bookkeeping O(1).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> LocalCache:
+        return cls(
+            max_entries=settings.cache_l1_max_entries,
+            max_bytes=settings.cache_l1_max_bytes,
+            ttl_seconds=settings.cache_l1_ttl_seconds,
+        )
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, *, size: int, ttl_seconds: float | None = None) -> None:
+        self.discard(key)
+        if size > self._max_bytes:
+            return
+        ttl = self._ttl_seconds if ttl_seconds is None else min(ttl_seconds, self._ttl_seconds)
+        self._entries[key] = _Entry(value=value, size=size, expires_at=self._clock() + ttl)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def discard(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> LocalCacheStats:
+        return LocalCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            bytes=self._bytes,
+        )
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
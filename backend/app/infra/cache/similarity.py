@@ -0,0 +1,240 @@
+"""Approximate question matching so paraphrased questions can reuse cached SQL.
+
+Questions are canonicalised into token sequences (Unicode folding, punctuation
+and filler-word removal, number words and relative date phrases rewritten to a
+fixed form, negated words marked) and indexed in Redis with MinHash signatures
+over their word, bigram and trigram shingles, split into LSH bands. The word
+runs keep order, so "revenue per click" and "clicks per revenue" stay apart.
+Candidates sharing a band are re-scored with exact Jaccard similarity before a
+match is accepted.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import unicodedata
+from collections.abc import Awaitable, Iterable, Sequence
+from dataclasses import dataclass
+from hashlib import blake2b, sha256
+from random import Random
+from typing import Any, cast
+
+from ..config import Settings, get_settings
+from .client import RedisCache
+from .keys import similarity_band_key, similarity_entry_key
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+_MAX_CANDIDATES = 32
+
+# Filler only. Words that change the answer stay: country codes ("us"), operators such as
+# "in", "by", "per", "than" and "over", and negation.
+STOP_WORDS: frozenset[str] = frozenset(
+    {
+        "a", "about", "all", "an", "and", "are", "as", "at", "be", "broken", "can", "could",
+        "did", "do", "does", "down", "during", "each", "for", "from", "get", "give", "how",
+        "i", "into", "is", "it", "its", "list", "me", "much", "my", "of", "on", "our",
+        "please", "show", "tell", "that", "the", "their", "them", "there", "these", "this",
+        "to", "was", "we", "were", "what", "when", "which", "with", "within", "would", "you",
+        "your",
+    }
+)  # fmt: skip
+
+_SYNONYMS: dict[str, str] = {"per": "by"}
+
+# A negation covers the words after it up to the end of its clause.
+_NEGATIONS = frozenset({"not", "no", "excluding", "except", "without"})
+_CLAUSE_BREAKS = frozenset({"and", "but", "or"})
+
+_NUMBER_WORDS: dict[str, str] = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+    "seven": "7", "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+    "fifteen": "15", "twenty": "20", "thirty": "30", "fifty": "50", "hundred": "100",
+}  # fmt: skip
+
+_UNIT_DAYS = {"day": 1, "week": 7, "fortnight": 14}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_RELATIVE_PERIOD_PATTERN = re.compile(
+    r"\b(?:last|past|previous|prior|recent)\s+(?:(\d+)\s+)?"
+    r"(days?|weeks?|fortnights?|months?|quarters?|years?)\b"
+)
+_DATE_PHRASES: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"\byesterday\b"), "last 1 day"),
+    (re.compile(r"\bthis\s+month\b|\bmonth\s+to\s+date\b|\bmtd\b"), "current_month"),
+    (re.compile(r"\bthis\s+year\b|\byear\s+to\s+date\b|\bytd\b"), "current_year"),
+    (re.compile(r"\ball\s+time\b"), "all_time"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SimilarQuestion:
+    question: str
+    sql: str
+    score: float
+
+
+def _fold_unicode(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return stripped.casefold()
+
+
+def _relative_period(match: re.Match[str]) -> str:
+    count = int(match.group(1) or 1)
+    unit = match.group(2).rstrip("s")
+    if unit in _UNIT_DAYS:
+        return f" last_{count * _UNIT_DAYS[unit]}_day "
+    return f" last_{count}_{unit} "
+
+
+def _singularize(token: str) -> str:
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def canonicalize_question(question: str) -> tuple[str, ...]:
+    """Reduce a question to its meaningful tokens, in the order they were asked."""
+    text = _fold_unicode(question)
+    words = _TOKEN_PATTERN.findall(text)
+    text = " ".join(_NUMBER_WORDS.get(word, word) for word in words)
+    for pattern, replacement in _DATE_PHRASES:
+        text = pattern.sub(replacement, text)
+    text = _RELATIVE_PERIOD_PATTERN.sub(_relative_period, text)
+    tokens: list[str] = []
+    negated = False
+    for word in text.split():
+        if word in _NEGATIONS:
+            negated = True
+            continue
+        if word in _CLAUSE_BREAKS:
+            negated = False
+        if word in STOP_WORDS:
+            continue
+        token = _singularize(_SYNONYMS.get(word, word))
+        tokens.append(f"not_{token}" if negated else token)
+    return tuple(tokens)
+
+
+def shingles(tokens: Sequence[str]) -> tuple[str, ...]:
+    """Words plus runs of two and three words, so that reordered questions score apart."""
+    runs = (
+        " ".join(tokens[start : start + size])
+        for size in (2, 3)
+        for start in range(len(tokens) - size + 1)
+    )
+    return (*tokens, *runs)
+
+
+def jaccard(left: Iterable[str], right: Iterable[str]) -> float:
+    left_set, right_set = set(left), set(right)
+    if not left_set and not right_set:
+        return 1.0
+    return len(left_set & right_set) / len(left_set | right_set)
+
+
+class MinHasher:
+    """Deterministic MinHash signatures, stable across processes and restarts."""
+
+    def __init__(self, num_perm: int, *, seed: int = 1) -> None:
+        rng = Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens: Sequence[str]) -> list[int]:
+        hashes = [
+            int.from_bytes(blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            for token in tokens
+        ]
+        if not hashes:
+            return [_MAX_HASH] * len(self._permutations)
+        return [
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in self._permutations
+        ]
+
+
+class QuestionSimilarityIndex:
+    """Redis-backed LSH index mapping canonical questions to the SQL they produced."""
+
+    def __init__(self, cache: RedisCache, settings: Settings | None = None) -> None:
+        self._cache = cache
+        self._settings = settings or get_settings()
+        num_perm = self._settings.similarity_num_perm
+        bands = self._settings.similarity_bands
+        if num_perm % bands:
+            raise ValueError("SIMILARITY_NUM_PERM must be divisible by SIMILARITY_BANDS")
+        self._bands = bands
+        self._rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+
+    async def lookup(self, question: str) -> SimilarQuestion | None:
+        tokens = canonicalize_question(question)
+        if not tokens:
+            return None
+
+        exact = await self._cache.read(similarity_entry_key(_digest(tokens)))
+        if exact is not None:
+            return SimilarQuestion(question=exact["question"], sql=exact["sql"], score=1.0)
+
+        band_keys = self._band_keys(tokens)
+        members = await cast(Awaitable[set[Any]], self._cache.redis.sunion(band_keys))
+        candidates = sorted(_as_text(member) for member in members)[:_MAX_CANDIDATES]
+        if not candidates:
+            return None
+
+        raw_entries = await self._cache.redis.mget(
+            [similarity_entry_key(candidate) for candidate in candidates]
+        )
+        best: SimilarQuestion | None = None
+        for raw in raw_entries:
+            if not raw:
+                continue
+            entry = cast(dict[str, Any], json.loads(raw))
+            score = jaccard(shingles(tokens), shingles(entry["tokens"]))
+            if score >= self._settings.similarity_threshold and (
+                best is None or score > best.score
+            ):
+                best = SimilarQuestion(question=entry["question"], sql=entry["sql"], score=score)
+        return best
+
+    async def add(self, question: str, sql: str) -> None:
+        tokens = canonicalize_question(question)
+        if not tokens:
+            return
+        digest = _digest(tokens)
+        ttl = self._settings.similarity_ttl_seconds
+        await self._cache.write(
+            similarity_entry_key(digest),
+            {"question": question, "tokens": list(tokens), "sql": sql},
+            ttl_seconds=ttl,
+        )
+        pipeline = self._cache.redis.pipeline(transaction=False)
+        for band_key in self._band_keys(tokens):
+            pipeline.sadd(band_key, digest)
+            pipeline.expire(band_key, ttl)
+        await pipeline.execute()
+
+    def _band_keys(self, tokens: Sequence[str]) -> list[str]:
+        signature = self._hasher.signature(shingles(tokens))
+        keys = []
+        for band in range(self._bands):
+            rows = signature[band * self._rows : (band + 1) * self._rows]
+            band_digest = sha256(",".join(map(str, rows)).encode()).hexdigest()[:16]
+            keys.append(similarity_band_key(band, band_digest))
+        return keys
+
+
+def _digest(tokens: Sequence[str]) -> str:
+    return sha256(" ".join(tokens).encode("utf-8")).hexdigest()
+
+
+def _as_text(value: str | bytes) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
@@ -0,0 +1,118 @@
+"""Coalescing of identical in-flight computations within and across workers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..config import Settings, get_settings
+from .client import RedisCache
+from .keys import lease_key
+
+logger = logging.getLogger(__name__)
+
+Payload = dict[str, Any]
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time.
+
+    Callers inside one process share a single task per key, which is cancelled
+    once every caller waiting on it has been cancelled. Across workers a Redis
+    lease elects a leader; the others poll `lookup` until the leader has published
+    its result to the cache, or compute themselves once the lease lapses or the
+    wait times out.
+    """
+
+    def __init__(self, cache: RedisCache, settings: Settings | None = None) -> None:
+        self._cache = cache
+        self._settings = settings or get_settings()
+        self._inflight: dict[str, asyncio.Task[Payload]] = {}
+        self._waiters: dict[asyncio.Task[Payload], int] = {}
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Payload]],
+        lookup: Callable[[], Awaitable[Payload | None]],
+    ) -> Payload:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lead(key, compute, lookup))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            logger.info("singleflight_join key=%s", key)
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shield so one caller going away does not cancel the shared computation.
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Every caller has gone away; nobody is left to use the answer.
+                    # Forget it first: it stays pending while it unwinds (releasing the
+                    # lease), and a caller arriving then must start afresh, not join it.
+                    logger.info("singleflight_abandoned key=%s", key)
+                    self._forget(key, task)
+                    task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task[Payload]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _lead(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Payload]],
+        lookup: Callable[[], Awaitable[Payload | None]],
+    ) -> Payload:
+        lease = lease_key(key)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._settings.singleflight_wait_timeout_seconds
+
+        while True:
+            token = await self._cache.acquire_lease(
+                lease, self._settings.singleflight_lease_ttl_seconds
+            )
+            if token is not None:
+                try:
+                    return await compute()
+                finally:
+                    await self._release(lease, token)
+
+            logger.info("singleflight_wait_remote key=%s", key)
+            cached = await self._wait_for_leader(lease, lookup, deadline)
+            if cached is not None:
+                return cached
+            if loop.time() >= deadline:
+                logger.warning("singleflight_wait_timeout key=%s", key)
+                return await compute()
+
+    async def _wait_for_leader(
+        self,
+        lease: str,
+        lookup: Callable[[], Awaitable[Payload | None]],
+        deadline: float,
+    ) -> Payload | None:
+        loop = asyncio.get_running_loop()
+        interval = self._settings.singleflight_poll_interval_ms / 1000
+        while loop.time() < deadline:
+            await asyncio.sleep(interval)
+            cached = await lookup()
+            if cached is not None:
+                return cached
+            if not await self._cache.lease_active(lease):
+                # The leader may have stored its result just before releasing.
+                return await lookup()
+        return None
+
+    async def _release(self, lease: str, token: str) -> None:
+        try:
+            await self._cache.release_lease(lease, token)
+        except Exception:  # noqa: BLE001
+            logger.warning("singleflight_release_failed lease=%s", lease, exc_info=True)
@@ -8,14 +8,29 @@ from collections.abc import Sequence
 from typing import Any
 
 from .client import ClickHouseClient
-from .schema import TABLE_NAME, build_create_table_statement
+from .layout import current_layout
+from .schema import (
+    ROLLUPS,
+    TABLE_NAME,
+    build_create_table_statement,
+    build_rollup_backfill_statement,
+    build_rollup_table_statement,
+    build_rollup_view_statement,
+)
 from .seed_data import main as seed_clickhouse_cli, seed_clickhouse_with_client
 
 logger = logging.getLogger(__name__)
 
 
 async def bootstrap_clickhouse(client: ClickHouseClient) -> dict[str, Any]:
-    """Ensure the analytics table exists and seeded with demo data."""
+    """Ensure the analytics table exists and seeded with demo data.
+
+    New tables use the `CLICKHOUSE_TABLE_LAYOUT` layout; an existing table with a
+    different layout is only reported, since migrating it copies every row.
+
+    With `CLICKHOUSE_ROLLUPS_ENABLED` the rollup tables and the materialized views
+    feeding them are created as well, and backfilled from existing rows.
+    """
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(None, _bootstrap_sync, client)
 
@@ -28,16 +43,29 @@ def _bootstrap_sync(client: ClickHouseClient) -> dict[str, Any]:
     exists_result = client.execute_sync(exists_query)
     exists = bool(exists_result and exists_result[0][0])
 
+    layout = client.settings.clickhouse_table_layout
     if not exists:
-        create_statement = build_create_table_statement(client.database)
+        create_statement = build_create_table_statement(client.database, layout=layout)
         client.execute_sync(create_statement)
         summary["created"] = True
+    summary["layout"] = current_layout(client.execute_sync, client.database) or layout
+    if summary["layout"] != layout:
+        # Existing tables are never rebuilt implicitly; see app.infra.clickhouse.layout.
+        logger.warning(
+            "clickhouse_layout_mismatch table=%s layout=%s configured=%s",
+            table_identifier,
+            summary["layout"],
+            layout,
+        )
 
     count_query = f"SELECT count() FROM {table_identifier}"
     count_result = client.execute_sync(count_query)
     row_count = int(count_result[0][0]) if count_result else 0
     summary["row_count"] = row_count
 
+    if client.settings.clickhouse_rollups_enabled:
+        summary["rollups_created"] = ensure_rollups(client, backfill=row_count > 0)
+
     if row_count == 0:
         inserted = seed_clickhouse_data(client, days=30, sources=["google", "facebook"])
         if inserted:
@@ -55,6 +83,26 @@ def _bootstrap_sync(client: ClickHouseClient) -> dict[str, Any]:
     return summary
 
 
+def ensure_rollups(client: ClickHouseClient, *, backfill: bool) -> list[str]:
+    """Create missing rollups and their views; returns the names of those created.
+
+    A new rollup is backfilled after its view exists, so rows inserted while the
+    backfill runs may be counted twice; bootstrap runs before traffic is served.
+    """
+    created: list[str] = []
+    for rollup in ROLLUPS:
+        exists_result = client.execute_sync(f"EXISTS TABLE {client.database}.{rollup.name}")
+        if exists_result and exists_result[0][0]:
+            continue
+        client.execute_sync(build_rollup_table_statement(rollup, client.database))
+        client.execute_sync(build_rollup_view_statement(rollup, client.database))
+        if backfill:
+            client.execute_sync(build_rollup_backfill_statement(rollup, client.database))
+        created.append(rollup.name)
+        logger.info("clickhouse_rollup_created table=%s backfilled=%s", rollup.name, backfill)
+    return created
+
+
 def seed_clickhouse_data(
     client: ClickHouseClient,
     *,
@@ -66,8 +114,9 @@ def seed_clickhouse_data(
         client,
         days=days,
         sources=tuple(active_sources),
+        layout=client.settings.clickhouse_table_layout,
     )
 
 
 def bootstrap_seed_clickhouse() -> None:
-    seed_clickhouse_cli()
+    seed_clickhouse_cli([])
@@ -0,0 +1,276 @@
+"""Vectorized generation and chunked insertion of large synthetic datasets.
+
+The dataset is the full grid of days x sources x campaigns x countries, one row
+per cell. Blocks are contiguous slices of that grid generated column by column
+with NumPy from a random stream keyed by the block's index, so for a given
+scale, seed and block size the data does not depend on worker count or the
+order blocks are inserted in.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .schema import (
+    COLUMNS,
+    DEFAULT_SOURCE_PROFILE,
+    DEFAULT_TABLE_LAYOUT,
+    ROLLUPS,
+    SOURCE_PROFILES,
+    TABLE_NAME,
+    build_create_table_statement,
+)
+
+logger = logging.getLogger(__name__)
+
+Executor = Callable[..., Any]
+
+# Ordered by traffic; a scale with N countries uses the first N.
+COUNTRIES: tuple[str, ...] = tuple(
+    (
+        "US GB DE FR CA AU JP BR IN ES IT NL SE MX KR "
+        "PL BE CH AT NO DK FI IE NZ SG ZA AR PT CZ IL"
+    ).split()
+)
+UINT32_MAX = np.iinfo(np.uint32).max
+# Weekend traffic relative to weekdays.
+WEEKEND_FACTOR = 0.8
+
+
+@dataclass(frozen=True, slots=True)
+class SeedScale:
+    """Shape of a generated dataset; rows = days x sources x campaigns x countries."""
+
+    days: int = 365
+    sources: tuple[str, ...] = ("google", "facebook")
+    campaigns_per_source: int = 100
+    countries: int = 10
+    seed: int = 42
+    end_date: date | None = None
+
+    def __post_init__(self) -> None:
+        if min(self.days, len(self.sources), self.campaigns_per_source, self.countries) < 1:
+            raise ValueError("Seed scale dimensions must be positive")
+        if self.countries > len(COUNTRIES):
+            raise ValueError(f"At most {len(COUNTRIES)} countries are available")
+
+    @property
+    def total_rows(self) -> int:
+        return self.days * len(self.sources) * self.campaigns_per_source * self.countries
+
+    @property
+    def shape(self) -> tuple[int, int, int, int]:
+        return (self.days, len(self.sources), self.campaigns_per_source, self.countries)
+
+
+@dataclass(frozen=True, slots=True)
+class SeedReport:
+    rows: int
+    blocks: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class SeedBlockGenerator:
+    """Builds columnar blocks of a `SeedScale` dataset, one `[start, stop)` grid slice at a time."""
+
+    def __init__(self, scale: SeedScale) -> None:
+        self.scale = scale
+        end = scale.end_date or date.today()
+        start = end - timedelta(days=scale.days - 1)
+        dates = [start + timedelta(days=offset) for offset in range(scale.days)]
+        self._dates = np.array(dates, dtype="datetime64[D]")
+        self._weekday_factor = np.where(
+            np.array([day.weekday() >= 5 for day in dates]), WEEKEND_FACTOR, 1.0
+        )
+        self._sources = np.array(scale.sources, dtype=object)
+        self._countries = np.array(COUNTRIES[: scale.countries], dtype=object)
+        # Traffic falls off with country rank, normalised so the average weight is 1.
+        country_weight = 1.0 / np.arange(1, scale.countries + 1) ** 0.8
+        self._country_weight = country_weight / country_weight.mean()
+
+        sources = len(scale.sources)
+        campaigns = scale.campaigns_per_source
+        profiles = [SOURCE_PROFILES.get(source, DEFAULT_SOURCE_PROFILE) for source in scale.sources]
+        self._ranges = {
+            metric: np.array([profile[metric] for profile in profiles], dtype=np.float64)
+            for metric in DEFAULT_SOURCE_PROFILE
+        }
+        # A few campaigns carry most of the volume: log-normal popularity with mean 1.
+        rng = np.random.default_rng([scale.seed, 0])
+        popularity = rng.lognormal(mean=0.0, sigma=0.75, size=(sources, campaigns))
+        self._popularity = popularity / popularity.mean()
+        self._campaign_ids = 10_000 + np.arange(sources * campaigns, dtype=np.uint32) + 1
+        self._campaign_names = np.array(
+            [
+                f"{source.title()} Campaign {10_000 + index * campaigns + offset + 1}"
+                for index, source in enumerate(scale.sources)
+                for offset in range(campaigns)
+            ],
+            dtype=object,
+        )
+
+    def block(self, index: int, start: int, stop: int) -> list[npt.NDArray[Any]]:
+        """Columns (in `COLUMNS` order) for grid cells `start..stop`, as NumPy arrays."""
+        scale = self.scale
+        rng = np.random.default_rng([scale.seed, index + 1])
+        cells = np.arange(start, stop, dtype=np.int64)
+        day, source, campaign, country = np.unravel_index(cells, scale.shape)
+        campaign_flat = source * scale.campaigns_per_source + campaign
+        size = cells.size
+
+        base = self._uniform(rng, "impressions", source, size)
+        volume = (
+            base
+            * self._popularity[source, campaign]
+            * self._country_weight[country]
+            * self._weekday_factor[day]
+        )
+        impressions = np.clip(np.rint(volume), 0, UINT32_MAX).astype(np.int64)
+        clicks = rng.binomial(impressions, self._uniform(rng, "ctr", source, size))
+        spend = np.round(clicks * self._uniform(rng, "cpc", source, size), 2)
+        conversions = rng.binomial(clicks, self._uniform(rng, "conversion_rate", source, size))
+        revenue = np.round(spend * self._uniform(rng, "roas", source, size), 2)
+
+        return [
+            self._dates[day],
+            self._sources[source],
+            self._campaign_ids[campaign_flat],
+            self._campaign_names[campaign_flat],
+            self._countries[country],
+            impressions,
+            clicks,
+            spend,
+            conversions,
+            revenue,
+        ]
+
+    def _uniform(
+        self,
+        rng: np.random.Generator,
+        metric: str,
+        source: npt.NDArray[np.intp],
+        size: int,
+    ) -> npt.NDArray[np.float64]:
+        low, high = self._ranges[metric][source, 0], self._ranges[metric][source, 1]
+        values: npt.NDArray[np.float64] = low + (high - low) * rng.random(size)
+        return values
+
+
+def iter_block_ranges(total_rows: int, block_size: int) -> Iterator[tuple[int, int, int]]:
+    """`(index, start, stop)` for consecutive blocks of at most `block_size` rows."""
+    if block_size < 1:
+        raise ValueError("block_size must be positive")
+    for index, start in enumerate(range(0, total_rows, block_size)):
+        yield index, start, min(start + block_size, total_rows)
+
+
+def bulk_seed(
+    connect: Callable[[], Executor],
+    *,
+    database: str,
+    scale: SeedScale,
+    block_size: int = 500_000,
+    workers: int = 1,
+    truncate: bool = True,
+    create_database: bool = False,
+    layout: str = DEFAULT_TABLE_LAYOUT,
+) -> SeedReport:
+    """Generate `scale` and insert it in columnar blocks of `block_size` rows.
+
+    `connect` returns an execute callable; each worker thread calls it once, so
+    it must hand out independent connections unless the executor is thread-safe,
+    and the connections must be opened with `use_numpy` so the driver writes the
+    generated arrays without converting them to Python objects.
+    With `workers > 1` blocks are generated and inserted concurrently; NumPy and
+    the driver's socket I/O release the GIL for much of that work. `layout` only
+    applies when the table does not exist yet.
+    """
+    execute = connect()
+    if create_database:
+        execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    execute(build_create_table_statement(database, layout=layout))
+    if truncate:
+        execute(f"TRUNCATE TABLE {database}.{TABLE_NAME}")
+        # Materialized views only ever add rows, so rollups are emptied with their source.
+        for rollup in ROLLUPS:
+            execute(f"TRUNCATE TABLE IF EXISTS {database}.{rollup.name}")
+
+    generator = SeedBlockGenerator(scale)
+    insert = f"INSERT INTO {database}.{TABLE_NAME} ({', '.join(c.name for c in COLUMNS)}) VALUES"
+    ranges = list(iter_block_ranges(scale.total_rows, block_size))
+    progress = _Progress(scale.total_rows)
+    logger.info(
+        "clickhouse_bulk_seed_start rows=%d blocks=%d workers=%d database=%s",
+        scale.total_rows,
+        len(ranges),
+        workers,
+        database,
+    )
+
+    def _run(assigned: Sequence[tuple[int, int, int]], run_execute: Executor) -> None:
+        for index, start, stop in assigned:
+            columns = generator.block(index, start, stop)
+            run_execute(insert, columns, columnar=True, types_check=False)
+            progress.add(stop - start)
+
+    started = time.perf_counter()
+    if workers <= 1:
+        _run(ranges, execute)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seed") as pool:
+            futures = [
+                pool.submit(lambda share: _run(share, connect()), ranges[offset::workers])
+                for offset in range(workers)
+            ]
+            for future in futures:
+                future.result()
+    report = SeedReport(
+        rows=scale.total_rows, blocks=len(ranges), seconds=time.perf_counter() - started
+    )
+    logger.info(
+        "clickhouse_bulk_seed_completed rows=%d blocks=%d seconds=%.1f rows_per_second=%.0f",
+        report.rows,
+        report.blocks,
+        report.seconds,
+        report.rows_per_second,
+    )
+    return report
+
+
+class _Progress:
+    """Logs inserted rows and throughput roughly every tenth of the dataset."""
+
+    def __init__(self, total: int) -> None:
+        self._total = total
+        self._done = 0
+        self._next_report = total / 10
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, rows: int) -> None:
+        with self._lock:
+            self._done += rows
+            if self._done < self._next_report or self._done >= self._total:
+                return
+            self._next_report += self._total / 10
+            elapsed = time.perf_counter() - self._started
+            logger.info(
+                "clickhouse_bulk_seed_progress rows=%d/%d rows_per_second=%.0f",
+                self._done,
+                self._total,
+                self._done / elapsed if elapsed else 0.0,
+            )
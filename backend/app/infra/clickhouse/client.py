@@ -4,13 +4,21 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
 from dataclasses import dataclass
-from typing import Any, cast
+from typing import Any
 from urllib.parse import urlparse
+from uuid import uuid4
 
 from clickhouse_driver import Client as SyncClickHouseClient  # type: ignore[import-untyped]
 
 from ..config import Settings, get_settings
+from ..metrics import QUERY_CANCELLATIONS
+from ..serialization.columnar import ColumnarResult, columnar_row_count, columnar_to_rows
+from ..tracing import span, sql_hash
+from .guardrails import GuardDecision, QueryBudget, QueryGuard
+from .pool import ClickHouseConnectionPool
+from .streaming import QueryCancelledError, ResultLimits, read_bounded
 
 logger = logging.getLogger(__name__)
 
@@ -33,40 +41,122 @@ def _parse_clickhouse_url(url: str) -> ClickHouseConnectionSettings:
 
 
 class ClickHouseClient:
-    """Thin asynchronous wrapper around the synchronous clickhouse-driver client."""
+    """Asynchronous facade over a pool of synchronous clickhouse-driver connections."""
 
     def __init__(self, settings: Settings | None = None) -> None:
         self._settings = settings or get_settings()
         self._connection = _parse_clickhouse_url(str(self._settings.clickhouse_url))
-        self._sync_client = SyncClickHouseClient(
-            host=self._connection.host,
-            port=self._connection.port,
-            database=self._connection.database,
-            user=self._settings.clickhouse_user,
-            password=self._settings.clickhouse_password.get_secret_value(),
+        self._pool = ClickHouseConnectionPool(
+            self._connect,
+            size=self._settings.clickhouse_pool_size,
+            acquire_timeout=self._settings.clickhouse_pool_timeout_seconds,
+        )
+        self._limits = ResultLimits(
+            max_rows=self._settings.result_max_rows,
+            max_bytes=self._settings.result_max_bytes,
+            block_size=self._settings.clickhouse_block_size,
         )
+        self._guard = QueryGuard(QueryBudget.from_settings(self._settings))
+        # Outside the pool, so KILL QUERY still gets through when every pooled
+        # connection is busy with the queries being killed.
+        self._control: SyncClickHouseClient | None = None
+        self._control_lock = threading.Lock()
         logger.info(
-            "clickhouse_client_connected host=%s port=%s database=%s",
+            "clickhouse_client_configured host=%s port=%s database=%s pool_size=%s",
             self._connection.host,
             self._connection.port,
             self._connection.database,
+            self._settings.clickhouse_pool_size,
         )
 
+    @property
+    def settings(self) -> Settings:
+        return self._settings
+
     @property
     def database(self) -> str:
         return self._connection.database
 
+    @property
+    def pool(self) -> ClickHouseConnectionPool:
+        return self._pool
+
     async def query(self, sql: str) -> list[dict[str, Any]]:
         """Execute a read-only SQL statement and return rows as dicts."""
-        loop = asyncio.get_running_loop()
-        data, columns = await loop.run_in_executor(None, self._run_query, sql)
-        column_names = [col[0] for col in columns]
-        return [dict(zip(column_names, row, strict=False)) for row in data]
+        return columnar_to_rows(await self.query_columnar(sql))
+
+    async def query_columnar(self, sql: str) -> ColumnarResult:
+        """Execute a read-only SQL statement and return the result column by column.
+
+        Results are streamed block by block and capped at `RESULT_MAX_ROWS` rows and
+        `RESULT_MAX_BYTES` bytes; a capped result carries `truncated: True`. The
+        query runs with the limits of `QueryGuard`, which may first estimate its
+        cost and raise `QueryCostExceeded` or cap how much it reads.
+
+        Cancelling the awaiting task cancels the query: it is dropped if still
+        queued for a connection, abandoned by the driver if rows are streaming,
+        and killed on the server by its `query_id` once it has been sent.
+        """
+        query_id = uuid4().hex
+        cancelled = threading.Event()
+        started = threading.Event()
+        with span("clickhouse.query", sql_hash=sql_hash(sql)) as query_span:
+            query_span.set(query_id=query_id)
+            try:
+                result, decision = await self._pool.run(
+                    lambda client: self._run_guarded(client, sql, query_id, cancelled, started)
+                )
+            except asyncio.CancelledError:
+                cancelled.set()
+                query_span.set(cancelled=True)
+                if started.is_set():
+                    loop = asyncio.get_running_loop()
+                    loop.run_in_executor(None, self._kill_query, query_id)
+                else:
+                    QUERY_CANCELLATIONS.inc(result="not_started")
+                raise
+            if decision.estimate is not None:
+                query_span.set(
+                    estimated_rows=decision.estimate.rows,
+                    estimated_bytes=decision.estimate.bytes,
+                    limited=decision.limited,
+                )
+            query_span.set(
+                rows=columnar_row_count(result),
+                columns=len(result["columns"]),
+                truncated=result.get("truncated", False),
+            )
+            return result
+
+    def _run_guarded(
+        self,
+        client: Any,
+        sql: str,
+        query_id: str | None = None,
+        cancelled: threading.Event | None = None,
+        started: threading.Event | None = None,
+    ) -> tuple[ColumnarResult, GuardDecision]:
+        if cancelled is not None and cancelled.is_set():
+            raise QueryCancelledError(f"Query {query_id} cancelled before it started")
+        decision = self._guard.check(client, sql)
+        # Set `started` before the second check: a caller cancelling after it
+        # sees `started` and kills the query, one cancelling before it is seen here.
+        if started is not None:
+            started.set()
+        if cancelled is not None and cancelled.is_set():
+            raise QueryCancelledError(f"Query {query_id} cancelled before it started")
+        result = read_bounded(
+            client, sql, self._limits, decision.settings, query_id=query_id, cancelled=cancelled
+        )
+        if decision.limited:
+            # The server stopped reading at the budget, so aggregates may be partial.
+            result["truncated"] = True
+        return result, decision
 
     async def execute_scalar(self, sql: str) -> Any:
         """Execute a query that returns a single scalar value."""
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, self._sync_client.execute, sql)
+        with span("clickhouse.execute_scalar", sql_hash=sql_hash(sql)):
+            result = await self._pool.run(lambda client: client.execute(sql))
         if not result:
             return None
         value = result[0]
@@ -76,14 +166,44 @@ class ClickHouseClient:
 
     def execute_sync(self, sql: str, *args: Any, **kwargs: Any) -> Any:
         """Run a synchronous statement directly. Primarily for bootstrap paths."""
-        return self._sync_client.execute(sql, *args, **kwargs)
-
-    def _run_query(self, sql: str) -> tuple[list[Any], list[Any]]:
-        result = self._sync_client.execute(sql, with_column_types=True)
-        return cast(tuple[list[Any], list[Any]], result)
+        with self._pool.connection() as client:
+            return client.execute(sql, *args, **kwargs)
+
+    def _kill_query(self, query_id: str) -> None:
+        """Ask the server to stop `query_id`; a no-op if it already finished."""
+        try:
+            with self._control_lock:
+                if self._control is None:
+                    self._control = self._connect()
+                self._control.execute(
+                    "KILL QUERY WHERE query_id = %(query_id)s ASYNC", {"query_id": query_id}
+                )
+        except Exception:  # noqa: BLE001
+            QUERY_CANCELLATIONS.inc(result="failed")
+            logger.warning("clickhouse_kill_failed query_id=%s", query_id, exc_info=True)
+            return
+        QUERY_CANCELLATIONS.inc(result="killed")
+        logger.info("clickhouse_query_killed query_id=%s", query_id)
+
+    def _connect(self) -> SyncClickHouseClient:
+        return SyncClickHouseClient(
+            host=self._connection.host,
+            port=self._connection.port,
+            database=self._connection.database,
+            user=self._settings.clickhouse_user,
+            password=self._settings.clickhouse_password.get_secret_value(),
+        )
 
     async def close(self) -> None:
-        """Disconnect the underlying synchronous driver."""
+        """Disconnect every pooled connection and stop the pool executor."""
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._sync_client.disconnect)
-        logger.info("clickhouse_client_disconnected host=%s database=%s", self._connection.host, self._connection.database)
+        await loop.run_in_executor(None, self._pool.close)
+        with self._control_lock:
+            if self._control is not None:
+                self._control.disconnect()
+                self._control = None
+        logger.info(
+            "clickhouse_client_disconnected host=%s database=%s",
+            self._connection.host,
+            self._connection.database,
+        )
@@ -0,0 +1,191 @@
+"""Per-query resource limits and pre-execution cost checks for generated SQL.
+
+Every query carries server-side limits from `Settings`. When an estimate budget
+is configured, `EXPLAIN ESTIMATE` runs first on the same connection; queries
+over budget are rejected, or with `CLICKHOUSE_ESTIMATE_ACTION=limit` executed
+with the scan capped at the budget and flagged as truncated.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from clickhouse_driver.errors import Error as ClickHouseError  # type: ignore[import-untyped]
+
+from ..cache.local import LocalCache
+from ..config import Settings
+from ..metrics import QUERY_GUARD_DECISIONS
+from ..sql.fingerprint import sql_fingerprint
+
+logger = logging.getLogger(__name__)
+
+ESTIMATE_CACHE_MAX_ENTRIES = 4096
+
+
+class QueryCostExceeded(ValueError):
+    """Raised when a query's estimated scan is over the configured budget."""
+
+
+@dataclass(frozen=True, slots=True)
+class QueryEstimate:
+    """Rows, marks and parts `EXPLAIN ESTIMATE` expects a query to read.
+
+    `bytes` is an upper bound: estimated rows times the average uncompressed
+    width of a full row in each table read.
+    """
+
+    rows: int
+    marks: int
+    parts: int
+    bytes: int
+
+
+@dataclass(frozen=True, slots=True)
+class QueryBudget:
+    max_execution_seconds: int
+    max_rows_to_read: int
+    max_memory_bytes: int
+    estimate_max_rows: int
+    estimate_max_bytes: int
+    action: Literal["reject", "limit"]
+    estimate_cache_seconds: int
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> QueryBudget:
+        return cls(
+            max_execution_seconds=settings.clickhouse_max_execution_seconds,
+            max_rows_to_read=settings.clickhouse_max_rows_to_read,
+            max_memory_bytes=settings.clickhouse_max_memory_bytes,
+            estimate_max_rows=settings.clickhouse_estimate_max_rows,
+            estimate_max_bytes=settings.clickhouse_estimate_max_bytes,
+            action=settings.clickhouse_estimate_action,
+            estimate_cache_seconds=settings.clickhouse_estimate_cache_seconds,
+        )
+
+    @property
+    def estimates(self) -> bool:
+        return bool(self.estimate_max_rows or self.estimate_max_bytes)
+
+    def query_settings(self) -> dict[str, Any]:
+        """Server-side limits for every query; 0 means unlimited to ClickHouse too."""
+        return {
+            "max_execution_time": self.max_execution_seconds,
+            "max_rows_to_read": self.max_rows_to_read,
+            "max_memory_usage": self.max_memory_bytes,
+        }
+
+    def exceeded(self, estimate: QueryEstimate) -> str | None:
+        if self.estimate_max_rows and estimate.rows > self.estimate_max_rows:
+            return f"{estimate.rows:,} rows (budget {self.estimate_max_rows:,})"
+        if self.estimate_max_bytes and estimate.bytes > self.estimate_max_bytes:
+            return f"{estimate.bytes:,} bytes (budget {self.estimate_max_bytes:,})"
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class GuardDecision:
+    settings: dict[str, Any]
+    estimate: QueryEstimate | None = None
+    limited: bool = False
+
+
+class QueryGuard:
+    """Decides the settings a query runs with, estimating its cost when budgeted.
+
+    Methods run on pool threads with a borrowed connection, so the estimate
+    caches are guarded by a lock. Estimates are keyed by SQL fingerprint and
+    row widths by table, both for `estimate_cache_seconds`.
+    """
+
+    def __init__(self, budget: QueryBudget) -> None:
+        self._budget = budget
+        self._estimates = LocalCache(
+            max_entries=ESTIMATE_CACHE_MAX_ENTRIES,
+            max_bytes=ESTIMATE_CACHE_MAX_ENTRIES,
+            ttl_seconds=budget.estimate_cache_seconds,
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def budget(self) -> QueryBudget:
+        return self._budget
+
+    def check(self, client: Any, sql: str) -> GuardDecision:
+        """Settings to run `sql` with; raises `QueryCostExceeded` to reject it."""
+        settings = self._budget.query_settings()
+        if not self._budget.estimates:
+            return GuardDecision(settings=settings)
+        try:
+            estimate = self.estimate(client, sql)
+        except ClickHouseError as exc:
+            # Server-side limits still apply; an unestimable query is not rejected.
+            logger.warning("clickhouse_estimate_failed error=%s sql=%s", exc, sql[:80])
+            QUERY_GUARD_DECISIONS.inc(decision="unestimated")
+            return GuardDecision(settings=settings)
+
+        reason = self._budget.exceeded(estimate)
+        if reason is None:
+            QUERY_GUARD_DECISIONS.inc(decision="allowed")
+            return GuardDecision(settings=settings, estimate=estimate)
+        if self._budget.action == "reject":
+            QUERY_GUARD_DECISIONS.inc(decision="rejected")
+            logger.warning("clickhouse_query_rejected estimate=%s sql=%s", reason, sql[:80])
+            raise QueryCostExceeded(f"Query would read too much data: {reason}")
+
+        QUERY_GUARD_DECISIONS.inc(decision="limited")
+        logger.warning("clickhouse_query_limited estimate=%s sql=%s", reason, sql[:80])
+        return GuardDecision(
+            settings={**settings, **self._limit_settings(estimate)},
+            estimate=estimate,
+            limited=True,
+        )
+
+    def estimate(self, client: Any, sql: str) -> QueryEstimate:
+        key = sql_fingerprint(sql)
+        with self._lock:
+            cached: QueryEstimate | None = self._estimates.get(key)
+        if cached is not None:
+            return cached
+        rows = marks = parts = total_bytes = 0
+        for database, table, table_parts, table_rows, table_marks in client.execute(
+            f"EXPLAIN ESTIMATE {sql}"
+        ):
+            rows += table_rows
+            marks += table_marks
+            parts += table_parts
+            total_bytes += table_rows * self._row_width(client, database, table)
+        estimate = QueryEstimate(rows=rows, marks=marks, parts=parts, bytes=total_bytes)
+        with self._lock:
+            self._estimates.set(key, estimate, size=1)
+        return estimate
+
+    def _row_width(self, client: Any, database: str, table: str) -> int:
+        key = f"width:{database}.{table}"
+        with self._lock:
+            cached: int | None = self._estimates.get(key)
+        if cached is not None:
+            return cached
+        result = client.execute(
+            "SELECT sum(data_uncompressed_bytes), sum(rows) FROM system.parts "
+            "WHERE active AND database = %(database)s AND table = %(table)s",
+            {"database": database, "table": table},
+        )
+        table_bytes, table_rows = result[0] if result else (0, 0)
+        width = int(table_bytes or 0) // int(table_rows or 1) if table_rows else 0
+        with self._lock:
+            self._estimates.set(key, width, size=1)
+        return width
+
+    def _limit_settings(self, estimate: QueryEstimate) -> dict[str, Any]:
+        """Cap the scan at the budget; `break` returns what was read instead of failing."""
+        max_rows = self._budget.estimate_max_rows
+        if self._budget.estimate_max_bytes and estimate.rows:
+            width = max(estimate.bytes // estimate.rows, 1)
+            by_bytes = max(self._budget.estimate_max_bytes // width, 1)
+            max_rows = min(max_rows, by_bytes) if max_rows else by_bytes
+        if self._budget.max_rows_to_read:
+            max_rows = min(max_rows, self._budget.max_rows_to_read)
+        return {"max_rows_to_read": max_rows, "read_overflow_mode": "break"}
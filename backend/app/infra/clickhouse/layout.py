@@ -0,0 +1,168 @@
+"""Detect and migrate the physical layout of the analytics table.
+
+A migration copies every row into a table created with the target layout,
+verifies the row count and atomically swaps the two tables with
+`EXCHANGE TABLES` (Atomic databases, the ClickHouse default). Writes to
+`ad_performance` must be paused while it runs: rows inserted after the copy
+starts are not carried over.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from clickhouse_driver import Client as SyncClickHouseClient  # type: ignore[import-untyped]
+
+from .schema import (
+    DEFAULT_TABLE_LAYOUT,
+    LAYOUT_COMMENT_PREFIX,
+    ROLLUPS,
+    TABLE_LAYOUTS,
+    TABLE_NAME,
+    build_create_table_statement,
+    build_rollup_view_statement,
+)
+from .seed_data import parse_clickhouse_url
+
+logger = logging.getLogger(__name__)
+
+Executor = Callable[..., Any]
+
+
+class LayoutMigrationError(RuntimeError):
+    """Raised when a migration cannot be completed safely."""
+
+
+@dataclass(frozen=True, slots=True)
+class LayoutMigration:
+    source: str
+    target: str
+    rows: int
+    backup: str | None = None
+
+    @property
+    def changed(self) -> bool:
+        return self.source != self.target
+
+
+def current_layout(execute: Executor, database: str, table: str = TABLE_NAME) -> str | None:
+    """Layout recorded in the table comment; `None` when the table does not exist."""
+    rows = execute(
+        "SELECT comment FROM system.tables WHERE database = %(database)s AND name = %(table)s",
+        {"database": database, "table": table},
+    )
+    if not rows:
+        return None
+    comment = str(rows[0][0] or "")
+    if comment.startswith(LAYOUT_COMMENT_PREFIX):
+        return comment.removeprefix(LAYOUT_COMMENT_PREFIX)
+    return DEFAULT_TABLE_LAYOUT
+
+
+def migrate_table_layout(
+    execute: Executor,
+    *,
+    database: str,
+    layout: str,
+    keep_backup: bool = False,
+) -> LayoutMigration:
+    """Rebuild `ad_performance` in `layout`, keeping its rows and rollup views."""
+    if layout not in TABLE_LAYOUTS:
+        raise LayoutMigrationError(f"Unknown table layout '{layout}'")
+    source = current_layout(execute, database)
+    if source is None:
+        raise LayoutMigrationError(f"Table {database}.{TABLE_NAME} does not exist")
+    table = f"{database}.{TABLE_NAME}"
+    rows = _count(execute, table)
+    if source == layout:
+        return LayoutMigration(source=source, target=layout, rows=rows)
+
+    staging = f"{database}.{TABLE_NAME}__{layout}"
+    execute(f"DROP TABLE IF EXISTS {staging}")
+    execute(build_create_table_statement(database, layout=layout, table=f"{TABLE_NAME}__{layout}"))
+    execute(f"INSERT INTO {staging} SELECT * FROM {table}")
+    copied = _count(execute, staging)
+    if copied != rows:
+        execute(f"DROP TABLE IF EXISTS {staging}")
+        raise LayoutMigrationError(
+            f"Copied {copied} of {rows} rows; were writes running during the migration?"
+        )
+
+    execute(f"EXCHANGE TABLES {table} AND {staging}")
+    # Views are re-created so they are bound to the new table, not the one swapped out.
+    for rollup in ROLLUPS:
+        exists = execute(f"EXISTS TABLE {database}.{rollup.view_name}")
+        if exists and exists[0][0]:
+            execute(f"DROP VIEW {database}.{rollup.view_name}")
+            execute(build_rollup_view_statement(rollup, database))
+
+    backup: str | None = None
+    if keep_backup:
+        backup = f"{TABLE_NAME}__backup_{source}"
+        execute(f"RENAME TABLE {staging} TO {database}.{backup}")
+    else:
+        execute(f"DROP TABLE {staging}")
+    logger.info(
+        "clickhouse_layout_migrated table=%s source=%s target=%s rows=%d backup=%s",
+        table,
+        source,
+        layout,
+        rows,
+        backup,
+    )
+    return LayoutMigration(source=source, target=layout, rows=rows, backup=backup)
+
+
+def _count(execute: Executor, table: str) -> int:
+    result = execute(f"SELECT count() FROM {table}")
+    return int(result[0][0]) if result else 0
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Show or migrate the physical layout of the analytics table."
+    )
+    parser.add_argument(
+        "--to",
+        choices=sorted(TABLE_LAYOUTS),
+        default=None,
+        help="Target layout (default: CLICKHOUSE_TABLE_LAYOUT).",
+    )
+    parser.add_argument("--show", action="store_true", help="Print the current layout and exit.")
+    parser.add_argument("--keep-backup", action="store_true", help="Keep the old table.")
+    args = parser.parse_args(argv)
+
+    host, port, database = parse_clickhouse_url(
+        os.environ.get("CLICKHOUSE_URL", "clickhouse://localhost:9000/marketing")
+    )
+    client = SyncClickHouseClient(
+        host=host,
+        port=port,
+        database=database,
+        user=os.environ.get("CLICKHOUSE_USER", "default"),
+        password=os.environ.get("CLICKHOUSE_PASSWORD", ""),
+    )
+    if args.show:
+        print(current_layout(client.execute, database) or "missing")
+        return
+
+    target = args.to or os.environ.get("CLICKHOUSE_TABLE_LAYOUT", DEFAULT_TABLE_LAYOUT)
+    migration = migrate_table_layout(
+        client.execute, database=database, layout=target, keep_backup=args.keep_backup
+    )
+    if not migration.changed:
+        print(f"{database}.{TABLE_NAME} already uses the '{target}' layout")
+        return
+    print(
+        f"Migrated {migration.rows:,} rows from '{migration.source}' to '{migration.target}'"
+        + (f"; old table kept as {database}.{migration.backup}" if migration.backup else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
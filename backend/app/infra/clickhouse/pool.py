@@ -0,0 +1,178 @@
+"""Bounded pool of synchronous clickhouse-driver connections."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no ClickHouse connection becomes available in time."""
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    size: int
+    created: int
+    in_use: int
+    acquisitions: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class ClickHouseConnectionPool:
+    """Fixed-size pool of native connections served by a dedicated executor.
+
+    A native connection handles one query at a time, so each query borrows a
+    connection for its duration. The executor has as many threads as the pool has
+    connections, which keeps blocking driver calls off the default executor and
+    bounds concurrency to what the pool can actually serve. Async callers wait for
+    a slot on the event loop rather than in the executor queue, so the acquire
+    timeout bounds the whole wait. Connections are created lazily up to `size`.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        size: int,
+        acquire_timeout: float,
+    ) -> None:
+        self._factory = factory
+        self._size = size
+        self._acquire_timeout = acquire_timeout
+        self._idle: queue.LifoQueue[Any] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._slots = asyncio.Semaphore(size)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="clickhouse")
+
+    async def run(self, func: Callable[[Any], T]) -> T:
+        """Run `func(connection)` on the pool executor and return its result.
+
+        Callers queue on the event loop for one of `size` slots, for at most the
+        acquire timeout, so a job only reaches the executor once a thread and a
+        connection are free for it.
+        """
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self._acquire_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            raise self._timed_out() from None
+        try:
+            job = self._executor.submit(self._run_borrowed, func, started)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Held until the job finishes, even when the caller stops waiting for it first.
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._slots.release))
+        return await asyncio.wrap_future(job)
+
+    @contextmanager
+    def connection(self, *, waiting_since: float | None = None) -> Iterator[Any]:
+        """Borrow a connection from the calling thread, blocking until one is free.
+
+        `waiting_since` lets callers count time already spent queueing in the
+        recorded wait.
+        """
+        started = time.monotonic() if waiting_since is None else waiting_since
+        client = self._acquire(time.monotonic() + self._acquire_timeout)
+        self._record_wait(time.monotonic() - started)
+        try:
+            yield client
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(client)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                size=self._size,
+                created=self._created,
+                in_use=self._in_use,
+                acquisitions=self._acquisitions,
+                timeouts=self._timeouts,
+                wait_seconds_total=self._wait_total,
+                wait_seconds_max=self._wait_max,
+            )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                client.disconnect()
+            except Exception:  # noqa: BLE001
+                logger.warning("clickhouse_pool_disconnect_failed", exc_info=True)
+
+    def _run_borrowed(self, func: Callable[[Any], T], started: float) -> T:
+        # Time spent waiting for a slot counts as pool wait time.
+        with self.connection(waiting_since=started) as client:
+            return func(client)
+
+    def _acquire(self, deadline: float) -> Any:
+        try:
+            client = self._idle.get_nowait()
+        except queue.Empty:
+            client = self._create_or_wait(deadline)
+        with self._lock:
+            self._in_use += 1
+            self._acquisitions += 1
+        return client
+
+    def _create_or_wait(self, deadline: float) -> Any:
+        with self._lock:
+            can_create = self._created < self._size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                return self._idle.get_nowait()
+            return self._idle.get(timeout=remaining)
+        except queue.Empty:
+            raise self._timed_out() from None
+
+    def _timed_out(self) -> PoolTimeoutError:
+        with self._lock:
+            self._timeouts += 1
+        return PoolTimeoutError(
+            f"No ClickHouse connection available within {self._acquire_timeout}s"
+        )
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
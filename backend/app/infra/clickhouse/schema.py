@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Sequence
-from dataclasses import dataclass
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 from random import Random
 
@@ -42,22 +42,215 @@ def _iter_column_sql(columns: Iterable[ColumnDefinition] = COLUMNS) -> str:
     return ",\n    ".join(f"{col.name} {col.data_type}" for col in columns)
 
 
-def build_create_table_statement(database: str | None = None) -> str:
-    table_identifier = f"{database}.{TABLE_NAME}" if database else TABLE_NAME
-    return f"""CREATE TABLE IF NOT EXISTS {table_identifier} (
-    {_iter_column_sql()}
+@dataclass(frozen=True, slots=True)
+class TableLayout:
+    """Physical layout of `ad_performance`; the logical columns never change.
+
+    `column_types` overrides the storage type of a column, `codecs` adds a
+    compression codec and `indexes` holds data-skipping index definitions.
+    """
+
+    name: str
+    description: str
+    order_by: tuple[str, ...] = ("source", "date", "campaign_id")
+    column_types: Mapping[str, str] = field(default_factory=dict)
+    codecs: Mapping[str, str] = field(default_factory=dict)
+    indexes: tuple[str, ...] = ()
+    partition_by: str | None = None
+    sample_by: str | None = None
+
+
+_COMPACT_TYPES = {"source": "LowCardinality(String)", "country": "LowCardinality(String)"}
+_COMPACT_CODECS = {
+    # Sorted or slowly changing columns compress best as deltas.
+    "date": "DoubleDelta, ZSTD(1)",
+    "campaign_id": "Delta, ZSTD(1)",
+    "campaign_name": "ZSTD(3)",
+    # Unsorted counters: T64 strips unused high bits before ZSTD.
+    "impressions": "T64, ZSTD(1)",
+    "clicks": "T64, ZSTD(1)",
+    "conversions": "T64, ZSTD(1)",
+    "spend": "ZSTD(1)",
+    "revenue": "ZSTD(1)",
+}
+_SKIP_INDEXES = (
+    "INDEX idx_campaign_name campaign_name TYPE bloom_filter(0.01) GRANULARITY 4",
+    "INDEX idx_country country TYPE set(256) GRANULARITY 4",
 )
-ENGINE = MergeTree()
-ORDER BY (source, date, campaign_id)
-PRIMARY KEY (source, date, campaign_id)
-"""
+
+TABLE_LAYOUTS: dict[str, TableLayout] = {
+    layout.name: layout
+    for layout in (
+        TableLayout("basic", "Plain MergeTree without partitions, codecs or skip indexes."),
+        TableLayout(
+            "compact",
+            "LowCardinality dimensions, monthly partitions, column codecs and skip indexes.",
+            column_types=_COMPACT_TYPES,
+            codecs=_COMPACT_CODECS,
+            indexes=_SKIP_INDEXES,
+            partition_by="toYYYYMM(date)",
+        ),
+        TableLayout(
+            "sampled",
+            "The compact layout plus a sampling key, so queries can use SAMPLE.",
+            order_by=("source", "date", "intHash32(campaign_id)"),
+            column_types=_COMPACT_TYPES,
+            codecs=_COMPACT_CODECS,
+            indexes=_SKIP_INDEXES,
+            partition_by="toYYYYMM(date)",
+            sample_by="intHash32(campaign_id)",
+        ),
+    )
+}
+DEFAULT_TABLE_LAYOUT = "basic"
+LAYOUT_COMMENT_PREFIX = "layout:"
+
+
+def build_create_table_statement(
+    database: str | None = None,
+    *,
+    layout: str = DEFAULT_TABLE_LAYOUT,
+    table: str = TABLE_NAME,
+) -> str:
+    """DDL for the analytics table (or a copy named `table`) in the given layout.
+
+    Layouts other than `basic` record their name in the table comment, which is
+    how migrations detect the current layout.
+    """
+    profile = TABLE_LAYOUTS[layout]
+    table_identifier = f"{database}.{table}" if database else table
+    definitions = [
+        f"{col.name} {profile.column_types.get(col.name, col.data_type)}"
+        + (f" CODEC({profile.codecs[col.name]})" if col.name in profile.codecs else "")
+        for col in COLUMNS
+    ]
+    definitions.extend(profile.indexes)
+    order_by = ", ".join(profile.order_by)
+    clauses = ["ENGINE = MergeTree()"]
+    if profile.partition_by:
+        clauses.append(f"PARTITION BY {profile.partition_by}")
+    clauses.extend([f"ORDER BY ({order_by})", f"PRIMARY KEY ({order_by})"])
+    if profile.sample_by:
+        clauses.append(f"SAMPLE BY {profile.sample_by}")
+    if layout != DEFAULT_TABLE_LAYOUT:
+        clauses.append(f"COMMENT '{LAYOUT_COMMENT_PREFIX}{layout}'")
+    columns_sql = ",\n    ".join(definitions)
+    return f"CREATE TABLE IF NOT EXISTS {table_identifier} (\n    {columns_sql}\n)\n" + "".join(
+        f"{clause}\n" for clause in clauses
+    )
 
 
 CREATE_TABLE_STATEMENT = build_create_table_statement()
 
 
+# Additive columns of `ad_performance`; rollups store their sums in wider types.
+ROLLUP_MEASURES: Sequence[ColumnDefinition] = (
+    ColumnDefinition("impressions", "UInt64", "Sum of impressions"),
+    ColumnDefinition("clicks", "UInt64", "Sum of clicks"),
+    ColumnDefinition("spend", "Float64", "Sum of spend in USD"),
+    ColumnDefinition("conversions", "UInt64", "Sum of conversions"),
+    ColumnDefinition("revenue", "Float64", "Sum of revenue in USD"),
+)
+ROLLUP_ROW_COUNT = ColumnDefinition("row_count", "UInt64", "Base rows folded into this row")
+
+
+@dataclass(frozen=True, slots=True)
+class RollupDefinition:
+    """Pre-aggregated copy of `ad_performance` grouped by `dimensions`.
+
+    Rows are summed by a SummingMergeTree fed from the base table through a
+    materialized view, so every measure is additive and queries must still
+    aggregate with `sum()`. Derived metrics are computed from the summed columns.
+    """
+
+    name: str
+    dimensions: tuple[str, ...]
+
+    @property
+    def view_name(self) -> str:
+        return f"{self.name}_mv"
+
+
+# Smallest first: the query rewriter picks the first rollup that can answer a query.
+ROLLUPS: Sequence[RollupDefinition] = (
+    RollupDefinition("ad_performance_daily_source", ("date", "source")),
+    RollupDefinition("ad_performance_daily_source_country", ("date", "source", "country")),
+)
+
+_COLUMN_TYPES = {column.name: column.data_type for column in COLUMNS}
+
+
+def _qualify(name: str, database: str | None) -> str:
+    return f"{database}.{name}" if database else name
+
+
+def build_rollup_table_statement(rollup: RollupDefinition, database: str | None = None) -> str:
+    columns = [
+        *(ColumnDefinition(name, _COLUMN_TYPES[name], "") for name in rollup.dimensions),
+        *ROLLUP_MEASURES,
+        ROLLUP_ROW_COUNT,
+    ]
+    # Source leads the sort key like the base table; it is the most common filter.
+    order_by = ", ".join(sorted(rollup.dimensions, key=lambda name: name != "source"))
+    return f"""CREATE TABLE IF NOT EXISTS {_qualify(rollup.name, database)} (
+    {_iter_column_sql(columns)}
+)
+ENGINE = SummingMergeTree()
+ORDER BY ({order_by})
+"""
+
+
+def build_rollup_select(rollup: RollupDefinition, database: str | None = None) -> str:
+    """Aggregation of the base table into `rollup`'s shape, shared by the view and backfill."""
+    dimensions = ", ".join(rollup.dimensions)
+    measures = ", ".join(f"sum({column.name}) AS {column.name}" for column in ROLLUP_MEASURES)
+    return (
+        f"SELECT {dimensions}, {measures}, count() AS {ROLLUP_ROW_COUNT.name} "
+        f"FROM {_qualify(TABLE_NAME, database)} GROUP BY {dimensions}"
+    )
+
+
+def build_rollup_view_statement(rollup: RollupDefinition, database: str | None = None) -> str:
+    return (
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS {_qualify(rollup.view_name, database)} "
+        f"TO {_qualify(rollup.name, database)} AS {build_rollup_select(rollup, database)}"
+    )
+
+
+def build_rollup_backfill_statement(rollup: RollupDefinition, database: str | None = None) -> str:
+    return f"INSERT INTO {_qualify(rollup.name, database)} {build_rollup_select(rollup, database)}"
+
+
 SeedRow = tuple[date, str, int, str, str, int, int, float, int, float]
 
+# Per-source (low, high) ranges for generated rows: impressions per row, then rates.
+SourceProfile = dict[str, tuple[float, float]]
+
+SOURCE_PROFILES: dict[str, SourceProfile] = {
+    "google": {
+        "impressions": (1200, 4200),
+        "ctr": (0.045, 0.08),
+        "cpc": (0.9, 1.4),
+        "conversion_rate": (0.025, 0.05),
+        "roas": (1.85, 2.2),
+    },
+    "facebook": {
+        "impressions": (2800, 6400),
+        "ctr": (0.022, 0.05),
+        "cpc": (0.55, 0.9),
+        "conversion_rate": (0.02, 0.045),
+        "roas": (1.65, 2.05),
+    },
+}
+
+DEFAULT_SOURCE_PROFILE: SourceProfile = {
+    "impressions": (1500, 4500),
+    "ctr": (0.03, 0.06),
+    "cpc": (0.6, 1.0),
+    "conversion_rate": (0.02, 0.05),
+    "roas": (1.6, 2.1),
+}
+
 
 def generate_seed_rows(
     days: int = 30,
@@ -69,31 +262,8 @@ def generate_seed_rows(
     start = today - timedelta(days=days - 1)
     countries = ("US", "GB", "DE", "FR", "CA")
     rng = Random(42)
-
-    profiles: dict[str, dict[str, tuple[float, float]]] = {
-        "google": {
-            "impressions": (1200, 4200),
-            "ctr": (0.045, 0.08),
-            "cpc": (0.9, 1.4),
-            "conversion_rate": (0.025, 0.05),
-            "roas": (1.85, 2.2),
-        },
-        "facebook": {
-            "impressions": (2800, 6400),
-            "ctr": (0.022, 0.05),
-            "cpc": (0.55, 0.9),
-            "conversion_rate": (0.02, 0.045),
-            "roas": (1.65, 2.05),
-        },
-    }
-
-    default_profile = {
-        "impressions": (1500, 4500),
-        "ctr": (0.03, 0.06),
-        "cpc": (0.6, 1.0),
-        "conversion_rate": (0.02, 0.05),
-        "roas": (1.6, 2.1),
-    }
+    profiles = SOURCE_PROFILES
+    default_profile = DEFAULT_SOURCE_PROFILE
 
     rows: list[SeedRow] = []
     campaign_id = 10_000
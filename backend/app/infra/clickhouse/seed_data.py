@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import argparse
 import logging
 import os
 from collections.abc import Callable, Sequence
@@ -10,7 +11,15 @@ from urllib.parse import urlparse
 
 from clickhouse_driver import Client as SyncClickHouseClient
 
-from .schema import TABLE_NAME, build_create_table_statement, generate_seed_rows
+from .bulk_seed import SeedReport, SeedScale, bulk_seed
+from .schema import (
+    DEFAULT_TABLE_LAYOUT,
+    ROLLUPS,
+    TABLE_LAYOUTS,
+    TABLE_NAME,
+    build_create_table_statement,
+    generate_seed_rows,
+)
 
 if TYPE_CHECKING:
     from .client import ClickHouseClient
@@ -35,18 +44,22 @@ def _seed_with_executor(
     days: int,
     sources: Sequence[str],
     create_database: bool,
+    layout: str = DEFAULT_TABLE_LAYOUT,
 ) -> int:
     sources_tuple = tuple(sources)
 
     if create_database:
         execute(f"CREATE DATABASE IF NOT EXISTS {database}")
-    execute(build_create_table_statement(database))
+    execute(build_create_table_statement(database, layout=layout))
 
     rows = generate_seed_rows(days=days, sources=sources_tuple)
     if not rows:
         raise RuntimeError("No rows generated for seed")
 
     execute(f"TRUNCATE TABLE {database}.{TABLE_NAME}")
+    # Materialized views only ever add rows, so rollups are emptied with their source.
+    for rollup in ROLLUPS:
+        execute(f"TRUNCATE TABLE IF EXISTS {database}.{rollup.name}")
     execute(
         f"INSERT INTO {database}.{TABLE_NAME} VALUES",
         rows,
@@ -68,6 +81,7 @@ def seed_clickhouse_with_client(
     *,
     days: int = 45,
     sources: Sequence[str] = ("google", "facebook"),
+    layout: str = DEFAULT_TABLE_LAYOUT,
 ) -> int:
     return _seed_with_executor(
         client.execute_sync,
@@ -75,6 +89,7 @@ def seed_clickhouse_with_client(
         days=days,
         sources=sources,
         create_database=False,
+        layout=layout,
     )
 
 
@@ -85,6 +100,7 @@ def seed_clickhouse(
     password: str,
     days: int = 45,
     sources: Sequence[str] = ("google", "facebook"),
+    layout: str = DEFAULT_TABLE_LAYOUT,
 ) -> int:
     host, port, database = parse_clickhouse_url(clickhouse_url)
     client = SyncClickHouseClient(host=host, port=port, database=database, user=user, password=password)
@@ -94,15 +110,107 @@ def seed_clickhouse(
         days=days,
         sources=sources,
         create_database=True,
+        layout=layout,
     )
 
 
-def main() -> None:
+def bulk_seed_clickhouse(
+    *,
+    clickhouse_url: str,
+    user: str,
+    password: str,
+    scale: SeedScale,
+    block_size: int,
+    workers: int,
+    layout: str = DEFAULT_TABLE_LAYOUT,
+) -> SeedReport:
+    """Load a large generated dataset, one connection per worker."""
+    host, port, database = parse_clickhouse_url(clickhouse_url)
+
+    def _connect() -> Callable[..., Any]:
+        client = SyncClickHouseClient(
+            host=host,
+            port=port,
+            database=database,
+            user=user,
+            password=password,
+            settings={"use_numpy": True},
+        )
+        execute: Callable[..., Any] = client.execute
+        return execute
+
+    return bulk_seed(
+        _connect,
+        database=database,
+        scale=scale,
+        block_size=block_size,
+        workers=workers,
+        create_database=True,
+        layout=layout,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Seed ClickHouse with demo data, or with --bulk a large generated dataset "
+        "of days x sources x campaigns x countries rows."
+    )
+    parser.add_argument(
+        "--days", type=int, default=None, help="Days of history (default 45, bulk 365)."
+    )
+    parser.add_argument("--sources", default="google,facebook", help="Comma-separated sources.")
+    parser.add_argument("--bulk", action="store_true", help="Use the vectorized bulk generator.")
+    parser.add_argument("--campaigns", type=int, default=100, help="Bulk: campaigns per source.")
+    parser.add_argument("--countries", type=int, default=10, help="Bulk: countries per campaign.")
+    parser.add_argument("--block-size", type=int, default=500_000, help="Bulk: rows per insert.")
+    parser.add_argument("--workers", type=int, default=1, help="Bulk: parallel inserters.")
+    parser.add_argument("--seed", type=int, default=42, help="Bulk: random seed.")
+    parser.add_argument(
+        "--layout",
+        choices=sorted(TABLE_LAYOUTS),
+        default=os.environ.get("CLICKHOUSE_TABLE_LAYOUT", DEFAULT_TABLE_LAYOUT),
+        help="Physical layout used if the table is created (default: CLICKHOUSE_TABLE_LAYOUT).",
+    )
+    args = parser.parse_args(argv)
+
     clickhouse_url = os.environ.get("CLICKHOUSE_URL", "clickhouse://localhost:9000/marketing")
     user = os.environ.get("CLICKHOUSE_USER", "default")
     password = os.environ.get("CLICKHOUSE_PASSWORD", "")
-
-    seed_clickhouse(clickhouse_url=clickhouse_url, user=user, password=password)
+    sources = tuple(source.strip() for source in args.sources.split(",") if source.strip())
+
+    if not args.bulk:
+        rows = seed_clickhouse(
+            clickhouse_url=clickhouse_url,
+            user=user,
+            password=password,
+            days=args.days or 45,
+            sources=sources,
+            layout=args.layout,
+        )
+        print(f"Inserted {rows:,} rows")
+        return
+
+    scale = SeedScale(
+        days=args.days or 365,
+        sources=sources,
+        campaigns_per_source=args.campaigns,
+        countries=args.countries,
+        seed=args.seed,
+    )
+    print(f"Generating {scale.total_rows:,} rows with {args.workers} worker(s)")
+    report = bulk_seed_clickhouse(
+        clickhouse_url=clickhouse_url,
+        user=user,
+        password=password,
+        scale=scale,
+        block_size=args.block_size,
+        workers=args.workers,
+        layout=args.layout,
+    )
+    print(
+        f"Inserted {report.rows:,} rows in {report.blocks} blocks in {report.seconds:.1f}s "
+        f"({report.rows_per_second:,.0f} rows/s)"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+"""Bounded, block-wise reading of ClickHouse results."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from ..serialization.columnar import ColumnarResult
+
+logger = logging.getLogger(__name__)
+
+# Rough per-value cost for non-string scalars, in bytes of JSON output.
+_SCALAR_SIZE = 16
+
+
+class QueryCancelledError(RuntimeError):
+    """Raised on a pool thread when the caller of a query has gone away."""
+
+
+@dataclass(frozen=True, slots=True)
+class ResultLimits:
+    max_rows: int
+    max_bytes: int
+    block_size: int
+
+    def query_settings(self) -> dict[str, Any]:
+        """Settings that let the server stop producing rows once the cap is reached.
+
+        With `result_overflow_mode=break` the server finishes the current block and
+        ends the query instead of failing it, so it may send up to one block more
+        than `max_result_rows`. Asking for one row beyond the cap is what lets the
+        client tell a truncated result from one that is exactly `max_rows` long.
+        """
+        return {
+            "max_block_size": self.block_size,
+            "max_result_rows": self.max_rows + 1,
+            "result_overflow_mode": "break",
+        }
+
+
+def estimate_size(value: Any) -> int:
+    """Cheap approximation of a value's serialized size."""
+    if isinstance(value, str | bytes):
+        return len(value) + 2
+    if isinstance(value, list | tuple):
+        return sum(estimate_size(item) for item in value) + 2
+    return _SCALAR_SIZE
+
+
+def read_bounded(
+    client: Any,
+    sql: str,
+    limits: ResultLimits,
+    settings: Mapping[str, Any] | None = None,
+    *,
+    query_id: str | None = None,
+    cancelled: threading.Event | None = None,
+) -> ColumnarResult:
+    """Stream `sql` through `client.execute_iter`, keeping at most `limits` in memory.
+
+    Rows are appended column by column as they arrive. When the row or byte cap
+    is hit the rest of the result is abandoned and the result is flagged as
+    truncated. `settings` are sent along with the result limits. Once `cancelled`
+    is set the query is abandoned at the next row and `QueryCancelledError` raised.
+    """
+    rows = client.execute_iter(
+        sql,
+        with_column_types=True,
+        settings={**(settings or {}), **limits.query_settings()},
+        query_id=query_id,
+    )
+    iterator = iter(rows)
+    column_types: list[tuple[str, str]] = next(iterator, [])
+    columns: list[str] = [name for name, _ in column_types]
+    data: list[list[Any]] = [[] for _ in columns]
+
+    row_count = 0
+    byte_count = 0
+    truncated = False
+    for row in iterator:
+        if cancelled is not None and cancelled.is_set():
+            _abandon_query(client)
+            raise QueryCancelledError(f"Query {query_id} cancelled by its caller")
+        row_bytes = sum(estimate_size(value) for value in row)
+        if row_count >= limits.max_rows or byte_count + row_bytes > limits.max_bytes:
+            truncated = True
+            break
+        for column, value in zip(data, row, strict=True):
+            column.append(value)
+        row_count += 1
+        byte_count += row_bytes
+
+    if truncated:
+        logger.warning(
+            "clickhouse_result_truncated rows=%s bytes=%s sql=%s", row_count, byte_count, sql[:80]
+        )
+        _abandon_query(client)
+
+    result = ColumnarResult(
+        columns=columns,
+        types=[type_name for _, type_name in column_types],
+        data=data,
+    )
+    if truncated:
+        result["truncated"] = True
+    return result
+
+
+def _abandon_query(client: Any) -> None:
+    """Stop a partially read query so the connection can be reused.
+
+    The driver requires reading up to end-of-stream after a cancel; remaining
+    packets are discarded rather than collected. If that fails the connection
+    is dropped, which also makes the server cancel the query.
+    """
+    try:
+        client.connection.send_cancel()
+        for _ in client.packet_generator():
+            pass
+    except Exception:  # noqa: BLE001
+        logger.warning("clickhouse_cancel_failed", exc_info=True)
+        client.disconnect()
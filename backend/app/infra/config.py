@@ -9,10 +9,10 @@ when deploying the service. Use `get_settings()` to obtain a cached instance.
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Any, Self
+from typing import Any, Literal, Self
 
 from dotenv import load_dotenv
-from pydantic import AnyUrl, Field, PositiveInt, SecretStr, model_validator
+from pydantic import AnyUrl, Field, PositiveFloat, PositiveInt, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 load_dotenv()
@@ -38,10 +38,45 @@ class Settings(BaseSettings):
 
     app_name: str = Field(default="marketing-analytics-agent", alias="APP_NAME")
     api_prefix: str = Field(default="/api/v1", alias="API_PREFIX")
+    metrics_enabled: bool = Field(default=True, alias="METRICS_ENABLED")
+    tracing_enabled: bool = Field(default=False, alias="TRACING_ENABLED")
+    tracing_exporter: Literal["log", "file"] = Field(default="file", alias="TRACING_EXPORTER")
+    tracing_file_path: str = Field(default="traces.jsonl", alias="TRACING_FILE_PATH")
+    tracing_min_duration_ms: float = Field(default=0.0, alias="TRACING_MIN_DURATION_MS", ge=0.0)
 
     clickhouse_url: ClickHouseUrl = Field(..., alias="CLICKHOUSE_URL")
     clickhouse_user: str = Field(..., alias="CLICKHOUSE_USER")
     clickhouse_password: SecretStr = Field(..., alias="CLICKHOUSE_PASSWORD")
+    clickhouse_pool_size: PositiveInt = Field(default=8, alias="CLICKHOUSE_POOL_SIZE")
+    clickhouse_pool_timeout_seconds: PositiveFloat = Field(
+        default=10.0, alias="CLICKHOUSE_POOL_TIMEOUT_SECONDS"
+    )
+    clickhouse_block_size: PositiveInt = Field(default=65536, alias="CLICKHOUSE_BLOCK_SIZE")
+    result_max_rows: PositiveInt = Field(default=100_000, alias="RESULT_MAX_ROWS")
+    result_max_bytes: PositiveInt = Field(default=32 * 1024 * 1024, alias="RESULT_MAX_BYTES")
+    # Server-side limits sent with every query; 0 means unlimited. ClickHouse truncates
+    # `max_execution_time` to whole seconds, so a fractional limit would become unlimited.
+    clickhouse_max_execution_seconds: int = Field(
+        default=30, alias="CLICKHOUSE_MAX_EXECUTION_SECONDS", ge=0
+    )
+    clickhouse_max_rows_to_read: int = Field(default=0, alias="CLICKHOUSE_MAX_ROWS_TO_READ", ge=0)
+    clickhouse_max_memory_bytes: int = Field(default=0, alias="CLICKHOUSE_MAX_MEMORY_BYTES", ge=0)
+    # EXPLAIN ESTIMATE budgets checked before execution; 0 disables a budget.
+    clickhouse_estimate_max_rows: int = Field(default=0, alias="CLICKHOUSE_ESTIMATE_MAX_ROWS", ge=0)
+    clickhouse_estimate_max_bytes: int = Field(
+        default=0, alias="CLICKHOUSE_ESTIMATE_MAX_BYTES", ge=0
+    )
+    clickhouse_estimate_action: Literal["reject", "limit"] = Field(
+        default="reject", alias="CLICKHOUSE_ESTIMATE_ACTION"
+    )
+    clickhouse_estimate_cache_seconds: PositiveInt = Field(
+        default=300, alias="CLICKHOUSE_ESTIMATE_CACHE_SECONDS"
+    )
+    clickhouse_rollups_enabled: bool = Field(default=False, alias="CLICKHOUSE_ROLLUPS_ENABLED")
+    # Physical layout for newly created tables; see schema.TABLE_LAYOUTS.
+    clickhouse_table_layout: Literal["basic", "compact", "sampled"] = Field(
+        default="basic", alias="CLICKHOUSE_TABLE_LAYOUT"
+    )
 
     redis_url: RedisUrl = Field(..., alias="REDIS_URL")
 
@@ -50,9 +85,85 @@ class Settings(BaseSettings):
     llm_temperature: float = Field(default=0.2, alias="LLM_TEMPERATURE", ge=0.0, le=2.0)
     llm_api_key: SecretStr | None = Field(default=None, alias="LLM_API_KEY")
     groq_api_key: SecretStr | None = Field(default=None, alias="GROQ_API_KEY")
+    llm_timeout_seconds: PositiveFloat = Field(default=60.0, alias="LLM_TIMEOUT_SECONDS")
+    llm_connect_timeout_seconds: PositiveFloat = Field(
+        default=5.0, alias="LLM_CONNECT_TIMEOUT_SECONDS"
+    )
+    llm_max_connections: PositiveInt = Field(default=64, alias="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: PositiveInt = Field(
+        default=16, alias="LLM_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    llm_keepalive_expiry_seconds: PositiveFloat = Field(
+        default=30.0, alias="LLM_KEEPALIVE_EXPIRY_SECONDS"
+    )
+    llm_max_retries: int = Field(default=2, alias="LLM_MAX_RETRIES", ge=0)
+    llm_stub_latency_ms: int = Field(default=0, alias="LLM_STUB_LATENCY_MS", ge=0)
+    llm_stub_responses_path: str | None = Field(default=None, alias="LLM_STUB_RESPONSES_PATH")
+    llm_cache_enabled: bool = Field(default=False, alias="LLM_CACHE_ENABLED")
+    llm_cache_backend: Literal["redis", "memory"] = Field(
+        default="redis", alias="LLM_CACHE_BACKEND"
+    )
+    llm_cache_sql_ttl_seconds: PositiveInt = Field(
+        default=7 * 86400, alias="LLM_CACHE_SQL_TTL_SECONDS"
+    )
+    llm_cache_summary_ttl_seconds: PositiveInt = Field(
+        default=86400, alias="LLM_CACHE_SUMMARY_TTL_SECONDS"
+    )
+    llm_cache_max_temperature: float = Field(
+        default=0.3, alias="LLM_CACHE_MAX_TEMPERATURE", ge=0.0, le=2.0
+    )
+    llm_cache_max_entries: PositiveInt = Field(default=4096, alias="LLM_CACHE_MAX_ENTRIES")
+    llm_cache_max_bytes: PositiveInt = Field(default=32 * 1024 * 1024, alias="LLM_CACHE_MAX_BYTES")
+
+    sql_policy_enabled: bool = Field(default=True, alias="SQL_POLICY_ENABLED")
+    sql_max_complexity: PositiveInt = Field(default=12, alias="SQL_MAX_COMPLEXITY")
+    prompt_reload_enabled: bool = Field(default=False, alias="PROMPT_RELOAD_ENABLED")
+    summary_mode: Literal["llm", "auto", "local"] = Field(default="llm", alias="SUMMARY_MODE")
+    summary_local_max_categories: PositiveInt = Field(
+        default=50, alias="SUMMARY_LOCAL_MAX_CATEGORIES"
+    )
 
     cache_ttl_seconds: PositiveInt = Field(default=3600, alias="CACHE_TTL_SECONDS")
+    # Past CACHE_TTL_SECONDS, answers stay servable (marked stale) for this long while a
+    # background refresh runs; 0 keeps the hard expiry.
+    cache_stale_ttl_seconds: int = Field(default=0, alias="CACHE_STALE_TTL_SECONDS", ge=0)
+    cache_l1_enabled: bool = Field(default=False, alias="CACHE_L1_ENABLED")
+    cache_l1_max_entries: PositiveInt = Field(default=1024, alias="CACHE_L1_MAX_ENTRIES")
+    cache_l1_max_bytes: PositiveInt = Field(default=64 * 1024 * 1024, alias="CACHE_L1_MAX_BYTES")
+    cache_l1_ttl_seconds: PositiveInt = Field(default=60, alias="CACHE_L1_TTL_SECONDS")
+    cache_invalidation_channel: str = Field(
+        default="cache:invalidate", alias="CACHE_INVALIDATION_CHANNEL"
+    )
+    similarity_enabled: bool = Field(default=False, alias="SIMILARITY_ENABLED")
+    similarity_threshold: float = Field(default=0.9, alias="SIMILARITY_THRESHOLD", gt=0.0, le=1.0)
+    similarity_num_perm: PositiveInt = Field(default=64, alias="SIMILARITY_NUM_PERM")
+    similarity_bands: PositiveInt = Field(default=16, alias="SIMILARITY_BANDS")
+    similarity_ttl_seconds: PositiveInt = Field(default=86400, alias="SIMILARITY_TTL_SECONDS")
+    singleflight_lease_ttl_seconds: PositiveInt = Field(
+        default=60, alias="SINGLEFLIGHT_LEASE_TTL_SECONDS"
+    )
+    singleflight_wait_timeout_seconds: PositiveInt = Field(
+        default=30, alias="SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS"
+    )
+    singleflight_poll_interval_ms: PositiveInt = Field(
+        default=100, alias="SINGLEFLIGHT_POLL_INTERVAL_MS"
+    )
+    cache_warm_enabled: bool = Field(default=False, alias="CACHE_WARM_ENABLED")
+    cache_warm_questions_path: str | None = Field(default=None, alias="CACHE_WARM_QUESTIONS_PATH")
+    cache_warm_redis_key: str | None = Field(
+        default="cache:warm:questions", alias="CACHE_WARM_REDIS_KEY"
+    )
+    cache_warm_interval_seconds: int = Field(default=900, alias="CACHE_WARM_INTERVAL_SECONDS", ge=0)
+    cache_warm_concurrency: PositiveInt = Field(default=2, alias="CACHE_WARM_CONCURRENCY")
+    cache_warm_llm_calls_per_minute: PositiveInt = Field(
+        default=20, alias="CACHE_WARM_LLM_CALLS_PER_MINUTE"
+    )
+    batch_max_size: PositiveInt = Field(default=200, alias="BATCH_MAX_SIZE")
+    batch_concurrency: PositiveInt = Field(default=8, alias="BATCH_CONCURRENCY")
     rate_limit_per_minute: PositiveInt = Field(default=30, alias="RATE_LIMIT_PER_MINUTE")
+    # Query endpoints give up (and cancel their work) after this long; 0 waits indefinitely.
+    request_timeout_seconds: float = Field(default=0.0, alias="REQUEST_TIMEOUT_SECONDS", ge=0.0)
+    request_disconnect_poll_ms: PositiveInt = Field(default=250, alias="REQUEST_DISCONNECT_POLL_MS")
     cors_allowed_origin: str | None = Field(default=None, alias="CORS_ALLOWED_ORIGIN")
 
     @model_validator(mode="after")
@@ -63,6 +174,8 @@ class Settings(BaseSettings):
                 object.__setattr__(self, "llm_api_key", self.groq_api_key)
             if self.llm_api_key is None:
                 raise ValueError("LLM_API_KEY is required when LLM_PROVIDER='groq'")
+        elif provider == "stub":
+            pass
         elif provider in {"openai", "vertex"}:
             if self.llm_api_key is None:
                 raise ValueError(f"LLM_API_KEY is required when LLM_PROVIDER='{provider}'")
@@ -80,9 +193,24 @@ class Settings(BaseSettings):
             "llm_model": self.llm_model,
             "llm_temperature": self.llm_temperature,
             "cache_ttl_seconds": self.cache_ttl_seconds,
+            "cache_stale_ttl_seconds": self.cache_stale_ttl_seconds,
+            "cache_l1_enabled": self.cache_l1_enabled,
+            "llm_cache_enabled": self.llm_cache_enabled,
+            "metrics_enabled": self.metrics_enabled,
+            "tracing_enabled": self.tracing_enabled,
+            "summary_mode": self.summary_mode,
+            "cache_warm_enabled": self.cache_warm_enabled,
+            "similarity_enabled": self.similarity_enabled,
+            "similarity_threshold": self.similarity_threshold,
             "rate_limit_per_minute": self.rate_limit_per_minute,
+            "request_timeout_seconds": self.request_timeout_seconds,
             "cors_allowed_origin": self.cors_allowed_origin or "disabled",
             "clickhouse_url": str(self.clickhouse_url),
+            "clickhouse_table_layout": self.clickhouse_table_layout,
+            "clickhouse_max_execution_seconds": self.clickhouse_max_execution_seconds,
+            "clickhouse_estimate_max_rows": self.clickhouse_estimate_max_rows,
+            "clickhouse_estimate_max_bytes": self.clickhouse_estimate_max_bytes,
+            "clickhouse_estimate_action": self.clickhouse_estimate_action,
             "redis_url": str(self.redis_url),
         }
 
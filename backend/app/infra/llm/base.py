@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import Protocol
 
 
@@ -11,3 +12,17 @@ class LLMClientProtocol(Protocol):
     async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
         """Generate a text completion for the given prompt."""
         raise NotImplementedError
+
+    async def stream_text(
+        self, prompt: str, *, temperature: float | None = None
+    ) -> AsyncIterator[str]:
+        """Yield the completion incrementally.
+
+        Providers without native streaming inherit this fallback, which yields the
+        whole completion as a single chunk.
+        """
+        yield await self.generate_text(prompt, temperature=temperature)
+
+    async def aclose(self) -> None:
+        """Release network resources held by the client."""
+        return None
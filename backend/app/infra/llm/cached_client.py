@@ -0,0 +1,208 @@
+"""Content-addressed completion cache wrapped around any LLM client."""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Protocol
+
+from ..cache.client import RedisCache
+from ..cache.keys import llm_completion_key
+from ..cache.local import LocalCache
+from ..config import Settings
+from ..tracing import span
+from .base import LLMClientProtocol
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionStore(Protocol):
+    """Storage backend for cached completions."""
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, text: str, ttl_seconds: int) -> None: ...
+
+
+class RedisCompletionStore:
+    """Completions shared across workers through Redis (and its optional L1 tier)."""
+
+    def __init__(self, cache: RedisCache) -> None:
+        self._cache = cache
+
+    async def get(self, key: str) -> str | None:
+        entry = await self._cache.read(key)
+        text = entry.get("text") if entry else None
+        return text if isinstance(text, str) else None
+
+    async def set(self, key: str, text: str, ttl_seconds: int) -> None:
+        await self._cache.write(key, {"text": text}, ttl_seconds=ttl_seconds)
+
+
+class MemoryCompletionStore:
+    """Per-process completions held in a bounded `LocalCache`."""
+
+    def __init__(self, local: LocalCache) -> None:
+        self._local = local
+
+    async def get(self, key: str) -> str | None:
+        text = self._local.get(key)
+        return text if isinstance(text, str) else None
+
+    async def set(self, key: str, text: str, ttl_seconds: int) -> None:
+        self._local.set(key, text, size=len(text), ttl_seconds=ttl_seconds)
+
+
+def build_completion_store(
+    settings: Settings, cache: RedisCache, *, ttl_seconds: int
+) -> CompletionStore:
+    """Store for one cached client; `ttl_seconds` is that client's completion TTL."""
+    if settings.llm_cache_backend == "memory":
+        return MemoryCompletionStore(
+            LocalCache(
+                max_entries=settings.llm_cache_max_entries,
+                max_bytes=settings.llm_cache_max_bytes,
+                ttl_seconds=ttl_seconds,
+            )
+        )
+    return RedisCompletionStore(cache)
+
+
+@dataclass(frozen=True, slots=True)
+class LLMCacheStats:
+    hits: int
+    misses: int
+    bypassed: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def completion_digest(model: str, temperature: float, prompt: str) -> str:
+    payload = json.dumps([model, temperature, prompt], ensure_ascii=False)
+    return sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedLLMClient(LLMClientProtocol):
+    """Serve repeated prompts from a completion cache before calling `inner`.
+
+    Entries are keyed on (model, temperature, prompt), so any change to the
+    rendered prompt, including the dataset embedded in summary prompts, is a
+    miss. Calls above `max_temperature` are passed through uncached since their
+    completions are not expected to repeat. `name` labels the log lines and stats.
+    Callers that must validate a completion before it is reused call the inner
+    client themselves and use `cached_text` and `store_text` around it.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClientProtocol,
+        store: CompletionStore,
+        *,
+        name: str,
+        model: str,
+        default_temperature: float,
+        max_temperature: float,
+        ttl_seconds: int,
+    ) -> None:
+        self._inner = inner
+        self._store = store
+        self._name = name
+        self._model = model
+        self._default_temperature = default_temperature
+        self._max_temperature = max_temperature
+        self._ttl_seconds = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def stats(self) -> LLMCacheStats:
+        return LLMCacheStats(hits=self._hits, misses=self._misses, bypassed=self._bypassed)
+
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        key = self._key(prompt, temperature)
+        if key is None:
+            return await self._inner.generate_text(prompt, temperature=temperature)
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached
+        text = await self._inner.generate_text(prompt, temperature=temperature)
+        await self._store_completion(key, text)
+        return text
+
+    async def cached_text(self, prompt: str, *, temperature: float | None = None) -> str | None:
+        """The cached completion of `prompt`, without calling the model on a miss."""
+        key = self._key(prompt, temperature)
+        return None if key is None else await self._lookup(key)
+
+    async def store_text(self, prompt: str, text: str, *, temperature: float | None = None) -> None:
+        """Cache `text` as the completion of `prompt`."""
+        key = self._completion_key(prompt, temperature)
+        if key is not None:
+            await self._store_completion(key, text)
+
+    async def stream_text(
+        self, prompt: str, *, temperature: float | None = None
+    ) -> AsyncIterator[str]:
+        key = self._key(prompt, temperature)
+        if key is None:
+            async for chunk in self._inner.stream_text(prompt, temperature=temperature):
+                yield chunk
+            return
+        cached = await self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+        parts: list[str] = []
+        async for chunk in self._inner.stream_text(prompt, temperature=temperature):
+            parts.append(chunk)
+            yield chunk
+        # Only a stream consumed to the end is a complete completion worth caching.
+        await self._store_completion(key, "".join(parts).strip())
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def _key(self, prompt: str, temperature: float | None) -> str | None:
+        key = self._completion_key(prompt, temperature)
+        if key is None:
+            self._bypassed += 1
+        return key
+
+    def _completion_key(self, prompt: str, temperature: float | None) -> str | None:
+        effective = self._default_temperature if temperature is None else temperature
+        if effective > self._max_temperature:
+            return None
+        return llm_completion_key(completion_digest(self._model, effective, prompt))
+
+    async def _lookup(self, key: str) -> str | None:
+        with span("llm_cache.lookup", cache=self._name) as lookup_span:
+            try:
+                cached = await self._store.get(key)
+            except Exception:  # noqa: BLE001
+                logger.warning("llm_cache_read_failed cache=%s", self._name, exc_info=True)
+                cached = None
+            lookup_span.set(hit=cached is not None)
+        if cached is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        logger.info("llm_cache_hit cache=%s hit_rate=%.2f", self._name, self.stats().hit_rate)
+        return cached
+
+    async def _store_completion(self, key: str, text: str) -> None:
+        if not text:
+            return
+        try:
+            await self._store.set(key, text, self._ttl_seconds)
+        except Exception:  # noqa: BLE001
+            logger.warning("llm_cache_write_failed cache=%s", self._name, exc_info=True)
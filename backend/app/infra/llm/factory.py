@@ -5,6 +5,7 @@ from __future__ import annotations
 from ..config import Settings, get_settings
 from .base import LLMClientProtocol
 from .groq_client import GroqClient
+from .stub_client import StubLLMClient
 
 
 class ProviderNotConfiguredError(RuntimeError):
@@ -18,6 +19,8 @@ def get_llm_client(settings: Settings | None = None) -> LLMClientProtocol:
 
     if provider == "groq":
         return GroqClient(settings)
+    if provider == "stub":
+        return StubLLMClient(settings)
     if provider == "openai":
         raise ProviderNotConfiguredError("OpenAI provider is not yet configured")
     if provider == "vertex":
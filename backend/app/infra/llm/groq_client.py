@@ -2,33 +2,63 @@
 
 from __future__ import annotations
 
-import asyncio
+from collections.abc import AsyncIterator
 from typing import cast
 
-from groq import Groq
+import httpx
+from groq import AsyncGroq
 
 from ..config import Settings, get_settings
+from ..tracing import span, start_span
 from .base import LLMClientProtocol
 
 
+def build_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Shared keep-alive HTTP client sized by the `LLM_*` connection settings."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds
+        ),
+    )
+
+
 class GroqClient(LLMClientProtocol):
-    """Concrete implementation of `LLMClientProtocol` backed by Groq."""
+    """Concrete implementation of `LLMClientProtocol` backed by Groq.
 
-    def __init__(self, settings: Settings | None = None) -> None:
+    Uses the SDK's async client on top of one pooled `httpx.AsyncClient`, so
+    concurrent completions share connections instead of each holding a thread.
+    """
+
+    def __init__(
+        self, settings: Settings | None = None, *, http_client: httpx.AsyncClient | None = None
+    ) -> None:
         self._settings = settings or get_settings()
         secret = self._settings.llm_api_key
         if secret is None:
             raise RuntimeError("LLM_API_KEY is required for Groq client initialisation")
         self._model = self._settings.llm_model
         self._temperature = self._settings.llm_temperature
-        self._client = Groq(api_key=secret.get_secret_value())
+        self._http_client = http_client or build_http_client(self._settings)
+        self._client = AsyncGroq(
+            api_key=secret.get_secret_value(),
+            http_client=self._http_client,
+            max_retries=self._settings.llm_max_retries,
+        )
 
     async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
-        def _invoke() -> str:
-            completion = self._client.chat.completions.create(
+        effective = self._temperature if temperature is None else temperature
+        with span(
+            "llm.generate", model=self._model, prompt_chars=len(prompt), temperature=effective
+        ) as llm_span:
+            completion = await self._client.chat.completions.create(
                 model=self._model,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=self._temperature if temperature is None else temperature,
+                temperature=effective,
             )
             choices = completion.choices or []
             if not choices:
@@ -37,6 +67,38 @@ class GroqClient(LLMClientProtocol):
             content = cast(str | None, getattr(message, "content", None))
             if not content:
                 raise RuntimeError("Groq completion returned empty message content")
+            llm_span.set(completion_chars=len(content))
             return content.strip()
 
-        return await asyncio.to_thread(_invoke)
+    async def stream_text(
+        self, prompt: str, *, temperature: float | None = None
+    ) -> AsyncIterator[str]:
+        effective = self._temperature if temperature is None else temperature
+        llm_span = start_span(
+            "llm.stream", model=self._model, prompt_chars=len(prompt), temperature=effective
+        )
+        completion_chars = 0
+        try:
+            stream = await self._client.chat.completions.create(
+                model=self._model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=effective,
+                stream=True,
+            )
+            async for chunk in stream:
+                choices = chunk.choices or []
+                if not choices:
+                    continue
+                delta = cast(str | None, getattr(choices[0].delta, "content", None))
+                if delta:
+                    completion_chars += len(delta)
+                    yield delta
+        except BaseException as exc:
+            llm_span.record_error(exc)
+            raise
+        finally:
+            llm_span.set(completion_chars=completion_chars)
+            llm_span.end()
+
+    async def aclose(self) -> None:
+        await self._http_client.aclose()
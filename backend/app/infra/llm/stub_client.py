@@ -0,0 +1,107 @@
+"""Deterministic offline LLM provider for local runs, load tests and benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..clickhouse.schema import TABLE_NAME
+from ..config import Settings, get_settings
+from .base import LLMClientProtocol
+
+_SQL_QUESTION_MARKER = "New question:"
+_SUMMARY_QUESTION = re.compile(r"^User question: (?P<question>.+)$", re.MULTILINE)
+_STREAM_TOKEN = re.compile(r"\S+\s*")
+
+
+@dataclass(frozen=True, slots=True)
+class CannedCompletion:
+    """Completion returned when every keyword occurs in the question (case-insensitive)."""
+
+    keywords: tuple[str, ...]
+    text: str
+
+    def matches(self, question: str) -> bool:
+        lowered = question.lower()
+        return all(keyword in lowered for keyword in self.keywords)
+
+
+def _grouped_sql(dimension: str) -> str:
+    return (
+        f"SELECT {dimension}, sum(spend) AS total_spend, sum(clicks) AS total_clicks, "
+        "round(sum(revenue) / nullIf(sum(spend), 0), 2) AS roas "
+        f"FROM {TABLE_NAME} "
+        "WHERE date >= subtractDays(today(), 30) AND date < today() "
+        f"GROUP BY {dimension} ORDER BY total_spend DESC LIMIT 100"
+    )
+
+
+DEFAULT_SQL_COMPLETIONS: tuple[CannedCompletion, ...] = (
+    CannedCompletion(("campaign",), _grouped_sql("campaign_name")),
+    CannedCompletion(("country",), _grouped_sql("country")),
+    CannedCompletion(("daily",), _grouped_sql("date")),
+    CannedCompletion((), _grouped_sql("source")),
+)
+
+
+def load_completions(path: str | Path) -> tuple[CannedCompletion, ...]:
+    """Read canned completions from a JSON list of `{"keywords": [...], "text": ...}`."""
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    return tuple(
+        CannedCompletion(tuple(k.lower() for k in item.get("keywords", ())), item["text"])
+        for item in raw
+    )
+
+
+class StubLLMClient(LLMClientProtocol):
+    """Replays canned completions after a fixed delay, without any network access.
+
+    SQL prompts are answered with the first canned SQL whose keywords all occur
+    in the question; summary prompts get a fixed sentence naming the question.
+    The same prompt always yields the same completion.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        *,
+        sql_completions: Sequence[CannedCompletion] | None = None,
+    ) -> None:
+        self._settings = settings or get_settings()
+        self._latency = self._settings.llm_stub_latency_ms / 1000
+        if sql_completions is None:
+            path = self._settings.llm_stub_responses_path
+            sql_completions = load_completions(path) if path else DEFAULT_SQL_COMPLETIONS
+        self._sql_completions = tuple(sql_completions)
+
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return self._complete(prompt)
+
+    async def stream_text(
+        self, prompt: str, *, temperature: float | None = None
+    ) -> AsyncIterator[str]:
+        tokens = _STREAM_TOKEN.findall(self._complete(prompt))
+        # Spread the configured latency over the tokens, like a real stream.
+        delay = self._latency / max(len(tokens), 1)
+        for token in tokens:
+            if delay:
+                await asyncio.sleep(delay)
+            yield token
+
+    def _complete(self, prompt: str) -> str:
+        summary = _SUMMARY_QUESTION.search(prompt)
+        if summary is not None:
+            question = summary.group("question").strip()
+            return f"Stub summary for '{question}': results returned by the executed query."
+
+        _, _, question = prompt.rpartition(_SQL_QUESTION_MARKER)
+        for completion in self._sql_completions:
+            if completion.matches(question):
+                return completion.text
+        return self._sql_completions[-1].text if self._sql_completions else "SELECT 1"
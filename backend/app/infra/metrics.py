@@ -0,0 +1,454 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Instruments are plain Python objects; all formatting happens when `/metrics`
+is scraped. Hot paths bind a series once with `labels()` and update it with a
+few additions under an uncontended lock, as prometheus_client does.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+LabelValues = tuple[str, ...]
+_C = TypeVar("_C")
+
+# Seconds; spans cache round trips (sub-millisecond) up to slow LLM calls.
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+ROW_BUCKETS: tuple[float, ...] = (0, 1, 10, 100, 1_000, 10_000, 100_000)
+BYTE_BUCKETS: tuple[float, ...] = (1_024, 16_384, 131_072, 1_048_576, 8_388_608, 33_554_432)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(Generic[_C]):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._children: dict[LabelValues, _C] = {}
+
+    def labels(self, *values: str, **labels: str) -> _C:
+        """Series for one set of label values; bind it once to update it without lookups.
+
+        Values are given positionally in `label_names` order, or by name.
+        """
+        key = values if values else self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names) or (values and labels):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> _C:
+        raise NotImplementedError
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        try:
+            key = tuple(labels[name] for name in self.label_names)
+        except KeyError:
+            key = ()
+        if len(key) != len(labels) or len(key) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        return key
+
+    def _items(self) -> list[tuple[LabelValues, _C]]:
+        with self._lock:
+            return sorted(self._children.items(), key=lambda item: item[0])
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class CounterChild:
+    """One series of a counter or gauge, returned by `labels()`."""
+
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+
+class GaugeChild(CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+
+class Counter(_Metric[CounterChild]):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self.labels(**labels).inc(amount)
+
+    def value(self, **labels: str) -> float:
+        child = self._children.get(self._key(labels))
+        return child.value if child else 0.0
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(child.value)}"
+            for key, child in self._items()
+        ]
+
+
+class Gauge(_Metric[GaugeChild]):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self.labels(**labels).inc(amount)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.labels(**labels).dec(amount)
+
+    def set(self, value: float, **labels: str) -> None:
+        self.labels(**labels).set(value)
+
+    def value(self, **labels: str) -> float:
+        child = self._children.get(self._key(labels))
+        return child.value if child else 0.0
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(child.value)}"
+            for key, child in self._items()
+        ]
+
+
+class HistogramChild:
+    """One series of a histogram, returned by `labels()`.
+
+    Counts are stored per bucket and accumulated when rendering.
+    """
+
+    __slots__ = ("_buckets", "counts", "total", "count", "_lock")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+class Histogram(_Metric[HistogramChild]):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        self.labels(**labels).observe(value)
+
+    def count(self, **labels: str) -> int:
+        child = self._children.get(self._key(labels))
+        return child.count if child else 0
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def samples(self) -> list[str]:
+        lines: list[str] = []
+        names = (*self.label_names, "le")
+        for key, child in self._items():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels(names, (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            suffix = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+@dataclass(slots=True)
+class GaugeFamily:
+    """Gauge values computed at scrape time, e.g. from a component's `stats()`."""
+
+    name: str
+    documentation: str
+    label_names: tuple[str, ...] = ()
+    values: list[tuple[LabelValues, float]] = field(default_factory=list)
+    kind: str = "gauge"
+
+    def add(self, value: float, *labels: str) -> GaugeFamily:
+        self.values.append((labels, value))
+        return self
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in self.values
+        ]
+
+
+_M = TypeVar("_M", bound=_Metric[Any])
+
+
+class MetricsRegistry:
+    """Holds the process's instruments and renders them for scraping."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric[Any]] = {}
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets=buckets))
+
+    def render(self, extra: Iterable[GaugeFamily] = ()) -> str:
+        lines: list[str] = []
+        metrics: list[_Metric[Any] | GaugeFamily] = [*self._metrics.values(), *extra]
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _M) -> _M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "orchestrator_stage_seconds",
+    "Time spent in each stage of the question-to-answer pipeline.",
+    ("stage",),
+)
+STAGE_IN_FLIGHT = registry.gauge(
+    "orchestrator_stage_in_flight", "Pipeline stages currently executing.", ("stage",)
+)
+REQUEST_SECONDS = registry.histogram(
+    "orchestrator_request_seconds",
+    "End-to-end latency of answered questions by how they were served.",
+    ("mode", "outcome"),
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "orchestrator_requests_in_flight", "Questions currently being answered.", ("mode",)
+)
+CACHE_LOOKUPS = registry.counter(
+    "orchestrator_cache_lookups_total",
+    "Answer and result cache lookups by outcome.",
+    ("cache", "result"),
+)
+SQL_REJECTIONS = registry.counter(
+    "orchestrator_sql_rejections_total",
+    "Generated SQL rejected before reaching ClickHouse.",
+    ("reason",),
+)
+ROLLUP_QUERIES = registry.counter(
+    "orchestrator_query_tables_total",
+    "ClickHouse queries by the table they read: the base table or a rollup.",
+    ("table",),
+)
+QUERY_GUARD_DECISIONS = registry.counter(
+    "clickhouse_query_guard_total",
+    "Pre-execution cost checks by decision: allowed, limited, rejected or unestimated.",
+    ("decision",),
+)
+QUERY_CANCELLATIONS = registry.counter(
+    "clickhouse_query_cancellations_total",
+    "Queries whose caller went away: killed on the server, kill failed, or not_started.",
+    ("result",),
+)
+REQUEST_CANCELLATIONS = registry.counter(
+    "orchestrator_request_cancellations_total",
+    "Requests abandoned before an answer was ready, by reason: disconnect or deadline.",
+    ("reason",),
+)
+RESULT_ROWS = registry.histogram(
+    "orchestrator_result_rows",
+    "Rows returned by ClickHouse per query.",
+    buckets=ROW_BUCKETS,
+)
+RESULT_BYTES = registry.histogram(
+    "orchestrator_result_bytes",
+    "Approximate size of ClickHouse results per query.",
+    buckets=BYTE_BUCKETS,
+)
+REVALIDATIONS = registry.counter(
+    "orchestrator_revalidations_total",
+    "Background refreshes of stale answers by outcome.",
+    ("result",),
+)
+WARM_QUESTIONS = registry.counter(
+    "cache_warm_questions_total",
+    "Questions handled by the cache warmer by outcome.",
+    ("result",),
+)
+WARM_PENDING = registry.gauge(
+    "cache_warm_pending", "Questions left in the running cache warming pass."
+)
+WARM_RUN_SECONDS = registry.histogram(
+    "cache_warm_run_seconds",
+    "Duration of cache warming passes.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800),
+)
+WARM_LAST_RUN = registry.gauge(
+    "cache_warm_last_run_timestamp_seconds", "Unix time the last warming pass finished."
+)
+
+
+class StageTimer:
+    """Context manager from `track_stage`; a slotted class is cheaper than a generator."""
+
+    __slots__ = ("_seconds", "_in_flight", "_started")
+
+    def __init__(self, seconds: HistogramChild, in_flight: GaugeChild) -> None:
+        self._seconds = seconds
+        self._in_flight = in_flight
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._in_flight.inc()
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._seconds.observe(time.perf_counter() - self._started)
+        self._in_flight.dec()
+
+
+_STAGE_SERIES: dict[str, tuple[HistogramChild, GaugeChild]] = {}
+
+
+def track_stage(stage: str) -> StageTimer:
+    """Time `stage` into `STAGE_SECONDS` while counting it as in flight."""
+    series = _STAGE_SERIES.get(stage)
+    if series is None:
+        series = _STAGE_SERIES[stage] = (STAGE_SECONDS.labels(stage), STAGE_IN_FLIGHT.labels(stage))
+    return StageTimer(*series)
+
+
+class RequestTimer:
+    """Context manager from `track_request`; callers set `outcome` before leaving."""
+
+    __slots__ = ("mode", "outcome", "started", "_in_flight")
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.outcome = "error"
+        self.started = 0.0
+        self._in_flight = REQUESTS_IN_FLIGHT.labels(mode)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def __enter__(self) -> RequestTimer:
+        self._in_flight.inc()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._in_flight.dec()
+        REQUEST_SECONDS.labels(self.mode, self.outcome).observe(self.elapsed)
+
+
+def track_request(mode: str) -> RequestTimer:
+    """Count a question as in flight and record its latency labelled by outcome."""
+    return RequestTimer(mode)
@@ -0,0 +1,41 @@
+"""Columnar result representation shared by ClickHouse, the cache and the API."""
+
+from __future__ import annotations
+
+from typing import Any, Literal, NotRequired, TypedDict
+
+ResultFormat = Literal["rows", "columnar"]
+
+
+class ColumnarResult(TypedDict):
+    """Result set stored column by column, so column names appear once.
+
+    `truncated` is set when the result was cut off at the configured row or byte cap.
+    """
+
+    columns: list[str]
+    types: list[str]
+    data: list[list[Any]]
+    truncated: NotRequired[bool]
+
+
+def columnar_row_count(result: ColumnarResult) -> int:
+    return len(result["data"][0]) if result["data"] else 0
+
+
+def columnar_to_rows(result: ColumnarResult, *, limit: int | None = None) -> list[dict[str, Any]]:
+    """Pivot a columnar result into row dicts, optionally only the first `limit` rows."""
+    columns = result["columns"]
+    values = result["data"]
+    if limit is not None:
+        values = [column[:limit] for column in values]
+    if not columns:
+        return []
+    return [dict(zip(columns, row, strict=True)) for row in zip(*values, strict=True)]
+
+
+def present_result(result: ColumnarResult, result_format: ResultFormat) -> Any:
+    """Render a columnar result in the format requested by the client."""
+    if result_format == "columnar":
+        return result
+    return columnar_to_rows(result)
@@ -0,0 +1,12 @@
+"""Server-Sent Events framing helpers."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .json_utils import to_json
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one SSE message with a JSON payload."""
+    return f"event: {event}\ndata: {to_json(data)}\n\n"
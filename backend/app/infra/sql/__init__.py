@@ -1,10 +1,23 @@
 """SQL normalization and validation utilities for ClickHouse."""
 
-from .normalizer import SQLNormalizationError, normalize_sql_for_clickhouse
-from .validator import validate_clickhouse_sql
+from .normalizer import (
+    NormalizedSQL,
+    SQLNormalizationError,
+    normalize_sql_for_clickhouse,
+    normalize_sql_statement,
+)
+from .rollups import RollupRewrite, rewrite_for_rollups
+from .validator import SQLAnalysis, SQLPolicy, validate_clickhouse_ast, validate_clickhouse_sql
 
 __all__ = [
+    "NormalizedSQL",
+    "RollupRewrite",
+    "SQLAnalysis",
     "SQLNormalizationError",
+    "SQLPolicy",
     "normalize_sql_for_clickhouse",
+    "normalize_sql_statement",
+    "rewrite_for_rollups",
+    "validate_clickhouse_ast",
     "validate_clickhouse_sql",
 ]
@@ -0,0 +1,76 @@
+"""Canonical SQL fingerprints that identify queries independent of formatting."""
+
+from __future__ import annotations
+
+from functools import lru_cache, reduce
+from hashlib import sha256
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+FINGERPRINT_CACHE_SIZE = 1024
+
+# Operators whose operands can be reordered without changing the result.
+_COMMUTATIVE_BINARY = (exp.EQ, exp.NEQ, exp.Add, exp.Mul)
+_COMMUTATIVE_CONNECTORS = (exp.And, exp.Or)
+
+
+def _sort_key(node: exp.Expression) -> str:
+    return node.sql(dialect="clickhouse")
+
+
+def _canonicalize_node(node: exp.Expression) -> exp.Expression | None:
+    """Return a replacement for `node`, or None when it is already canonical."""
+    if isinstance(node, exp.Identifier) and node.quoted:
+        node.set("quoted", False)
+        return None
+    if isinstance(node, exp.Anonymous) and isinstance(node.this, str):
+        node.set("this", node.this.lower())
+        return None
+    if isinstance(node, _COMMUTATIVE_BINARY):
+        left, right = node.this, node.expression
+        if _sort_key(left) > _sort_key(right):
+            node.set("this", right)
+            node.set("expression", left)
+        return None
+    if isinstance(node, _COMMUTATIVE_CONNECTORS) and not isinstance(node.parent, type(node)):
+        connector = type(node)
+        operands = sorted(node.flatten(), key=_sort_key)  # type: ignore[no-untyped-call]
+        combined: exp.Expression = reduce(
+            lambda left, right: connector(this=left, expression=right), operands
+        )
+        return combined
+    return None
+
+
+def canonical_sql(sql: str) -> str:
+    """Render SQL in a canonical ClickHouse form.
+
+    Identifiers are unquoted, function names are lower-cased and operands of
+    commutative operators (AND/OR chains, =, !=, +, *) are sorted. Literals and
+    aliases are kept verbatim because they change the rows a query returns. SQL
+    that sqlglot cannot parse falls back to whitespace-collapsed text.
+    """
+    try:
+        root = sqlglot.parse_one(sql, read="clickhouse")
+    except SqlglotError:
+        return " ".join(sql.split())
+
+    # Reversed pre-order visits every descendant before its ancestors, so each
+    # node is canonicalised after its children and sort keys are stable.
+    for node in reversed(list(root.walk(bfs=False))):
+        replacement = _canonicalize_node(node)
+        if replacement is None:
+            continue
+        if node is root:
+            root = replacement
+        else:
+            node.replace(replacement)
+    return root.sql(dialect="clickhouse", normalize_functions="lower")
+
+
+@lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def sql_fingerprint(sql: str) -> str:
+    """Hash of `canonical_sql`; memoized because a request keys the same SQL several times."""
+    return sha256(canonical_sql(sql).encode("utf-8")).hexdigest()
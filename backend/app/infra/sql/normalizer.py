@@ -1,13 +1,32 @@
+"""Single-pass normalization of LLM-generated SQL into validated ClickHouse SQL."""
+
 from __future__ import annotations
 
 import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
 from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect
 from sqlglot.errors import SqlglotError
-from sqlglot.tokens import TokenType, Tokenizer
-import sqlglot
+from sqlglot.tokens import Token, TokenType
+
+from .validator import SQLAnalysis, SQLPolicy, validate_clickhouse_ast, validate_clickhouse_sql
 
 logger = logging.getLogger(__name__)
 
+NORMALIZE_CACHE_SIZE = 1024
+
+_MYSQL_HINTS = re.compile(r"`|\bLIMIT\s+\d+\s*,", re.IGNORECASE)
+_POSTGRES_HINTS = re.compile(r"::|\bILIKE\b|\bINTERVAL\s+'", re.IGNORECASE)
+
+_DATE_TRUNC_FUNCTIONS = {
+    "MONTH": "toStartOfMonth",
+    "QUARTER": "toStartOfQuarter",
+    "YEAR": "toStartOfYear",
+}
+
 _CLAUSE_BOUNDARIES = {
     TokenType.WHERE,
     TokenType.GROUP_BY,
@@ -38,54 +57,153 @@ class SQLNormalizationError(ValueError):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class NormalizedSQL:
+    """Normalized SQL text and the AST it was rendered from.
+
+    `expression` and `analysis` are None when the input could not be parsed and
+    was accepted by the token-level fallback. Results are memoized and shared, so
+    callers must copy the expression before modifying it.
+    """
+
+    sql: str
+    expression: exp.Expression | None
+    analysis: SQLAnalysis | None
+    read_dialect: str
+
+
+@dataclass(frozen=True, slots=True)
+class NormalizeCacheStats:
+    hits: int
+    misses: int
+    entries: int
+
+
 def normalize_sql_for_clickhouse(sql: str) -> str:
+    return normalize_sql_statement(sql).sql
+
+
+def normalize_sql_statement(sql: str, policy: SQLPolicy | None = None) -> NormalizedSQL:
+    """Tokenize, parse, rewrite and validate `sql` once; repeated inputs hit an LRU.
+
+    With a `policy` the AST is also checked against its tables, columns,
+    functions and complexity limit, and SQL that cannot be parsed is rejected
+    because the policy cannot be verified for it.
+    """
     sql_input = (sql or "").strip()
     if not sql_input:
         raise SQLNormalizationError("Empty SQL statement")
+    return _normalize_cached(sql_input, policy)
+
 
+def clear_normalize_cache() -> None:
+    _normalize_cached.cache_clear()
+
+
+def normalize_cache_stats() -> NormalizeCacheStats:
+    info = _normalize_cached.cache_info()
+    return NormalizeCacheStats(hits=info.hits, misses=info.misses, entries=info.currsize)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_cached(sql_input: str, policy: SQLPolicy | None) -> NormalizedSQL:
     sanitized_input = _sanitize_unbalanced_quotes(sql_input)
-    preprocessed_sql = _preprocess_sql(sanitized_input)
-    preprocessed_sql = _sanitize_unbalanced_quotes(preprocessed_sql)
-    _ensure_single_statement(preprocessed_sql)
-
-    normalized_sql = _try_transpile_to_clickhouse(preprocessed_sql)
-    if normalized_sql is None:
-        try:
-            parsed = sqlglot.parse_one(preprocessed_sql)
-            normalized_sql = parsed.sql(dialect="clickhouse")
-        except SqlglotError as exc:
-            logger.warning("SQLNormalizer: parse_failed error=%s sql=%r", exc, sql_input)
-            if preprocessed_sql.strip().upper().startswith("SELECT"):
-                from .validator import validate_clickhouse_sql
-                try:
-                    return validate_clickhouse_sql(preprocessed_sql)
-                except ValueError as validation_error:
-                    raise SQLNormalizationError(str(validation_error)) from validation_error
-            raise SQLNormalizationError("Unable to parse SQL") from exc
-
-    normalized_sql = normalized_sql.strip()
-    _ensure_single_statement(normalized_sql)
-
-    from .validator import validate_clickhouse_sql
+    read_dialect = _detect_read_dialect(sanitized_input)
+    dialect = Dialect.get_or_raise(read_dialect)
     try:
-        return validate_clickhouse_sql(normalized_sql)
+        text, tokens = _tokenize_without_as_of(dialect, sanitized_input)
+        _ensure_single_statement(tokens)
+        statements = [stmt for stmt in dialect.parser().parse(tokens, text) if stmt is not None]
+    except SQLNormalizationError:
+        raise
+    except SqlglotError as exc:
+        logger.warning("SQLNormalizer: parse_failed error=%s sql=%r", exc, sql_input)
+        if policy is None and sanitized_input.upper().startswith("SELECT"):
+            try:
+                validated = validate_clickhouse_sql(sanitized_input)
+            except ValueError as validation_error:
+                raise SQLNormalizationError(str(validation_error)) from validation_error
+            return NormalizedSQL(
+                sql=validated, expression=None, analysis=None, read_dialect=read_dialect
+            )
+        raise SQLNormalizationError("Unable to parse SQL") from exc
+
+    if len(statements) != 1:
+        raise SQLNormalizationError("Forbidden SQL operation detected")
+    if any(token.comments for token in tokens):
+        raise SQLNormalizationError("SQL comments are not permitted")
+
+    expression = _rewrite_for_clickhouse(statements[0])
+    try:
+        analysis = validate_clickhouse_ast(expression, policy)
     except ValueError as exc:
         raise SQLNormalizationError(str(exc)) from exc
+    return NormalizedSQL(
+        sql=expression.sql(dialect="clickhouse").strip(),
+        expression=expression,
+        analysis=analysis,
+        read_dialect=read_dialect,
+    )
 
 
-def _try_transpile_to_clickhouse(sql_text: str) -> str | None:
-    for read_dialect in ("mysql", "postgres", "sqlite"):
-        try:
-            parts = sqlglot.transpile(sql_text, read=read_dialect, write="clickhouse")
-            if parts and parts[0].strip():
-                return parts[0]
-        except SqlglotError:
-            continue
-    return None
+def _detect_read_dialect(sql: str) -> str:
+    """Pick the dialect to parse with from surface syntax instead of trying each one.
+
+    The model is asked for ClickHouse SQL, so that is the default; backticks or
+    `LIMIT offset, count` suggest MySQL and `::` casts, ILIKE or quoted interval
+    strings suggest Postgres.
+    """
+    if _MYSQL_HINTS.search(sql):
+        return "mysql"
+    if _POSTGRES_HINTS.search(sql):
+        return "postgres"
+    return "clickhouse"
+
+
+def _tokenize_without_as_of(dialect: Dialect, sql: str) -> tuple[str, list[Token]]:
+    tokens = dialect.tokenize(sql)
+    cleaned = _strip_as_of_clauses(sql, tokens)
+    if cleaned is sql:
+        return sql, tokens
+    # Removing `AS OF ...` shifts every offset, so the rewritten text is tokenized again.
+    cleaned = _sanitize_unbalanced_quotes(cleaned)
+    return cleaned, dialect.tokenize(cleaned)
+
+
+def _rewrite_for_clickhouse(expression: exp.Expression) -> exp.Expression:
+    """Replace constructs whose generic rendering is not idiomatic ClickHouse."""
+
+    def _rewrite(node: exp.Expression) -> exp.Expression:
+        unit = node.text("unit").upper() if isinstance(node, exp.DateTrunc) else ""
+        if unit:
+            target = _DATE_TRUNC_FUNCTIONS.get(unit)
+            if target is not None:
+                return exp.Anonymous(this=target, expressions=[node.this])
+            interval = exp.Interval(  # type: ignore[no-untyped-call]
+                this=exp.Literal.number(1), unit=exp.var(unit)
+            )
+            return exp.Anonymous(this="toStartOfInterval", expressions=[node.this, interval])
+        if isinstance(node, exp.CurrentDate) or (
+            isinstance(node, exp.Anonymous) and str(node.this).lower() == "currentdate"
+        ):
+            return exp.Anonymous(this="today", expressions=[])
+        if isinstance(node, exp.CurrentTimestamp) or (
+            isinstance(node, exp.Column)
+            and not node.table
+            and not node.this.quoted
+            and node.name.upper() == "CURRENT_TIMESTAMP"
+        ):
+            return exp.Anonymous(this="now", expressions=[])
+        return node
+
+    return expression.transform(_rewrite, copy=False)
+
 
+def _strip_as_of_clauses(sql: str, tokens: list[Token]) -> str:
+    """Drop `AS OF ...` time-travel clauses, which ClickHouse does not support.
 
-def _preprocess_sql(sql: str) -> str:
-    tokens = list(Tokenizer().tokenize(sql))
+    Returns `sql` itself when there is nothing to remove.
+    """
     if not tokens:
         return sql
 
@@ -152,9 +270,7 @@ def _sanitize_unbalanced_quotes(sql: str) -> str:
     return sql
 
 
-def _ensure_single_statement(sql: str) -> None:
-    tokenizer = Tokenizer()
-    tokens = list(tokenizer.tokenize(sql))
+def _ensure_single_statement(tokens: list[Token]) -> None:
     seen_semicolon = False
     for tok in tokens:
         if tok.token_type == TokenType.SEMICOLON:
@@ -0,0 +1,214 @@
+"""Rewrite aggregate queries over `ad_performance` to read a pre-aggregated rollup."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import cast
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from ..clickhouse.schema import (
+    COLUMNS,
+    ROLLUP_MEASURES,
+    ROLLUP_ROW_COUNT,
+    ROLLUPS,
+    TABLE_NAME,
+    RollupDefinition,
+)
+
+logger = logging.getLogger(__name__)
+
+REWRITE_CACHE_SIZE = 1024
+
+_MEASURES = frozenset(column.name for column in ROLLUP_MEASURES)
+_BASE_COLUMNS = frozenset(column.name for column in COLUMNS)
+# Aggregates whose value over dimension columns is the same on a rollup.
+_DIMENSION_AGGREGATES = (exp.Min, exp.Max, exp.ApproxDistinct)
+_DIMENSION_AGGREGATE_NAMES = frozenset({"uniq", "uniqexact", "any", "anylast"})
+
+
+@dataclass(frozen=True, slots=True)
+class RollupRewrite:
+    sql: str
+    rollup: str
+
+
+class _Ineligible(Exception):
+    """Raised while planning when a query cannot be answered from a rollup."""
+
+
+def rewrite_for_rollups(
+    sql: str, rollups: Sequence[RollupDefinition] = ROLLUPS
+) -> RollupRewrite | None:
+    """Point `sql` at the smallest rollup that returns the same rows, if any.
+
+    Eligible queries are single SELECTs over the base table without joins,
+    subqueries or window functions. Outside aggregates they may only reference a
+    rollup's dimensions. Inside aggregates they may use `sum`/`sumIf` of
+    measures, `count`/`countIf`, `avg` of measures, and `min`/`max`/`uniq` of
+    dimensions. Counts and averages are recomputed from the stored row count, so
+    ratios such as `sum(clicks) / sum(impressions)` come out identical.
+    """
+    return _rewrite_cached(sql, tuple(rollups))
+
+
+def clear_rewrite_cache() -> None:
+    _rewrite_cached.cache_clear()
+
+
+@lru_cache(maxsize=REWRITE_CACHE_SIZE)
+def _rewrite_cached(sql: str, rollups: tuple[RollupDefinition, ...]) -> RollupRewrite | None:
+    try:
+        expression = sqlglot.parse_one(sql, read="clickhouse")
+    except SqlglotError:
+        return None
+    try:
+        dimensions = _required_dimensions(expression)
+    except _Ineligible as exc:
+        logger.debug("rollup_ineligible reason=%s", exc)
+        return None
+    rollup = next((r for r in rollups if dimensions <= set(r.dimensions)), None)
+    if rollup is None:
+        return None
+    rewritten = _rewrite(cast(exp.Select, expression.copy()), rollup)
+    return RollupRewrite(sql=rewritten.sql(dialect="clickhouse"), rollup=rollup.name)
+
+
+def _required_dimensions(expression: exp.Expression) -> set[str]:
+    """Base columns a rollup must keep to answer `expression`; raises if none can."""
+    if not isinstance(expression, exp.Select):
+        raise _Ineligible("not a plain SELECT")
+    if expression.args.get("joins") or expression.args.get("with"):
+        raise _Ineligible("joins or CTEs")
+    if expression.find(exp.Subquery, exp.Window, exp.Union, exp.Lateral):
+        raise _Ineligible("subquery or window")
+    tables = list(expression.find_all(exp.Table))
+    if len(tables) != 1 or tables[0].name != TABLE_NAME:
+        raise _Ineligible("not the base table")
+    if {key for key, value in tables[0].args.items() if value} - {"this", "db", "alias"}:
+        raise _Ineligible("table modifiers")
+    if any(isinstance(select, exp.Star) for select in expression.selects):
+        raise _Ineligible("SELECT *")
+
+    aggregates = list(expression.find_all(exp.AggFunc))
+    if any(node.find_ancestor(exp.AggFunc) is not None for node in aggregates):
+        raise _Ineligible("nested aggregates")
+    if not aggregates and not expression.args.get("group") and not expression.args.get("distinct"):
+        raise _Ineligible("row-level query")
+    # Unaliased outputs are named after their expression; only `count()` keeps its name.
+    for select in expression.selects:
+        if not select.alias and _is_rewritten(select) and not _is_count_all(select):
+            raise _Ineligible("unaliased aggregate would be renamed")
+
+    dimensions: set[str] = set()
+    for aggregate in aggregates:
+        dimensions |= _aggregate_dimensions(aggregate)
+
+    aliases = {select.alias for select in expression.selects if select.alias}
+    for column in expression.find_all(exp.Column):
+        if isinstance(column.this, exp.Star):
+            raise _Ineligible("SELECT *")
+        if column.find_ancestor(exp.AggFunc) is not None:
+            continue
+        if column.name in aliases and not column.table:
+            continue
+        if column.name not in _BASE_COLUMNS or column.name in _MEASURES:
+            raise _Ineligible(f"row-level use of {column.name}")
+        dimensions.add(column.name)
+    return dimensions
+
+
+def _aggregate_dimensions(node: exp.AggFunc) -> set[str]:
+    """Dimensions an aggregate reads; raises if a rollup cannot compute it."""
+    if isinstance(node, exp.Count) and isinstance(node.this, exp.Distinct):
+        return _dimension_columns(node.this)
+    if _is_plain_count(node):
+        return set()
+    if isinstance(node, exp.Sum | exp.Avg):
+        _require_measure(node.this)
+        return set()
+    if isinstance(node, exp.CountIf):
+        return _dimension_columns(node.this)
+    if isinstance(node, exp.CombinedAggFunc) and node.name.lower() == "sumif":
+        measure, *conditions = node.expressions
+        _require_measure(measure)
+        return set().union(*(_dimension_columns(condition) for condition in conditions))
+    if isinstance(node, _DIMENSION_AGGREGATES) or (
+        isinstance(node, exp.AnonymousAggFunc) and node.name.lower() in _DIMENSION_AGGREGATE_NAMES
+    ):
+        return _dimension_columns(node)
+    raise _Ineligible(f"aggregate {node.sql(dialect='clickhouse')}")
+
+
+def _rewrite(expression: exp.Select, rollup: RollupDefinition) -> exp.Expression:
+    table = expression.find(exp.Table)
+    if table is not None:
+        table.set("this", exp.to_identifier(rollup.name))
+    expression.set(
+        "expressions",
+        [
+            exp.alias_(select, "count()", quoted=True) if _is_count_all(select) else select
+            for select in expression.expressions
+        ],
+    )
+    row_count = ROLLUP_ROW_COUNT.name
+
+    def _transform(node: exp.Expression) -> exp.Expression:
+        if isinstance(node, exp.Column) and node.table == TABLE_NAME:
+            node.set("table", exp.to_identifier(rollup.name))
+        elif _is_plain_count(node):
+            return _sum(exp.column(row_count))
+        elif isinstance(node, exp.CountIf):
+            return exp.CombinedAggFunc(this="sumIf", expressions=[exp.column(row_count), node.this])
+        elif isinstance(node, exp.Avg):
+            return exp.Paren(
+                this=exp.Div(this=_sum(node.this), expression=_sum(exp.column(row_count)))
+            )
+        return node
+
+    return expression.transform(_transform, copy=False)
+
+
+def _is_plain_count(node: exp.Expression) -> bool:
+    """`count()`, `count(*)` or `count(column)`: base columns are never NULL, so all equal."""
+    if not isinstance(node, exp.Count):
+        return False
+    argument = node.this
+    return (
+        argument is None
+        or isinstance(argument, exp.Star)
+        or (isinstance(argument, exp.Column) and argument.name in _BASE_COLUMNS)
+    )
+
+
+def _is_count_all(node: exp.Expression) -> bool:
+    """`count()` or `count(*)`, which ClickHouse names `count()` when unaliased."""
+    return isinstance(node, exp.Count) and (node.this is None or isinstance(node.this, exp.Star))
+
+
+def _sum(argument: exp.Expression) -> exp.Expression:
+    # Spelled like the generated SQL rather than sqlglot's upper-case SUM.
+    return exp.Anonymous(this="sum", expressions=[argument])
+
+
+def _is_rewritten(node: exp.Expression) -> bool:
+    return any(
+        _is_plain_count(child) or isinstance(child, exp.CountIf | exp.Avg) for child in node.walk()
+    )
+
+
+def _require_measure(node: exp.Expression | None) -> None:
+    if not isinstance(node, exp.Column) or node.name not in _MEASURES:
+        raise _Ineligible("aggregate over a non-measure")
+
+
+def _dimension_columns(node: exp.Expression) -> set[str]:
+    names = {column.name for column in node.find_all(exp.Column)}
+    if names & _MEASURES or not names <= _BASE_COLUMNS:
+        raise _Ineligible("measure used as a dimension")
+    return names
@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
-import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from typing import Final
 
+from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.errors import SqlglotError
+from sqlglot.tokens import TokenType
+
+from ..clickhouse.schema import COLUMNS, TABLE_NAME
 
 FORBIDDEN_KEYWORDS: Final[tuple[str, ...]] = (
     "INSERT",
@@ -24,50 +31,333 @@ FORBIDDEN_KEYWORDS: Final[tuple[str, ...]] = (
     "CREATE",
 )
 
-FORBIDDEN_PATTERN: Final[re.Pattern[str]] = re.compile(
-    rf"\b({'|'.join(FORBIDDEN_KEYWORDS)})\b",
-    flags=re.IGNORECASE,
+# Statement nodes that write data, change schema or run server commands.
+FORBIDDEN_NODES: Final[tuple[type[exp.Expression], ...]] = (
+    exp.Insert,
+    exp.Update,
+    exp.Delete,
+    exp.Merge,
+    exp.Create,
+    exp.Drop,
+    exp.Alter,
+    exp.TruncateTable,
+    exp.Command,
+)
+
+# Functions sqlglot parses into dedicated nodes; every aggregate (`exp.AggFunc`)
+# is allowed as well.
+ALLOWED_FUNCTION_NODES: Final[tuple[type[exp.Func], ...]] = (
+    exp.Abs,
+    exp.Case,
+    exp.Cast,
+    exp.Ceil,
+    exp.Coalesce,
+    exp.Concat,
+    exp.CurrentDate,
+    exp.CurrentTimestamp,
+    exp.DateAdd,
+    exp.DateDiff,
+    exp.DateSub,
+    exp.DateTrunc,
+    exp.Extract,
+    exp.Floor,
+    exp.Greatest,
+    exp.If,
+    exp.Least,
+    exp.Length,
+    exp.Lower,
+    exp.Nullif,
+    exp.Round,
+    exp.TimeToStr,
+    exp.TryCast,
+    exp.Upper,
 )
 
-COMMENT_PATTERN: Final[re.Pattern[str]] = re.compile(
-    r"(--.*?$)|(/\*.*?\*/)", re.MULTILINE | re.DOTALL
+# ClickHouse functions sqlglot keeps by name (anonymous and combinator functions).
+ALLOWED_FUNCTION_NAMES: Final[frozenset[str]] = frozenset(
+    name.lower()
+    for name in (
+        "addDays",
+        "addMonths",
+        "addWeeks",
+        "addYears",
+        "argMax",
+        "argMin",
+        "avgIf",
+        "countIf",
+        "dateDiff",
+        "divide",
+        "formatDateTime",
+        "ifNull",
+        "intDiv",
+        "multiIf",
+        "now",
+        "quantile",
+        "quantileExact",
+        "quantiles",
+        "quantilesExact",
+        "subtractDays",
+        "subtractMonths",
+        "subtractWeeks",
+        "subtractYears",
+        "sumIf",
+        "toDate",
+        "toDayOfMonth",
+        "toDayOfWeek",
+        "toFloat64",
+        "toInt64",
+        "toMonday",
+        "toMonth",
+        "toQuarter",
+        "toStartOfDay",
+        "toStartOfInterval",
+        "toStartOfMonth",
+        "toStartOfQuarter",
+        "toStartOfWeek",
+        "toStartOfYear",
+        "toString",
+        "toUInt64",
+        "toWeek",
+        "toYear",
+        "toYYYYMM",
+        "toYYYYMMDD",
+        "today",
+        "uniq",
+        "uniqExact",
+        "uniqIf",
+        "yesterday",
+    )
 )
-STRING_PATTERN: Final[re.Pattern[str]] = re.compile(r"'([^']|'')*'")
+
+# Functions that keep their ClickHouse name in the AST rather than a dedicated node.
+_NAMED_FUNCTIONS = (exp.Anonymous, exp.AnonymousAggFunc, exp.CombinedAggFunc, exp.ParameterizedAgg)
+# Operators sqlglot also models as functions (AND, OR, XOR, ...).
+_OPERATORS = (exp.Binary, exp.Unary, exp.Connector)
+
+JOIN_WEIGHT: Final[int] = 3
+SUBQUERY_DEPTH_WEIGHT: Final[int] = 2
+CTE_WEIGHT: Final[int] = 1
+MISSING_LIMIT_WEIGHT: Final[int] = 4
+
+_TOKENIZER_DIALECT = Dialect.get_or_raise("clickhouse")
+_LITERAL_TOKENS = {TokenType.STRING, TokenType.IDENTIFIER}
+
+
+@dataclass(frozen=True, slots=True)
+class SQLPolicy:
+    """What a generated query may reference; `None` leaves that dimension open."""
+
+    allowed_tables: frozenset[str] | None = None
+    allowed_columns: frozenset[str] | None = None
+    allowed_functions: frozenset[str] | None = None
+    allowed_function_nodes: tuple[type[exp.Func], ...] = ()
+    database: str | None = None
+    max_complexity: int | None = None
+
+    @classmethod
+    def from_schema(
+        cls, *, database: str | None = None, max_complexity: int | None = None
+    ) -> SQLPolicy:
+        """Policy limited to the `ad_performance` table, its columns and the allowlists."""
+        return cls(
+            allowed_tables=frozenset({TABLE_NAME}),
+            allowed_columns=frozenset(column.name for column in COLUMNS),
+            allowed_functions=ALLOWED_FUNCTION_NAMES,
+            allowed_function_nodes=ALLOWED_FUNCTION_NODES,
+            database=database,
+            max_complexity=max_complexity,
+        )
 
 
-def _strip_comments(sql: str) -> str:
-    return re.sub(COMMENT_PATTERN, " ", sql)
+@dataclass(frozen=True, slots=True)
+class SQLAnalysis:
+    """Facts gathered in one walk over a query's AST."""
 
+    tables: frozenset[str]
+    functions: frozenset[str]
+    joins: int
+    ctes: int
+    subquery_depth: int
+    has_limit: bool
+    complexity: int
 
-def _mask_string_literals(sql: str) -> str:
-    return re.sub(STRING_PATTERN, "''", sql)
+
+@dataclass(slots=True)
+class _Collector:
+    tables: set[str] = field(default_factory=set)
+    cte_names: set[str] = field(default_factory=set)
+    columns: set[str] = field(default_factory=set)
+    aliases: set[str] = field(default_factory=set)
+    functions: set[str] = field(default_factory=set)
+    disallowed_functions: set[str] = field(default_factory=set)
+    table_functions: set[str] = field(default_factory=set)
+    foreign_databases: set[str] = field(default_factory=set)
+    forbidden: bool = False
+    joins: int = 0
+    max_depth: int = 0
 
 
 def validate_clickhouse_sql(sql: str) -> str:
-    """Ensure the SQL statement is a single read-only SELECT."""
+    """Token-level check for a single read-only SELECT.
+
+    Used for SQL that sqlglot cannot parse; parsed statements go through
+    `validate_clickhouse_ast`. String literals and quoted identifiers are never
+    mistaken for keywords.
+    """
     if not sql or not sql.strip():
         raise ValueError("SQL query is empty")
 
-    if COMMENT_PATTERN.search(sql):
-        raise ValueError("SQL comments are not permitted")
-
-    cleaned = _strip_comments(sql).strip()
-    normalized = " ".join(cleaned.split())
-
-    normalized_upper = normalized.upper()
+    try:
+        tokens = _TOKENIZER_DIALECT.tokenize(sql)
+    except SqlglotError as exc:
+        raise ValueError("Unable to parse SQL") from exc
 
-    masked = _mask_string_literals(normalized_upper)
+    if any(token.comments for token in tokens):
+        raise ValueError("SQL comments are not permitted")
 
-    if FORBIDDEN_PATTERN.search(masked):
+    if any(
+        token.token_type not in _LITERAL_TOKENS and token.text.upper() in FORBIDDEN_KEYWORDS
+        for token in tokens
+    ):
         raise ValueError("Forbidden SQL operation detected")
 
-    if not normalized_upper.startswith("SELECT"):
+    if not tokens or tokens[0].token_type not in (TokenType.SELECT, TokenType.WITH):
         raise ValueError("Only SELECT statements are permitted")
 
-    if normalized.endswith(";"):
+    if tokens[-1].token_type == TokenType.SEMICOLON:
         raise ValueError("Trailing semicolons are not permitted")
 
-    if ";" in masked[:-1]:
+    if any(token.token_type == TokenType.SEMICOLON for token in tokens):
         raise ValueError("Multiple statements are not allowed")
 
-    return normalized
+    return " ".join(sql.split())
+
+
+def validate_clickhouse_ast(
+    expression: exp.Expression, policy: SQLPolicy | None = None
+) -> SQLAnalysis:
+    """Walk the AST once, enforce SELECT-only plus `policy`, and score complexity.
+
+    Raises `ValueError` on the first violated rule; otherwise returns the
+    analysis so callers can reject or downgrade expensive queries.
+    """
+    policy = policy or SQLPolicy()
+    collector = _Collector()
+    _visit(expression, collector, policy, depth=0)
+
+    if collector.forbidden or isinstance(expression, FORBIDDEN_NODES):
+        raise ValueError("Forbidden SQL operation detected")
+    if not isinstance(expression, exp.Query):
+        raise ValueError("Only SELECT statements are permitted")
+    if collector.table_functions:
+        raise ValueError(f"Table functions are not permitted: {_names(collector.table_functions)}")
+    if collector.foreign_databases:
+        raise ValueError(f"Database is not permitted: {_names(collector.foreign_databases)}")
+
+    tables = collector.tables - collector.cte_names
+    if policy.allowed_tables is not None:
+        unknown_tables = {t for t in tables if t.lower() not in policy.allowed_tables}
+        if unknown_tables:
+            raise ValueError(f"Table is not permitted: {_names(unknown_tables)}")
+    if policy.allowed_columns is not None:
+        known = policy.allowed_columns | collector.aliases
+        unknown_columns = {c for c in collector.columns if c not in known}
+        if unknown_columns:
+            raise ValueError(f"Unknown column: {_names(unknown_columns)}")
+    if collector.disallowed_functions:
+        raise ValueError(f"Function is not permitted: {_names(collector.disallowed_functions)}")
+
+    has_limit = _has_limit(expression)
+    complexity = (
+        collector.joins * JOIN_WEIGHT
+        + collector.max_depth * SUBQUERY_DEPTH_WEIGHT
+        + len(collector.cte_names) * CTE_WEIGHT
+        + (0 if has_limit or _returns_single_row(expression) else MISSING_LIMIT_WEIGHT)
+    )
+    if policy.max_complexity is not None and complexity > policy.max_complexity:
+        raise ValueError(
+            f"Query is too complex (score {complexity}, limit {policy.max_complexity})"
+        )
+
+    return SQLAnalysis(
+        tables=frozenset(tables),
+        functions=frozenset(collector.functions),
+        joins=collector.joins,
+        ctes=len(collector.cte_names),
+        subquery_depth=collector.max_depth,
+        has_limit=has_limit,
+        complexity=complexity,
+    )
+
+
+def _visit(node: exp.Expression, collector: _Collector, policy: SQLPolicy, depth: int) -> None:
+    if isinstance(node, exp.Subquery):
+        depth += 1
+        collector.max_depth = max(collector.max_depth, depth)
+
+    if isinstance(node, FORBIDDEN_NODES):
+        collector.forbidden = True
+    elif isinstance(node, exp.Table):
+        _visit_table(node, collector, policy)
+    elif isinstance(node, exp.Column):
+        if not isinstance(node.this, exp.Star):
+            collector.columns.add(node.name)
+    elif isinstance(node, exp.Alias):
+        collector.aliases.add(node.alias)
+    elif isinstance(node, exp.TableAlias):
+        collector.aliases.add(node.name)
+        collector.aliases.update(column.name for column in node.columns)
+    elif isinstance(node, exp.CTE):
+        collector.cte_names.add(node.alias)
+    elif isinstance(node, exp.Join):
+        collector.joins += 1
+    elif isinstance(node, exp.Lambda):
+        collector.aliases.update(param.name for param in node.expressions)
+    elif isinstance(node, exp.Func) and not isinstance(node, _OPERATORS):
+        _visit_function(node, collector, policy)
+
+    for child in node.iter_expressions():
+        _visit(child, collector, policy, depth)
+
+
+def _visit_table(node: exp.Table, collector: _Collector, policy: SQLPolicy) -> None:
+    if not isinstance(node.this, exp.Identifier):
+        collector.table_functions.add(node.this.name if node.this else node.sql())
+        return
+    collector.tables.add(node.name)
+    if node.db and policy.database is not None and node.db != policy.database:
+        collector.foreign_databases.add(node.db)
+
+
+def _visit_function(node: exp.Func, collector: _Collector, policy: SQLPolicy) -> None:
+    if isinstance(node, _NAMED_FUNCTIONS):
+        name = node.name
+        allowed = policy.allowed_functions is None or name.lower() in policy.allowed_functions
+    else:
+        name = node.key
+        allowed = (
+            policy.allowed_functions is None
+            or isinstance(node, exp.AggFunc)
+            or isinstance(node, policy.allowed_function_nodes)
+        )
+    collector.functions.add(name)
+    # Table functions are reported by `_visit_table` instead.
+    if not allowed and not isinstance(node.parent, exp.Table):
+        collector.disallowed_functions.add(name)
+
+
+def _has_limit(expression: exp.Expression) -> bool:
+    return expression.args.get("limit") is not None
+
+
+def _returns_single_row(expression: exp.Expression) -> bool:
+    """An aggregate SELECT without GROUP BY yields one row, so it needs no LIMIT."""
+    return (
+        isinstance(expression, exp.Select)
+        and expression.args.get("group") is None
+        and any(select.find(exp.AggFunc) for select in expression.selects)
+    )
+
+
+def _names(values: Iterable[str]) -> str:
+    return ", ".join(sorted(values))
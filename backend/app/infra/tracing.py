@@ -0,0 +1,293 @@
+"""Lightweight request tracing: nested spans per request, exported as one trace.
+
+The trace id is the request id bound by `RequestIdMiddleware`, so a trace can
+be joined with the request's log lines. The active span lives in a context
+variable; `span()` makes a child of it current for the duration of a block.
+Async generators must not leave a span current across `yield`, so they use
+`start_span()`, which records a child without activating it.
+
+When tracing has never been configured `span()` returns a shared no-op context
+and `start_span()` the shared no-op span without touching the context variable;
+with tracing on but no active trace they cost one context-variable read.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, ClassVar, Protocol
+
+from .config import Settings
+
+logger = logging.getLogger(__name__)
+
+AttributeValue = str | int | float | bool | None
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_time: float
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+    duration_ms: float | None = None
+    status: str = "ok"
+    error: str | None = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _trace: _Trace | None = field(default=None, repr=False)
+
+    def set(self, **attributes: AttributeValue) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"[:500]
+
+    def end(self) -> None:
+        if self.duration_ms is not None or self._trace is None:
+            return
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        self._trace.finish(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan(Span):
+    def set(self, **attributes: AttributeValue) -> None:
+        return None
+
+    def record_error(self, exc: BaseException) -> None:
+        return None
+
+
+NOOP_SPAN: Span = _NoopSpan(name="noop", trace_id="-", span_id="-", parent_id=None, start_time=0.0)
+
+
+class SpanExporter(Protocol):
+    """Receives the finished spans of one trace, root span last."""
+
+    def export(self, spans: Sequence[Span]) -> None: ...
+
+
+class LoggingExporter:
+    """Logs one line per trace with each span's duration."""
+
+    def export(self, spans: Sequence[Span]) -> None:
+        root = spans[-1]
+        stages = " ".join(f"{span.name}={span.duration_ms or 0:.1f}ms" for span in spans[:-1])
+        logger.info(
+            "trace trace_id=%s root=%s duration_ms=%.1f status=%s spans=%d %s",
+            root.trace_id,
+            root.name,
+            root.duration_ms or 0.0,
+            root.status,
+            len(spans),
+            stages,
+        )
+
+
+class JsonFileExporter:
+    """Appends each trace to a JSON-lines file, one object per trace."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        line = json.dumps(
+            {"trace_id": spans[-1].trace_id, "spans": [span.to_dict() for span in spans]},
+            default=str,
+        )
+        with self._lock:
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+class InMemoryExporter:
+    """Keeps exported traces in a list; useful in tests and benchmarks."""
+
+    def __init__(self) -> None:
+        self.traces: list[list[Span]] = []
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self.traces.append(list(spans))
+
+
+class _Trace:
+    """Collects finished spans until the root ends, then hands them to the exporter.
+
+    Spans that end after the root (e.g. while a streaming body is still being
+    produced) are exported on their own under the same trace id.
+    """
+
+    __slots__ = ("tracer", "spans", "closed")
+
+    def __init__(self, tracer: Tracer) -> None:
+        self.tracer = tracer
+        self.spans: list[Span] = []
+        self.closed = False
+
+    def finish(self, span: Span) -> None:
+        if self.closed:
+            self.tracer.export([span])
+            return
+        self.spans.append(span)
+        if span.parent_id is None:
+            self.closed = True
+            spans, self.spans = self.spans, []
+            if span.duration_ms is not None and span.duration_ms >= self.tracer.min_duration_ms:
+                self.tracer.export(spans)
+
+
+_CURRENT_SPAN: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Process-wide entry point; traces are only recorded once an exporter is set."""
+
+    # Whether any tracer was ever given an exporter; until then spans skip all lookups.
+    configured: ClassVar[bool] = False
+
+    def __init__(self) -> None:
+        self._exporter: SpanExporter | None = None
+        self.min_duration_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._exporter is not None
+
+    def configure(self, exporter: SpanExporter | None, *, min_duration_ms: float = 0.0) -> None:
+        self._exporter = exporter
+        self.min_duration_ms = min_duration_ms
+        if exporter is not None:
+            Tracer.configured = True
+
+    def export(self, spans: Sequence[Span]) -> None:
+        if self._exporter is None:
+            return
+        try:
+            self._exporter.export(spans)
+        except Exception:  # noqa: BLE001
+            logger.warning("trace_export_failed", exc_info=True)
+
+    @contextmanager
+    def start_trace(self, name: str, trace_id: str, **attributes: AttributeValue) -> Iterator[Span]:
+        """Open the root span of a new trace and make it current."""
+        if self._exporter is None:
+            yield NOOP_SPAN
+            return
+        root = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=_new_span_id(),
+            parent_id=None,
+            start_time=time.time(),
+            attributes=dict(attributes),
+            _trace=_Trace(self),
+        )
+        with _ActiveSpan(root):
+            yield root
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class _ActiveSpan:
+    """Makes `span` current for a block and ends it; exceptions mark it failed."""
+
+    __slots__ = ("_span", "_token")
+
+    def __init__(self, span: Span) -> None:
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._token = _CURRENT_SPAN.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type: object, exc: BaseException | None, traceback: object) -> None:
+        if exc is not None:
+            self._span.record_error(exc)
+        _CURRENT_SPAN.reset(self._token)
+        self._span.end()
+
+
+class _NoopSpanContext:
+    __slots__ = ()
+
+    def __enter__(self) -> Span:
+        return NOOP_SPAN
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NOOP_SPAN_CONTEXT = _NoopSpanContext()
+
+
+def current_span() -> Span | None:
+    return _CURRENT_SPAN.get()
+
+
+def start_span(name: str, **attributes: AttributeValue) -> Span:
+    """Child of the current span that is not made current; call `end()` when done."""
+    if not Tracer.configured:
+        return NOOP_SPAN
+    parent = _CURRENT_SPAN.get()
+    if parent is None or parent._trace is None:
+        return NOOP_SPAN
+    return Span(
+        name=name,
+        trace_id=parent.trace_id,
+        span_id=_new_span_id(),
+        parent_id=parent.span_id,
+        start_time=time.time(),
+        attributes=dict(attributes),
+        _trace=parent._trace,
+    )
+
+
+def span(name: str, **attributes: AttributeValue) -> AbstractContextManager[Span]:
+    """Run a block inside a child span of the current one; exceptions mark it failed."""
+    child = start_span(name, **attributes)
+    if child is NOOP_SPAN:
+        return _NOOP_SPAN_CONTEXT
+    return _ActiveSpan(child)
+
+
+def sql_hash(sql: str) -> str:
+    """Short, stable identifier for a statement in span attributes."""
+    return sha256(sql.encode("utf-8")).hexdigest()[:16]
+
+
+def build_exporter(settings: Settings) -> SpanExporter | None:
+    if not settings.tracing_enabled:
+        return None
+    if settings.tracing_exporter == "file":
+        return JsonFileExporter(settings.tracing_file_path)
+    return LoggingExporter()
+
+
+tracer = Tracer()
@@ -0,0 +1,4 @@
+"""Micro and macro benchmarks for the query pipeline.
+
+Run from the backend directory with `python -m benchmarks`; see `make bench`.
+"""
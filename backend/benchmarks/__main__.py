@@ -0,0 +1,75 @@
+"""Command line entry point: `python -m benchmarks [--baseline PATH] [--output PATH]`."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from . import macro, micro
+from .harness import compare, load_results, write_results
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the query pipeline.")
+    parser.add_argument("--suite", choices=("all", "micro", "macro"), default="all")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown of a median before it counts as a regression (0.25 = 25%%).",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Write results to the baseline path."
+    )
+    parser.add_argument("--quick", action="store_true", help="Fewer rounds, for smoke runs.")
+    args = parser.parse_args(argv)
+
+    # The pipeline logs every request; that would dominate the timings.
+    logging.disable(logging.CRITICAL)
+
+    results = []
+    if args.suite in ("all", "micro"):
+        results.extend(micro.run(quick=args.quick))
+    if args.suite in ("all", "macro"):
+        results.extend(macro.run(quick=args.quick))
+
+    for result in results:
+        print(
+            f"{result.name:<36} median {result.median_us:>12.2f} us"
+            f"   min {result.min_us:>12.2f} us"
+        )
+
+    mode = "quick" if args.quick else "full"
+    target = args.baseline if args.update_baseline else args.output
+    payload = write_results(target, results, mode=mode)
+    print(f"\nWrote {len(results)} results to {target}")
+    if args.update_baseline or not args.baseline.exists():
+        return 0
+
+    # Quick runs use smaller fan-outs and fewer rounds, so their medians are not comparable.
+    meta, baseline = load_results(args.baseline)
+    baseline_mode = meta.get("mode", "full")
+    if baseline_mode != mode:
+        print(f"Not comparing: {args.baseline} is a {baseline_mode} run and this is a {mode} run")
+        return 0
+
+    regressions = compare(baseline, payload["results"], tolerance=args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name}: {regression.baseline_us:.2f} us -> "
+            f"{regression.current_us:.2f} us ({regression.ratio:.2f}x)"
+        )
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Representative LLM outputs and questions used as benchmark inputs."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+QUESTIONS: tuple[str, ...] = (
+    "What is total spend by source for the last 30 days?",
+    "Show daily clicks and impressions for google last week",
+    "Which campaigns had the best ROAS last month?",
+    "Compare conversions by country for the last 7 days",
+    "What is the CTR by source this month?",
+    "Top 10 campaigns by revenue in the last quarter",
+    "Spend quantiles per source for the last 90 days",
+    "How many unique campaigns ran per country last month?",
+)
+
+SQL_STATEMENTS: tuple[str, ...] = (
+    "SELECT source, sum(spend) AS total_spend FROM ad_performance "
+    "WHERE date >= subtractDays(today(), 30) AND date < today() GROUP BY source LIMIT 100",
+    "SELECT date, sum(clicks) AS clicks, sum(impressions) AS impressions FROM ad_performance "
+    "WHERE source = 'google' AND date >= subtractDays(today(), 7) GROUP BY date "
+    "ORDER BY date LIMIT 100",
+    "SELECT campaign_name, round(sum(revenue) / nullIf(sum(spend), 0), 2) AS roas "
+    "FROM ad_performance WHERE date >= addMonths(toStartOfMonth(today()), -1) "
+    "AND date < toStartOfMonth(today()) GROUP BY campaign_name ORDER BY roas DESC LIMIT 10",
+    "SELECT country, sum(conversions) AS conversions FROM ad_performance "
+    "WHERE date >= subtractDays(today(), 7) GROUP BY country ORDER BY conversions DESC LIMIT 100",
+    "SELECT source, round((sum(clicks) / nullIf(sum(impressions), 0)) * 100, 2) AS ctr_percent "
+    "FROM ad_performance WHERE date >= toStartOfMonth(today()) GROUP BY source LIMIT 100",
+    "SELECT campaign_name, sum(revenue) AS revenue FROM ad_performance "
+    "WHERE date >= subtractDays(today(), 90) GROUP BY campaign_name "
+    "ORDER BY revenue DESC LIMIT 10",
+    "SELECT source, quantiles(0.25, 0.5, 0.75)(spend) AS spend_quantiles FROM ad_performance "
+    "WHERE date >= subtractDays(today(), 90) GROUP BY source LIMIT 100",
+    "SELECT country, uniqExact(campaign_id) AS campaigns FROM ad_performance "
+    "WHERE date >= addMonths(toStartOfMonth(today()), -1) GROUP BY country LIMIT 100",
+)
+
+_THINK = (
+    "<think>The user wants an aggregate over ad_performance. I should group by the "
+    "requested dimension, filter the date range and keep a LIMIT.</think>\n"
+)
+
+# Raw completions in the shapes models actually return: think blocks, fences, labels.
+LLM_OUTPUTS: tuple[str, ...] = tuple(
+    wrapper.format(sql=sql)
+    for sql in SQL_STATEMENTS
+    for wrapper in (
+        "{sql}",
+        _THINK + "{sql}",
+        "```sql\n{sql}\n```",
+        _THINK + "SQL: {sql}",
+    )
+)
+
+
+def result_rows(count: int = 100) -> list[dict[str, Any]]:
+    """Rows shaped like a grouped daily report, for serialization benchmarks."""
+    start = date(2024, 1, 1)
+    sources = ("google", "facebook", "tiktok", "bing")
+    return [
+        {
+            "date": start + timedelta(days=index // len(sources)),
+            "source": sources[index % len(sources)],
+            "spend": round(100 + index * 1.5, 2),
+            "clicks": 1000 + index,
+            "roas": round(1.2 + (index % 7) / 10, 2),
+        }
+        for index in range(count)
+    ]
@@ -0,0 +1,31 @@
+"""In-process stand-in for ClickHouse used by the macro benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+
+from app.infra.serialization.columnar import ColumnarResult
+
+
+class FakeClickHouse:
+    """Returns a synthetic grouped result of `rows` rows after `latency` seconds."""
+
+    def __init__(self, *, rows: int = 30, latency: float = 0.0) -> None:
+        self.database = "marketing"
+        self.calls = 0
+        self._latency = latency
+        self._result = ColumnarResult(
+            columns=["source", "total_spend", "total_clicks"],
+            types=["String", "Float64", "UInt64"],
+            data=[
+                [f"source_{index}" for index in range(rows)],
+                [round(100 + index * 1.25, 2) for index in range(rows)],
+                [1000 + index for index in range(rows)],
+            ],
+        )
+
+    async def query_columnar(self, sql: str) -> ColumnarResult:
+        self.calls += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return self._result
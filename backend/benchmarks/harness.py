@@ -0,0 +1,123 @@
+"""Timing, result files and baseline comparison shared by the benchmark suites."""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkResult:
+    """Per-operation timings in microseconds across `repeats` timed rounds."""
+
+    name: str
+    median_us: float
+    min_us: float
+    max_us: float
+    operations: int
+    extra: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Regression:
+    name: str
+    baseline_us: float
+    current_us: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_us / self.baseline_us
+
+
+def summarize(
+    name: str, samples_us: Sequence[float], operations: int, **extra: Any
+) -> BenchmarkResult:
+    return BenchmarkResult(
+        name=name,
+        median_us=statistics.median(samples_us),
+        min_us=min(samples_us),
+        max_us=max(samples_us),
+        operations=operations,
+        extra=extra or None,
+    )
+
+
+def time_per_call(
+    name: str,
+    func: Callable[[T], object],
+    inputs: Sequence[T],
+    *,
+    rounds: int,
+    repeats: int = 5,
+) -> BenchmarkResult:
+    """Call `func` on every input `rounds` times per repeat; report time per call."""
+    for item in inputs:  # warm-up, also surfaces exceptions before timing
+        func(item)
+    calls = rounds * len(inputs)
+    samples: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter_ns()
+        for _ in range(rounds):
+            for item in inputs:
+                func(item)
+        samples.append((time.perf_counter_ns() - started) / calls / 1000)
+    return summarize(name, samples, calls * repeats)
+
+
+def write_results(
+    path: Path, results: Iterable[BenchmarkResult], *, mode: str = "full"
+) -> dict[str, Any]:
+    """Write results with the run's metadata; `mode` records how many rounds were run."""
+    payload = {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "mode": mode,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return payload
+
+
+def load_results(path: Path) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    """Metadata and results of a file written by `write_results`."""
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return dict(payload["meta"]), dict(payload["results"])
+
+
+def compare(
+    baseline: dict[str, dict[str, Any]],
+    current: dict[str, dict[str, Any]],
+    *,
+    tolerance: float,
+) -> list[Regression]:
+    """Benchmarks whose median got slower than the baseline by more than `tolerance`.
+
+    Benchmarks missing from either side are ignored so suites can grow.
+    """
+    regressions: list[Regression] = []
+    for name, result in sorted(current.items()):
+        reference = baseline.get(name)
+        if reference is None or reference["median_us"] <= 0:
+            continue
+        if result["median_us"] > reference["median_us"] * (1 + tolerance):
+            regressions.append(
+                Regression(
+                    name=name,
+                    baseline_us=reference["median_us"],
+                    current_us=result["median_us"],
+                )
+            )
+    return regressions
@@ -0,0 +1,191 @@
+"""Storage and scan cost of each table layout against a live ClickHouse.
+
+`python -m benchmarks.layouts` copies the seeded `ad_performance` table into one
+`bench_layout_<name>` table per layout, merges each into final parts, then
+reports compressed size on disk and, per query, latency plus the rows and bytes
+ClickHouse read. Seed a realistic volume first (`make seed-bulk`); on the demo
+data every layout fits in a handful of granules and the differences vanish.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.infra.clickhouse.schema import TABLE_LAYOUTS, TABLE_NAME, build_create_table_statement
+from app.infra.clickhouse.seed_data import parse_clickhouse_url
+from clickhouse_driver import Client
+
+from .harness import BenchmarkResult, summarize, write_results
+
+TABLE_PREFIX = "bench_layout_"
+# Bypass caches that would hide the cost of reading the table.
+QUERY_SETTINGS = {"use_query_cache": 0, "use_uncompressed_cache": 0}
+
+
+@dataclass(frozen=True, slots=True)
+class LayoutQuery:
+    name: str
+    sql: str
+    needs_sampling: bool = False
+
+
+QUERIES: tuple[LayoutQuery, ...] = (
+    LayoutQuery(
+        "recent_spend_by_source",
+        "SELECT source, sum(spend) FROM {table} WHERE date >= {last_date} - 30 GROUP BY source",
+    ),
+    LayoutQuery(
+        "monthly_trend",
+        "SELECT toStartOfMonth(date) AS month, sum(impressions), sum(clicks) FROM {table} "
+        "GROUP BY month ORDER BY month",
+    ),
+    LayoutQuery("country_filter", "SELECT sum(revenue) FROM {table} WHERE country = {country}"),
+    LayoutQuery(
+        "campaign_lookup",
+        "SELECT date, sum(clicks) FROM {table} WHERE campaign_name = {campaign} GROUP BY date",
+    ),
+    LayoutQuery(
+        "sampled_spend_by_source",
+        "SELECT source, sum(spend) * 10 FROM {table} SAMPLE 1 / 10 GROUP BY source",
+        needs_sampling=True,
+    ),
+)
+
+
+def _storage(client: Client, database: str, table: str) -> dict[str, int]:
+    rows = client.execute(
+        "SELECT sum(rows), sum(data_compressed_bytes), sum(data_uncompressed_bytes), count() "
+        "FROM system.parts WHERE active AND database = %(database)s AND table = %(table)s",
+        {"database": database, "table": table},
+    )
+    total_rows, compressed, uncompressed, parts = rows[0]
+    return {
+        "rows": int(total_rows or 0),
+        "compressed_bytes": int(compressed or 0),
+        "uncompressed_bytes": int(uncompressed or 0),
+        "parts": int(parts),
+    }
+
+
+def _prepare(client: Client, database: str, layout: str) -> str:
+    table = f"{TABLE_PREFIX}{layout}"
+    client.execute(f"DROP TABLE IF EXISTS {database}.{table}")
+    client.execute(build_create_table_statement(database, layout=layout, table=table))
+    client.execute(f"INSERT INTO {database}.{table} SELECT * FROM {database}.{TABLE_NAME}")
+    client.execute(f"OPTIMIZE TABLE {database}.{table} FINAL")
+    return table
+
+
+def _run_query(
+    client: Client, layout: str, query: LayoutQuery, sql: str, repeats: int
+) -> BenchmarkResult:
+    client.execute(sql, settings=QUERY_SETTINGS)  # warm-up: loads marks and primary index
+    samples: list[float] = []
+    read_rows = read_bytes = 0
+    for _ in range(repeats):
+        started = time.perf_counter_ns()
+        client.execute(sql, settings=QUERY_SETTINGS)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+        progress = client.last_query.progress
+        read_rows, read_bytes = progress.rows, progress.bytes
+    return summarize(
+        f"layout.{layout}.{query.name}",
+        samples,
+        repeats,
+        read_rows=read_rows,
+        read_bytes=read_bytes,
+    )
+
+
+def run(
+    client: Client,
+    database: str,
+    layouts: Sequence[str],
+    *,
+    repeats: int,
+    keep_tables: bool = False,
+) -> list[BenchmarkResult]:
+    last_date, country, campaign = client.execute(
+        f"SELECT max(date), any(country), any(campaign_name) FROM {database}.{TABLE_NAME}"
+    )[0]
+    if last_date is None:
+        raise SystemExit(f"{database}.{TABLE_NAME} is empty; seed it first")
+    params: dict[str, Any] = {
+        "last_date": f"toDate('{last_date.isoformat()}')",
+        "country": f"'{country}'",
+        "campaign": "'" + campaign.replace("'", "\\'") + "'",
+    }
+
+    results: list[BenchmarkResult] = []
+    for layout in layouts:
+        table = _prepare(client, database, layout)
+        storage = _storage(client, database, table)
+        results.append(summarize(f"layout.{layout}.storage", [0.0], 1, **storage))
+        for query in QUERIES:
+            if query.needs_sampling and TABLE_LAYOUTS[layout].sample_by is None:
+                continue
+            sql = query.sql.format(table=f"{database}.{table}", **params)
+            results.append(_run_query(client, layout, query, sql, repeats))
+        if not keep_tables:
+            client.execute(f"DROP TABLE {database}.{table}")
+    return results
+
+
+def _print(results: Sequence[BenchmarkResult]) -> None:
+    for result in results:
+        extra = result.extra or {}
+        if result.name.endswith(".storage"):
+            ratio = extra["uncompressed_bytes"] / max(extra["compressed_bytes"], 1)
+            print(
+                f"{result.name:<44} {extra['compressed_bytes'] / 2**20:>10.1f} MiB on disk"
+                f"   {ratio:>5.1f}x compression   {extra['parts']} parts"
+            )
+            continue
+        print(
+            f"{result.name:<44} median {result.median_us / 1000:>9.2f} ms"
+            f"   read {extra['read_rows']:>12,} rows {extra['read_bytes'] / 2**20:>9.1f} MiB"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare table layouts on live ClickHouse.")
+    parser.add_argument(
+        "--layouts", default=",".join(TABLE_LAYOUTS), help="Comma-separated layouts to compare."
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per query.")
+    parser.add_argument("--output", type=Path, default=Path("bench_layouts.json"))
+    parser.add_argument(
+        "--keep-tables", action="store_true", help="Keep the bench_layout_* tables."
+    )
+    args = parser.parse_args(argv)
+
+    layouts = [layout.strip() for layout in args.layouts.split(",") if layout.strip()]
+    unknown = sorted(set(layouts) - set(TABLE_LAYOUTS))
+    if unknown:
+        parser.error(f"unknown layouts: {', '.join(unknown)}")
+
+    host, port, database = parse_clickhouse_url(
+        os.environ.get("CLICKHOUSE_URL", "clickhouse://localhost:9000/marketing")
+    )
+    client = Client(
+        host=host,
+        port=port,
+        database=database,
+        user=os.environ.get("CLICKHOUSE_USER", "default"),
+        password=os.environ.get("CLICKHOUSE_PASSWORD", ""),
+    )
+    results = run(client, database, layouts, repeats=args.repeats, keep_tables=args.keep_tables)
+    _print(results)
+    write_results(args.output, results)
+    print(f"\nWrote {len(results)} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
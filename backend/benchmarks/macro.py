@@ -0,0 +1,96 @@
+"""End-to-end `QueryOrchestrator.run` benchmarks against in-process fakes."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.domain.services.orchestrator import QueryOrchestrator
+from app.infra.cache.client import RedisCache
+from app.infra.llm.stub_client import StubLLMClient
+from tests.fakes import FakeRedis, stub_settings
+
+from .corpus import QUESTIONS
+from .fakes import FakeClickHouse
+from .harness import BenchmarkResult, summarize
+
+
+def _orchestrator(clickhouse: FakeClickHouse, *, llm_latency_ms: int = 0) -> QueryOrchestrator:
+    settings = stub_settings(LLM_STUB_LATENCY_MS=llm_latency_ms)
+    return QueryOrchestrator(
+        settings=settings,
+        llm_client=StubLLMClient(settings),
+        clickhouse=clickhouse,  # type: ignore[arg-type]
+        cache=RedisCache(FakeRedis(), settings),  # type: ignore[arg-type]
+    )
+
+
+async def _cold(repeats: int) -> BenchmarkResult:
+    """Every question misses the cache: LLM, normalization, query and summary."""
+    samples: list[float] = []
+    for _ in range(repeats):
+        orchestrator = _orchestrator(FakeClickHouse())
+        started = time.perf_counter_ns()
+        for question in QUESTIONS:
+            await orchestrator.run(question=question, user_id=None)
+        samples.append((time.perf_counter_ns() - started) / len(QUESTIONS) / 1000)
+    return summarize("macro.run.cold", samples, repeats * len(QUESTIONS))
+
+
+async def _warm(repeats: int, rounds: int) -> BenchmarkResult:
+    """Every question is answered from the cache."""
+    orchestrator = _orchestrator(FakeClickHouse())
+    for question in QUESTIONS:
+        await orchestrator.run(question=question, user_id=None)
+    samples: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter_ns()
+        for _ in range(rounds):
+            for question in QUESTIONS:
+                await orchestrator.run(question=question, user_id=None)
+        samples.append((time.perf_counter_ns() - started) / (rounds * len(QUESTIONS)) / 1000)
+    return summarize("macro.run.warm", samples, repeats * rounds * len(QUESTIONS))
+
+
+async def _concurrent(repeats: int, fan_out: int) -> BenchmarkResult:
+    """`fan_out` concurrent callers per question against a cold cache.
+
+    LLM and ClickHouse latencies are simulated so single-flight coalescing shows
+    up both in wall time and in the number of backend calls.
+    """
+    samples: list[float] = []
+    clickhouse_calls = 0
+    requests = fan_out * len(QUESTIONS)
+    for _ in range(repeats):
+        clickhouse = FakeClickHouse(latency=0.005)
+        orchestrator = _orchestrator(clickhouse, llm_latency_ms=5)
+        started = time.perf_counter_ns()
+        await asyncio.gather(
+            *(
+                orchestrator.run(question=question, user_id=None)
+                for question in QUESTIONS
+                for _ in range(fan_out)
+            )
+        )
+        samples.append((time.perf_counter_ns() - started) / requests / 1000)
+        clickhouse_calls = clickhouse.calls
+    return summarize(
+        "macro.run.concurrent",
+        samples,
+        repeats * requests,
+        requests=requests,
+        clickhouse_calls=clickhouse_calls,
+    )
+
+
+def run(*, quick: bool = False) -> list[BenchmarkResult]:
+    repeats = 3 if quick else 7
+
+    async def _suite() -> list[BenchmarkResult]:
+        return [
+            await _cold(repeats),
+            await _warm(repeats, rounds=5 if quick else 25),
+            await _concurrent(repeats, fan_out=10 if quick else 25),
+        ]
+
+    return asyncio.run(_suite())
@@ -0,0 +1,87 @@
+"""Micro-benchmarks for the CPU-bound steps between the LLM and ClickHouse."""
+
+from __future__ import annotations
+
+from app.domain.services.prompt_builder import render_sql_prompt, render_summary_prompt
+from app.domain.services.sql_builder import clean_sql_output
+from app.infra.cache.keys import fingerprint, question_key, result_key
+from app.infra.serialization.json_utils import to_json
+from app.infra.sql.fingerprint import sql_fingerprint
+from app.infra.sql.normalizer import (
+    clear_normalize_cache,
+    normalize_sql_for_clickhouse,
+    normalize_sql_statement,
+)
+from app.infra.sql.validator import SQLPolicy, validate_clickhouse_sql
+
+from .corpus import LLM_OUTPUTS, QUESTIONS, SQL_STATEMENTS, result_rows
+from .harness import BenchmarkResult, time_per_call
+
+_POLICY = SQLPolicy.from_schema(database="marketing", max_complexity=12)
+
+
+def _normalize_cold(sql: str) -> str:
+    clear_normalize_cache()
+    return normalize_sql_for_clickhouse(sql)
+
+
+def _normalize_with_policy_cold(sql: str) -> str:
+    clear_normalize_cache()
+    return normalize_sql_statement(sql, _POLICY).sql
+
+
+def _result_key_cold(sql: str) -> str:
+    sql_fingerprint.cache_clear()
+    return result_key(sql)
+
+
+def run(*, quick: bool = False) -> list[BenchmarkResult]:
+    scale = 1 if quick else 10
+    rows = result_rows(100)
+    question_sql = list(zip(QUESTIONS, SQL_STATEMENTS, strict=True))
+    payloads = [{"sql": SQL_STATEMENTS[0], "data": rows, "summary": "ok", "truncated": False}]
+
+    return [
+        time_per_call("micro.clean_sql_output", clean_sql_output, LLM_OUTPUTS, rounds=20 * scale),
+        time_per_call("micro.normalize_sql.cold", _normalize_cold, SQL_STATEMENTS, rounds=scale),
+        time_per_call(
+            "micro.normalize_sql.cached",
+            normalize_sql_for_clickhouse,
+            SQL_STATEMENTS,
+            rounds=50 * scale,
+        ),
+        time_per_call(
+            "micro.normalize_sql.policy_cold",
+            _normalize_with_policy_cold,
+            SQL_STATEMENTS,
+            rounds=scale,
+        ),
+        time_per_call(
+            "micro.validate_clickhouse_sql",
+            validate_clickhouse_sql,
+            SQL_STATEMENTS,
+            rounds=5 * scale,
+        ),
+        time_per_call(
+            "micro.fingerprint",
+            lambda pair: fingerprint(pair[0], pair[1]),
+            question_sql,
+            rounds=50 * scale,
+        ),
+        time_per_call("micro.question_key", question_key, QUESTIONS, rounds=50 * scale),
+        time_per_call("micro.result_key.cold", _result_key_cold, SQL_STATEMENTS, rounds=scale),
+        time_per_call("micro.result_key.cached", result_key, SQL_STATEMENTS, rounds=50 * scale),
+        time_per_call(
+            "micro.render_sql_prompt",
+            lambda question: render_sql_prompt(question, [f"Q: {question}"]),
+            QUESTIONS,
+            rounds=20 * scale,
+        ),
+        time_per_call(
+            "micro.render_summary_prompt",
+            lambda pair: render_summary_prompt(pair[0], pair[1], rows),
+            question_sql,
+            rounds=2 * scale,
+        ),
+        time_per_call("micro.to_json.100_rows", to_json, payloads, rounds=20 * scale),
+    ]
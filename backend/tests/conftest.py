@@ -0,0 +1,25 @@
+"""Fixtures shared by the unit and integration tests."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pytest
+from app.infra.config import Settings
+from tests.fakes import FakeRedis, stub_settings
+
+
+@pytest.fixture
+def make_settings() -> Callable[..., Settings]:
+    """Build `Settings` for the stub LLM provider plus keyword overrides."""
+    return stub_settings
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return stub_settings()
+
+
+@pytest.fixture
+def redis() -> FakeRedis:
+    return FakeRedis()
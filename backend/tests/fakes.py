@@ -0,0 +1,99 @@
+"""In-process stand-ins shared by the tests and the macro benchmarks."""
+
+from __future__ import annotations
+
+from collections.abc import Set as AbstractSet
+from typing import Any
+
+from app.infra.config import Settings
+
+
+def stub_settings(**overrides: Any) -> Settings:
+    """`Settings` for the stub LLM provider, ignoring the environment, plus `overrides`."""
+    values: dict[str, Any] = {
+        "CLICKHOUSE_URL": "clickhouse://localhost:9000/marketing",
+        "CLICKHOUSE_USER": "default",
+        "CLICKHOUSE_PASSWORD": "",
+        "REDIS_URL": "redis://localhost:6379/0",
+        "LLM_PROVIDER": "stub",
+        "LLM_API_KEY": None,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+class FakeRedisPipeline:
+    """Queues set writes and applies them on `execute`, like a non-transactional pipeline."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._members: list[tuple[str, str]] = []
+
+    def sadd(self, key: str, member: str) -> None:
+        self._members.append((key, member))
+
+    def expire(self, key: str, ttl: int) -> None:
+        return None
+
+    async def execute(self) -> list[Any]:
+        for key, member in self._members:
+            self._redis.sets.setdefault(key, set()).add(member)
+        return []
+
+
+class FakeRedis:
+    """Dictionary-backed subset of the async Redis API used by the cache layer.
+
+    Expiry is recorded in `expiry` but never enforced; tests move time by
+    editing `store` directly.
+    """
+
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.expiry: dict[str, int] = {}
+        self.sets: dict[str, set[str]] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.store.get(key)
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        return [self.store.get(key) for key in keys]
+
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ex: int | None = None,
+        px: int | None = None,
+        nx: bool = False,
+    ) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value
+        if ex is not None:
+            self.expiry[key] = ex
+        return True
+
+    async def ttl(self, key: str) -> int:
+        return self.expiry.get(key, -1) if key in self.store else -2
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.store)
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        if self.store.get(key) == token:
+            del self.store[key]
+            return 1
+        return 0
+
+    async def publish(self, channel: str, message: str) -> int:
+        return 0
+
+    async def smembers(self, key: str) -> AbstractSet[str]:
+        return set(self.sets.get(key, set()))
+
+    async def sunion(self, keys: list[str]) -> AbstractSet[str]:
+        return set().union(*(self.sets.get(key, set()) for key in keys))
+
+    def pipeline(self, transaction: bool = True) -> FakeRedisPipeline:
+        return FakeRedisPipeline(self)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from typing import Any
 
 import pytest
@@ -9,6 +11,8 @@ from app.domain.services.orchestrator import QueryOrchestrator
 from app.infra.cache.client import RedisCache
 from app.infra.config import get_settings
 from app.infra.llm.base import LLMClientProtocol
+from app.infra.tracing import InMemoryExporter, tracer
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 
@@ -23,6 +27,24 @@ class StubLLM(LLMClientProtocol):
         return "SELECT source, sum(spend) AS total_spend FROM ad_performance LIMIT 10"
 
 
+class HangingLLM(StubLLM):
+    """Never answers; records when a call starts and whether it was cancelled."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.called = asyncio.Event()
+        self.cancelled = False
+
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        self.called.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        raise AssertionError("unreachable")
+
+
 class StubClickHouse:
     def __init__(self) -> None:
         self.database = "default"
@@ -30,6 +52,13 @@ class StubClickHouse:
     async def query(self, sql: str) -> list[dict[str, Any]]:
         return [{"source": "facebook", "total_spend": 123.45}]
 
+    async def query_columnar(self, sql: str) -> dict[str, Any]:
+        return {
+            "columns": ["source", "total_spend"],
+            "types": ["String", "Float64"],
+            "data": [["facebook"], [123.45]],
+        }
+
     async def execute_scalar(self, sql: str) -> int:
         return 1
 
@@ -47,8 +76,30 @@ class StubRedis:
     async def get(self, key: str) -> str | None:
         return self._store.get(key)
 
-    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ex: int | None = None,
+        px: int | None = None,
+        nx: bool = False,
+    ) -> bool:
+        if nx and key in self._store:
+            return False
         self._store[key] = value
+        return True
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        return [self._store.get(key) for key in keys]
+
+    async def exists(self, key: str) -> int:
+        return int(key in self._store)
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        if self._store.get(key) == token:
+            del self._store[key]
+            return 1
+        return 0
 
     async def ping(self) -> bool:
         return True
@@ -72,10 +123,12 @@ def configure_env(monkeypatch: pytest.MonkeyPatch) -> None:
     get_settings.cache_clear()  # type: ignore[attr-defined]
 
 
-def test_query_endpoint_happy_path(monkeypatch: pytest.MonkeyPatch) -> None:
+def _create_test_app(
+    monkeypatch: pytest.MonkeyPatch, stub_llm: LLMClientProtocol | None = None
+) -> FastAPI:
     QueryRequest.model_rebuild()
     settings = get_settings()
-    stub_llm = StubLLM()
+    stub_llm = stub_llm or StubLLM()
     stub_clickhouse = StubClickHouse()
     stub_redis = StubRedis()
     stub_cache = RedisCache(stub_redis, settings)
@@ -98,7 +151,11 @@ def test_query_endpoint_happy_path(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr("app.app.get_llm_client", lambda _settings: stub_llm)
     monkeypatch.setattr("app.app.QueryOrchestrator", lambda **kwargs: orchestrator)
 
-    app = create_app(settings)
+    return create_app(settings)
+
+
+def test_query_endpoint_happy_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    app = _create_test_app(monkeypatch)
 
     with TestClient(app) as client:
         response = client.post(
@@ -110,3 +167,177 @@ def test_query_endpoint_happy_path(monkeypatch: pytest.MonkeyPatch) -> None:
         assert payload["sql"].startswith("SELECT")
         assert payload["data"] == [{"source": "facebook", "total_spend": 123.45}]
         assert "results look great" in payload["summary"].lower()
+        assert payload["truncated"] is False
+
+
+def test_query_stream_endpoint_emits_stages_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    app = _create_test_app(monkeypatch)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/query/stream",
+            json={"question": "What is total spend by source?", "user_id": "user-123"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            line.removeprefix("event: ")
+            for line in response.text.splitlines()
+            if line.startswith("event: ")
+        ]
+        assert events == ["sql", "data", "summary", "done"]
+        assert '"total_spend": 123.45' in response.text
+
+
+def test_query_batch_endpoint_deduplicates_and_reports_per_item_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    app = _create_test_app(monkeypatch)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/query/batch",
+            json={
+                "queries": [
+                    {"question": "What is total spend by source?"},
+                    {"question": "   "},
+                    {"question": "what is total spend by source?"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [item["question"] for item in results] == [
+            "What is total spend by source?",
+            "   ",
+            "what is total spend by source?",
+        ]
+        assert results[0]["result"] == results[2]["result"]
+        assert results[0]["result"]["data"] == [{"source": "facebook", "total_spend": 123.45}]
+        assert results[1]["result"] is None
+        assert results[1]["error"] == "Question cannot be empty"
+
+
+def test_query_endpoint_columnar_format(monkeypatch: pytest.MonkeyPatch) -> None:
+    app = _create_test_app(monkeypatch)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/query",
+            json={"question": "What is total spend by source?", "format": "columnar"},
+        )
+        assert response.status_code == 200
+        assert response.json()["data"] == {
+            "columns": ["source", "total_spend"],
+            "types": ["String", "Float64"],
+            "data": [["facebook"], [123.45]],
+        }
+
+
+def test_metrics_endpoint_reports_pipeline_stages(monkeypatch: pytest.MonkeyPatch) -> None:
+    app = _create_test_app(monkeypatch)
+
+    with TestClient(app) as client:
+        client.post("/api/v1/query", json={"question": "Total spend per source for metrics?"})
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    for stage in ("cache_read", "sql_llm", "sql_normalize", "clickhouse_query", "summary_llm"):
+        assert f'orchestrator_stage_seconds_count{{stage="{stage}"}}' in body
+    assert 'orchestrator_cache_lookups_total{cache="answer",result="miss"}' in body
+    assert 'orchestrator_request_seconds_count{mode="run",outcome="computed"}' in body
+    assert "sql_normalize_cache_requests_total" in body
+
+
+def test_request_trace_covers_pipeline_stages(monkeypatch: pytest.MonkeyPatch) -> None:
+    exporter = InMemoryExporter()
+    monkeypatch.setattr("app.app.build_exporter", lambda _settings: exporter)
+    app = _create_test_app(monkeypatch)
+
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/v1/query", json={"question": "Which source spent most for tracing?"}
+            )
+    finally:
+        tracer.configure(None)
+
+    request_id = response.headers["X-Request-ID"]
+    [trace] = [t for t in exporter.traces if t[-1].name == "http.request"]
+    assert {span.trace_id for span in trace} == {request_id}
+    names = [span.name for span in trace]
+    for name in (
+        "orchestrator.run",
+        "orchestrator.sql_llm",
+        "orchestrator.sql_normalize",
+        "orchestrator.clickhouse_query",
+        "orchestrator.summary_llm",
+        "cache.read_many",
+        "cache.write",
+    ):
+        assert name in names
+    normalize = next(span for span in trace if span.name == "orchestrator.sql_normalize")
+    assert isinstance(normalize.attributes["sql_hash"], str)
+
+
+def test_simple_results_are_summarised_without_the_llm(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SUMMARY_MODE", "auto")
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+    app = _create_test_app(monkeypatch)
+
+    with TestClient(app) as client:
+        response = client.post("/api/v1/query", json={"question": "Spend by source, locally?"})
+
+    assert response.status_code == 200
+    assert response.json()["summary"] == (
+        "The query returned one row: source is facebook; total spend is 123.45."
+    )
+
+
+def test_client_disconnect_cancels_the_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("REQUEST_DISCONNECT_POLL_MS", "5")
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+    llm = HangingLLM()
+    app = _create_test_app(monkeypatch, llm)
+    body = json.dumps({"question": "Spend by source, then hang up?"}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/v1/query",
+        "raw_path": b"/api/v1/query",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    incoming = [{"type": "http.request", "body": body, "more_body": False}]
+    hung_up = asyncio.Event()
+    sent: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        # Like uvicorn: once the client is gone, the disconnect is returned without waiting.
+        if incoming:
+            return incoming.pop()
+        await hung_up.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    async def scenario() -> None:
+        async with app.router.lifespan_context(app):
+            request = asyncio.create_task(app(scope, receive, send))
+            await asyncio.wait_for(llm.called.wait(), 1)
+            hung_up.set()
+            await asyncio.wait_for(request, 1)
+
+    asyncio.run(scenario())
+
+    assert llm.cancelled
+    assert sent[0]["status"] == 499
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from benchmarks.harness import compare, load_results, summarize, time_per_call, write_results
+
+
+def _results(**medians: float) -> dict[str, dict[str, float]]:
+    return {name: {"median_us": median} for name, median in medians.items()}
+
+
+def test_compare_flags_only_slowdowns_beyond_tolerance() -> None:
+    baseline = _results(fast=10.0, steady=10.0, slow=10.0)
+    current = _results(fast=5.0, steady=12.0, slow=13.0)
+
+    regressions = compare(baseline, current, tolerance=0.25)
+
+    assert [r.name for r in regressions] == ["slow"]
+    assert regressions[0].ratio == 1.3
+
+
+def test_compare_ignores_benchmarks_missing_from_either_side() -> None:
+    assert compare(_results(old=1.0), _results(new=100.0), tolerance=0.1) == []
+
+
+def test_results_round_trip_through_json(tmp_path: Path) -> None:
+    result = time_per_call("noop", lambda value: value, [1, 2, 3], rounds=2, repeats=3)
+    path = tmp_path / "results.json"
+
+    write_results(path, [result, summarize("manual", [1.0, 3.0, 2.0], 3, calls=1)], mode="quick")
+    meta, loaded = load_results(path)
+
+    assert meta["mode"] == "quick"
+    assert loaded["noop"]["operations"] == 18
+    assert loaded["manual"]["median_us"] == 2.0
+    assert loaded["manual"]["extra"] == {"calls": 1}
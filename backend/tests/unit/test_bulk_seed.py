@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from datetime import date
+from typing import Any
+
+import numpy as np
+import pytest
+from app.infra.clickhouse.bulk_seed import (
+    SeedBlockGenerator,
+    SeedScale,
+    bulk_seed,
+    iter_block_ranges,
+)
+from app.infra.clickhouse.schema import COLUMNS, ROLLUPS
+
+SCALE = SeedScale(
+    days=14,
+    sources=("google", "facebook", "tiktok"),
+    campaigns_per_source=4,
+    countries=5,
+    end_date=date(2024, 3, 31),
+)
+
+
+class RecordingConnection:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.blocks: list[list[list[Any]]] = []
+        self._lock = threading.Lock()
+
+    def connect(self) -> Any:
+        return self.execute
+
+    def execute(self, sql: str, data: Any = None, **kwargs: Any) -> None:
+        with self._lock:
+            self.statements.append(sql)
+            if data is not None:
+                assert kwargs["columnar"] is True
+                self.blocks.append(data)
+
+
+def _rows(blocks: list[list[list[Any]]]) -> list[tuple[Any, ...]]:
+    return sorted(row for block in blocks for row in zip(*block, strict=True))
+
+
+def test_block_ranges_cover_every_row_once() -> None:
+    ranges = list(iter_block_ranges(10, 4))
+
+    assert ranges == [(0, 0, 4), (1, 4, 8), (2, 8, 10)]
+
+
+def test_generated_columns_are_consistent() -> None:
+    columns = SeedBlockGenerator(SCALE).block(0, 0, SCALE.total_rows)
+    data = dict(zip((column.name for column in COLUMNS), columns, strict=True))
+
+    assert all(isinstance(values, np.ndarray) for values in columns)
+    assert all(len(values) == SCALE.total_rows for values in columns)
+    assert min(data["date"]) == date(2024, 3, 18)
+    assert max(data["date"]) == date(2024, 3, 31)
+    assert set(data["source"]) == set(SCALE.sources)
+    assert len(set(data["campaign_id"])) == 3 * 4
+    assert len(set(data["country"])) == 5
+    for impressions, clicks, conversions in zip(
+        data["impressions"], data["clicks"], data["conversions"], strict=True
+    ):
+        assert 0 <= conversions <= clicks <= impressions
+    assert all(spend >= 0 for spend in data["spend"])
+
+
+def test_blocks_are_reproducible() -> None:
+    first = SeedBlockGenerator(SCALE).block(3, 40, 80)
+    second = SeedBlockGenerator(SCALE).block(3, 40, 80)
+
+    assert all(np.array_equal(a, b) for a, b in zip(first, second, strict=True))
+
+
+def test_parallel_seeding_inserts_the_same_rows() -> None:
+    serial, parallel = RecordingConnection(), RecordingConnection()
+
+    report = bulk_seed(serial.connect, database="bench", scale=SCALE, block_size=50)
+    bulk_seed(parallel.connect, database="bench", scale=SCALE, block_size=50, workers=3)
+
+    assert report.rows == SCALE.total_rows == len(_rows(serial.blocks))
+    assert report.blocks == len(serial.blocks) == 17
+    assert _rows(serial.blocks) == _rows(parallel.blocks)
+
+
+def test_seeding_truncates_the_table_and_its_rollups() -> None:
+    connection = RecordingConnection()
+
+    bulk_seed(connection.connect, database="bench", scale=SCALE)
+
+    truncates = [sql for sql in connection.statements if sql.startswith("TRUNCATE")]
+    assert truncates[0] == "TRUNCATE TABLE bench.ad_performance"
+    assert truncates[1:] == [f"TRUNCATE TABLE IF EXISTS bench.{rollup.name}" for rollup in ROLLUPS]
+
+
+def test_scale_rejects_empty_dimensions() -> None:
+    with pytest.raises(ValueError):
+        SeedScale(campaigns_per_source=0)
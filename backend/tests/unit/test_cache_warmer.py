@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from app.domain.services.cache_warmer import CacheWarmer, load_questions_file
+from app.infra.cache.client import RedisCache
+from app.infra.config import Settings
+from tests.fakes import FakeRedis
+
+
+class FakeOrchestrator:
+    def __init__(self, ttls: dict[str, int | None], failing: frozenset[str] = frozenset()) -> None:
+        self.ttls = ttls
+        self.failing = failing
+        self.runs: list[str] = []
+        self.refreshes: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def cached_ttl(self, question: str) -> int | None:
+        return self.ttls.get(question)
+
+    async def run(self, *, question: str, user_id: str | None) -> dict[str, Any]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if question in self.failing:
+            raise RuntimeError("LLM unavailable")
+        self.runs.append(question)
+        return {}
+
+    async def refresh(self, question: str) -> dict[str, Any]:
+        self.refreshes.append(question)
+        return {}
+
+
+@pytest.fixture
+def make_warmer_settings(make_settings: Callable[..., Settings]) -> Callable[..., Settings]:
+    def _make(**overrides: Any) -> Settings:
+        values: dict[str, Any] = {
+            "CACHE_WARM_INTERVAL_SECONDS": 600,
+            "CACHE_WARM_LLM_CALLS_PER_MINUTE": 60_000,
+        }
+        return make_settings(**{**values, **overrides})
+
+    return _make
+
+
+def test_pass_fills_misses_refreshes_expiring_and_skips_fresh_entries(
+    make_warmer_settings: Callable[..., Settings], redis: FakeRedis
+) -> None:
+    orchestrator = FakeOrchestrator({"fresh": 3000, "expiring": 120}, failing=frozenset({"bad"}))
+    settings = make_warmer_settings()
+    warmer = CacheWarmer(orchestrator, RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+
+    report = asyncio.run(warmer.warm(["missing", "fresh", "expiring", "bad"]))
+
+    assert orchestrator.runs == ["missing"]
+    assert orchestrator.refreshes == ["expiring"]
+    assert (report.total, report.warmed, report.refreshed, report.skipped, report.failed) == (
+        4,
+        1,
+        1,
+        1,
+        1,
+    )
+
+
+def test_concurrency_is_bounded(
+    make_warmer_settings: Callable[..., Settings], redis: FakeRedis
+) -> None:
+    orchestrator = FakeOrchestrator({})
+    settings = make_warmer_settings(CACHE_WARM_CONCURRENCY=2)
+    warmer = CacheWarmer(orchestrator, RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+
+    asyncio.run(warmer.warm([f"question {index}" for index in range(6)]))
+
+    assert len(orchestrator.runs) == 6
+    assert orchestrator.max_in_flight == 2
+
+
+def test_llm_budget_spaces_out_computations(
+    make_warmer_settings: Callable[..., Settings], redis: FakeRedis
+) -> None:
+    orchestrator = FakeOrchestrator({})
+    # Two calls per question at 1200 calls/minute is one question every 100 ms.
+    settings = make_warmer_settings(CACHE_WARM_CONCURRENCY=4, CACHE_WARM_LLM_CALLS_PER_MINUTE=1200)
+    warmer = CacheWarmer(orchestrator, RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+
+    report = asyncio.run(warmer.warm(["a", "b", "c"]))
+
+    assert report.warmed == 3
+    assert report.seconds >= 0.2
+
+
+def test_questions_come_from_file_and_redis_set_without_duplicates(
+    tmp_path: Path, make_warmer_settings: Callable[..., Settings], redis: FakeRedis
+) -> None:
+    path = tmp_path / "questions.txt"
+    path.write_text("# suggested prompts\nSpend by source\n\nClicks by day\n", encoding="utf-8")
+    settings = make_warmer_settings(
+        CACHE_WARM_QUESTIONS_PATH=str(path), CACHE_WARM_REDIS_KEY="warm:questions"
+    )
+    redis.sets["warm:questions"] = {"Clicks by day", "Top campaigns"}
+    warmer = CacheWarmer(
+        FakeOrchestrator({}), RedisCache(redis, settings), settings  # type: ignore[arg-type]
+    )
+
+    assert load_questions_file(path) == ["Spend by source", "Clicks by day"]
+    assert asyncio.run(warmer.load_questions()) == [
+        "Spend by source",
+        "Clicks by day",
+        "Top campaigns",
+    ]
+
+
+def test_only_the_lease_holder_runs_a_scheduled_pass(
+    make_warmer_settings: Callable[..., Settings], redis: FakeRedis
+) -> None:
+    settings = make_warmer_settings(CACHE_WARM_INTERVAL_SECONDS=0)
+    cache = RedisCache(redis, settings)  # type: ignore[arg-type]
+    first = FakeOrchestrator({})
+    second = FakeOrchestrator({})
+
+    async def scenario() -> None:
+        await CacheWarmer(first, cache, settings).start()  # type: ignore[arg-type]
+        await CacheWarmer(second, cache, settings).start()  # type: ignore[arg-type]
+
+    asyncio.run(scenario())
+
+    assert len(first.runs) == 3  # the bundled question list
+    assert second.runs == []
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+from app.infra.clickhouse.pool import ClickHouseConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def execute(self, sql: str) -> str:
+        with FakeConnection.lock:
+            FakeConnection.active += 1
+            FakeConnection.peak = max(FakeConnection.peak, FakeConnection.active)
+        time.sleep(0.02)
+        with FakeConnection.lock:
+            FakeConnection.active -= 1
+        return sql
+
+    def disconnect(self) -> None:
+        return None
+
+
+def test_pool_bounds_concurrency_and_reuses_connections() -> None:
+    created: list[FakeConnection] = []
+
+    def factory() -> FakeConnection:
+        connection = FakeConnection()
+        created.append(connection)
+        return connection
+
+    pool = ClickHouseConnectionPool(factory, size=3, acquire_timeout=5)
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(
+            *(pool.run(lambda client, i=i: client.execute(f"SELECT {i}")) for i in range(12))
+        )
+
+    results = asyncio.run(scenario())
+    stats = pool.stats()
+    pool.close()
+
+    assert results == [f"SELECT {i}" for i in range(12)]
+    assert len(created) == 3
+    assert FakeConnection.peak <= 3
+    assert stats.acquisitions == 12
+    assert stats.in_use == 0
+    assert stats.wait_seconds_max > 0
+
+
+def test_pool_times_out_when_connections_are_exhausted() -> None:
+    pool = ClickHouseConnectionPool(FakeConnection, size=1, acquire_timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+
+    assert pool.stats().timeouts == 1
+    pool.close()
+
+
+def test_queued_runs_time_out_instead_of_waiting_for_a_thread() -> None:
+    pool = ClickHouseConnectionPool(FakeConnection, size=1, acquire_timeout=0.05)
+
+    def slow(client: FakeConnection) -> str:
+        time.sleep(0.3)
+        return "done"
+
+    async def timed() -> tuple[str | BaseException, float]:
+        started = time.monotonic()
+        try:
+            return await pool.run(slow), time.monotonic() - started
+        except PoolTimeoutError as exc:
+            return exc, time.monotonic() - started
+
+    async def scenario() -> list[tuple[str | BaseException, float]]:
+        return await asyncio.gather(*(timed() for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    stats = pool.stats()
+    pool.close()
+
+    assert results[0][0] == "done"
+    for result, elapsed in results[1:]:
+        assert isinstance(result, PoolTimeoutError)
+        # Bounded by the acquire timeout, not by the 0.3s query holding the connection.
+        assert 0.04 <= elapsed < 0.2
+    assert stats.timeouts == 2
+    assert stats.acquisitions == 1
+
+
+def test_queued_run_that_gets_a_slot_in_time_succeeds() -> None:
+    pool = ClickHouseConnectionPool(FakeConnection, size=1, acquire_timeout=1)
+
+    def slow(client: FakeConnection) -> str:
+        time.sleep(0.05)
+        return "done"
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(pool.run(slow), pool.run(slow))
+
+    results = asyncio.run(scenario())
+    stats = pool.stats()
+    pool.close()
+
+    assert results == ["done", "done"]
+    assert stats.timeouts == 0
+    assert stats.acquisitions == 2
+    assert stats.wait_seconds_max >= 0.04
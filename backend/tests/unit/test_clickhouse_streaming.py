@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+from app.infra.clickhouse.streaming import ResultLimits, read_bounded
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    def send_cancel(self) -> None:
+        self.cancelled = True
+
+
+class FakeClient:
+    def __init__(self, total_rows: int) -> None:
+        self.total_rows = total_rows
+        self.produced = 0
+        self.drained = False
+        self.settings: dict[str, Any] = {}
+        self.connection = FakeConnection()
+
+    def execute_iter(self, sql: str, **kwargs: Any) -> Iterator[Any]:
+        self.settings = kwargs["settings"]
+        yield [("source", "String"), ("spend", "Float64")]
+        for index in range(self.total_rows):
+            self.produced += 1
+            yield (f"source-{index}", float(index))
+
+    def packet_generator(self) -> Iterator[Any]:
+        self.drained = True
+        return iter(())
+
+    def disconnect(self) -> None:
+        return None
+
+
+def test_read_bounded_stops_at_row_cap_and_cancels() -> None:
+    client = FakeClient(total_rows=10_000)
+    limits = ResultLimits(max_rows=5, max_bytes=1_000_000, block_size=1024)
+
+    result = read_bounded(client, "SELECT source, spend FROM ad_performance", limits)
+
+    assert result["columns"] == ["source", "spend"]
+    assert result["types"] == ["String", "Float64"]
+    assert len(result["data"][0]) == 5
+    assert result.get("truncated") is True
+    assert client.produced == 6
+    assert client.connection.cancelled and client.drained
+    assert client.settings["max_result_rows"] == 6
+    assert client.settings["result_overflow_mode"] == "break"
+
+
+def test_read_bounded_stops_at_byte_cap() -> None:
+    client = FakeClient(total_rows=10_000)
+    limits = ResultLimits(max_rows=10_000, max_bytes=200, block_size=1024)
+
+    result = read_bounded(client, "SELECT source, spend FROM ad_performance", limits)
+
+    assert 0 < len(result["data"][0]) < 10
+    assert result.get("truncated") is True
+
+
+def test_read_bounded_keeps_complete_results_untruncated() -> None:
+    client = FakeClient(total_rows=5)
+    limits = ResultLimits(max_rows=5, max_bytes=1_000_000, block_size=1024)
+
+    result = read_bounded(client, "SELECT source, spend FROM ad_performance", limits)
+
+    assert result["data"][1] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert "truncated" not in result
+    assert not client.connection.cancelled
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable
+
+import httpx
+from app.infra.config import Settings
+from app.infra.llm.groq_client import GroqClient
+
+
+def test_groq_client_reuses_shared_async_http_client(
+    make_settings: Callable[..., Settings],
+) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = json.loads(request.content)
+        return httpx.Response(
+            200,
+            json={
+                "id": "cmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": " SELECT 1 "},
+                    }
+                ],
+            },
+        )
+
+    settings = make_settings(LLM_PROVIDER="groq", LLM_API_KEY="test-key")
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = GroqClient(settings, http_client=http_client)
+
+    async def scenario() -> list[str]:
+        results = await asyncio.gather(*(client.generate_text(f"prompt {i}") for i in range(5)))
+        await client.aclose()
+        return list(results)
+
+    assert asyncio.run(scenario()) == ["SELECT 1"] * 5
+    assert len(requests) == 5
+    assert http_client.is_closed
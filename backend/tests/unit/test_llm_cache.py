@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import pytest
+from app.domain.services.orchestrator import QueryOrchestrator
+from app.infra.cache.client import RedisCache
+from app.infra.cache.local import LocalCache
+from app.infra.config import Settings
+from app.infra.llm.cached_client import (
+    CachedLLMClient,
+    MemoryCompletionStore,
+    build_completion_store,
+)
+from tests.fakes import FakeRedis
+
+
+class CountingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        self.calls += 1
+        return f"completion for {prompt}"
+
+    async def stream_text(
+        self, prompt: str, *, temperature: float | None = None
+    ) -> AsyncIterator[str]:
+        self.calls += 1
+        for part in ("completion ", "for ", prompt):
+            yield part
+
+    async def aclose(self) -> None:
+        return None
+
+
+def _cached(inner: CountingLLM, **overrides: object) -> CachedLLMClient:
+    options: dict[str, object] = {
+        "name": "sql",
+        "model": "test-model",
+        "default_temperature": 0.2,
+        "max_temperature": 0.3,
+        "ttl_seconds": 60,
+    }
+    options.update(overrides)
+    store = MemoryCompletionStore(LocalCache(max_entries=16, max_bytes=1 << 20, ttl_seconds=60))
+    return CachedLLMClient(inner, store, **options)  # type: ignore[arg-type]
+
+
+def test_repeated_prompt_is_served_from_cache() -> None:
+    inner = CountingLLM()
+    client = _cached(inner)
+
+    async def scenario() -> list[str]:
+        return [
+            await client.generate_text("prompt a"),
+            await client.generate_text("prompt a"),
+            await client.generate_text("prompt b"),
+        ]
+
+    results = asyncio.run(scenario())
+
+    assert results == [
+        "completion for prompt a",
+        "completion for prompt a",
+        "completion for prompt b",
+    ]
+    assert inner.calls == 2
+    stats = client.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert round(stats.hit_rate, 2) == 0.33
+
+
+def test_temperature_is_part_of_the_key_and_hot_calls_bypass_cache() -> None:
+    inner = CountingLLM()
+    client = _cached(inner)
+
+    async def scenario() -> None:
+        await client.generate_text("prompt", temperature=0.0)
+        await client.generate_text("prompt", temperature=0.1)
+        await client.generate_text("prompt", temperature=0.9)
+        await client.generate_text("prompt", temperature=0.9)
+
+    asyncio.run(scenario())
+
+    assert inner.calls == 4
+    assert client.stats().bypassed == 2
+
+
+def test_streamed_completion_is_cached_for_later_calls() -> None:
+    inner = CountingLLM()
+    client = _cached(inner)
+
+    async def scenario() -> tuple[list[str], str, list[str]]:
+        streamed = [chunk async for chunk in client.stream_text("prompt")]
+        generated = await client.generate_text("prompt")
+        replayed = [chunk async for chunk in client.stream_text("prompt")]
+        return streamed, generated, replayed
+
+    streamed, generated, replayed = asyncio.run(scenario())
+
+    assert "".join(streamed) == "completion for prompt"
+    assert generated == "completion for prompt"
+    assert replayed == ["completion for prompt"]
+    assert inner.calls == 1
+
+
+def test_memory_store_keeps_completions_for_the_clients_own_ttl(
+    make_settings: Callable[..., Settings],
+) -> None:
+    settings = make_settings(
+        LLM_CACHE_BACKEND="memory",
+        LLM_CACHE_SQL_TTL_SECONDS=7 * 86400,
+        LLM_CACHE_SUMMARY_TTL_SECONDS=86400,
+    )
+    store = build_completion_store(settings, None, ttl_seconds=7 * 86400)  # type: ignore[arg-type]
+    assert isinstance(store, MemoryCompletionStore)
+    asyncio.run(store.set("sql-key", "SELECT 1", 7 * 86400))
+
+    two_days_later = time.monotonic() + 2 * 86400
+    store._local._clock = lambda: two_days_later
+
+    assert asyncio.run(store.get("sql-key")) == "SELECT 1"
+
+
+class ScriptedLLM(CountingLLM):
+    """Answers SQL prompts with `completions` in turn."""
+
+    def __init__(self, *completions: str) -> None:
+        super().__init__()
+        self.completions = list(completions)
+
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        self.calls += 1
+        return self.completions.pop(0)
+
+
+class OneRowClickHouse:
+    database = "default"
+
+    async def query_columnar(self, sql: str) -> dict[str, Any]:
+        return {"columns": ["spend"], "types": ["Float64"], "data": [[1.0]]}
+
+
+def test_rejected_sql_completions_are_not_cached(
+    make_settings: Callable[..., Settings], redis: FakeRedis
+) -> None:
+    settings = make_settings(
+        LLM_CACHE_ENABLED=True, LLM_CACHE_BACKEND="memory", SUMMARY_MODE="auto"
+    )
+    llm = ScriptedLLM(
+        "DROP TABLE ad_performance",
+        "SELECT sum(spend) AS spend FROM ad_performance",
+    )
+    orchestrator = QueryOrchestrator(
+        settings=settings,
+        llm_client=llm,
+        clickhouse=OneRowClickHouse(),  # type: ignore[arg-type]
+        cache=RedisCache(redis, settings),  # type: ignore[arg-type]
+    )
+
+    with pytest.raises(ValueError):
+        asyncio.run(orchestrator.run(question="Total spend", user_id=None))
+    answer = asyncio.run(orchestrator.run(question="Total spend", user_id=None))
+
+    assert answer["sql"].startswith("SELECT sum(spend)")
+    assert llm.calls == 2
+    assert orchestrator.llm_cache_stats()["sql"].misses == 2
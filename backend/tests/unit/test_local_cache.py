@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from app.infra.cache.local import LocalCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted_first() -> None:
+    cache = LocalCache(max_entries=2, max_bytes=1_000, ttl_seconds=60)
+    cache.set("a", {"v": 1}, size=10)
+    cache.set("b", {"v": 2}, size=10)
+    assert cache.get("a") == {"v": 1}
+
+    cache.set("c", {"v": 3}, size=10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.stats().evictions == 1
+
+
+def test_byte_budget_bounds_total_size() -> None:
+    cache = LocalCache(max_entries=10, max_bytes=25, ttl_seconds=60)
+    cache.set("a", "x", size=10)
+    cache.set("b", "y", size=10)
+    cache.set("c", "z", size=10)
+    cache.set("huge", "w", size=26)
+
+    stats = cache.stats()
+    assert stats.bytes == 20
+    assert cache.get("a") is None
+    assert cache.get("huge") is None
+
+
+def test_entries_expire_after_ttl_and_count_misses() -> None:
+    clock = FakeClock()
+    cache = LocalCache(max_entries=10, max_bytes=1_000, ttl_seconds=5, clock=clock)
+    cache.set("a", "x", size=1)
+    cache.set("b", "y", size=1, ttl_seconds=60)
+
+    clock.now = 6.0
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (0, 2, 0)
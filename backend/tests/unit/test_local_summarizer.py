@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+from typing import Any
+
+from app.domain.services.local_summarizer import classify_result, summarize_locally
+from app.domain.services.summarizer import Summarizer
+from app.infra.serialization.columnar import ColumnarResult
+
+
+class RecordingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        self.calls += 1
+        return "LLM summary"
+
+
+def _result(columns: dict[str, tuple[str, list[Any]]]) -> ColumnarResult:
+    return {
+        "columns": list(columns),
+        "types": [type_name for type_name, _ in columns.values()],
+        "data": [values for _, values in columns.values()],
+    }
+
+
+BREAKDOWN = _result(
+    {
+        "source": ("String", ["facebook", "google", "tiktok", "bing"]),
+        "total_spend": ("Float64", [1200.5, 800.0, 300.25, 100.0]),
+        "roas": ("Float64", [2.1, 1.5, 0.8, 1.1]),
+    }
+)
+
+
+def test_breakdown_reports_total_share_and_extremes() -> None:
+    sql = "SELECT source, sum(spend) AS total_spend FROM ad_performance GROUP BY source"
+
+    summary = summarize_locally(BREAKDOWN, sql, max_categories=50)
+
+    assert classify_result(BREAKDOWN, sql, max_categories=50) == "breakdown"
+    assert summary is not None
+    assert "The total is 2,400.75; facebook leads with 1,200.50 (50.0% of the total)." in summary
+    assert "The lowest is bing at 100." in summary
+
+
+def test_limited_ordered_breakdown_is_top_n() -> None:
+    sql = "SELECT source, sum(spend) AS total_spend FROM t GROUP BY source ORDER BY 2 DESC LIMIT 4"
+
+    summary = summarize_locally(BREAKDOWN, sql, max_categories=50)
+
+    assert summary is not None and summary.startswith("Top 4 source values by total spend.")
+
+
+def test_ascending_or_secondary_ordering_is_not_top_n() -> None:
+    grouped = "SELECT source, sum(spend) AS total_spend FROM t GROUP BY source"
+
+    for order in ("ORDER BY 2", "ORDER BY 2 ASC", "ORDER BY source, 2 DESC"):
+        sql = f"{grouped} {order} LIMIT 4"
+        assert classify_result(BREAKDOWN, sql, max_categories=50) == "breakdown"
+
+
+def test_truncated_results_are_left_to_the_llm() -> None:
+    truncated: ColumnarResult = {**BREAKDOWN, "truncated": True}
+
+    assert classify_result(truncated, "SELECT", max_categories=50) is None
+    assert summarize_locally(truncated, "SELECT", max_categories=50) is None
+
+
+def test_ratio_metrics_get_no_totals_or_shares() -> None:
+    result = _result(
+        {
+            "country": ("LowCardinality(String)", ["US", "DE"]),
+            "ctr": ("Nullable(Float64)", [0.0213, 0.0151]),
+        }
+    )
+
+    summary = summarize_locally(result, "SELECT", max_categories=50)
+
+    assert summary is not None
+    assert "total" not in summary
+    assert "The highest is US at 0.0213 and the average is 0.0182." in summary
+
+
+def test_time_series_is_sorted_and_reports_trend() -> None:
+    result = _result(
+        {
+            "date": ("Date", [date(2024, 1, 3), date(2024, 1, 1), date(2024, 1, 2)]),
+            "spend": ("Float32", [30.0, 10.0, 20.0]),
+        }
+    )
+
+    summary = summarize_locally(result, "SELECT", max_categories=2)
+
+    assert summary is not None
+    assert summary.startswith("3 date periods from 2024-01-01 to 2024-01-03.")
+    assert "peaking at 30 on 2024-01-03 with a low of 10 on 2024-01-01" in summary
+    assert "Spend trends upward (+200.0% from first to last period)." in summary
+
+
+def test_scalar_and_empty_results() -> None:
+    scalar = _result({"total_spend": ("Float64", [1234.5]), "clicks": ("UInt64", [20])})
+    empty = _result({"total_spend": ("Float64", [])})
+
+    assert summarize_locally(scalar, "SELECT", max_categories=50) == (
+        "The query returned one row: total spend is 1,234.50; clicks is 20."
+    )
+    assert classify_result(empty, "SELECT", max_categories=50) == "empty"
+
+
+def test_complex_shapes_are_left_to_the_llm() -> None:
+    two_dimensions = _result(
+        {
+            "source": ("String", ["a", "b"]),
+            "country": ("String", ["US", "DE"]),
+            "campaign_id": ("UInt32", [1, 2]),
+            "clicks": ("UInt64", [5, 6]),
+        }
+    )
+    too_many = _result(
+        {"campaign_name": ("String", ["a", "b", "c"]), "clicks": ("UInt64", [1, 2, 3])}
+    )
+
+    assert classify_result(two_dimensions, "SELECT", max_categories=50) is None
+    assert classify_result(too_many, "SELECT", max_categories=2) is None
+
+
+def test_summarizer_mode_decides_when_the_llm_is_skipped() -> None:
+    complex_result = _result(
+        {"a": ("String", ["x", "y"]), "b": ("String", ["z", "w"]), "n": ("UInt8", [1, 2])}
+    )
+    llm = RecordingLLM()
+
+    assert Summarizer(llm, mode="llm").local_summary("SELECT", BREAKDOWN) is None  # type: ignore[arg-type]
+    auto = Summarizer(llm, mode="auto")  # type: ignore[arg-type]
+    assert auto.local_summary("SELECT", BREAKDOWN) is not None
+    assert auto.local_summary("SELECT", complex_result) is None
+    local = Summarizer(llm, mode="local")  # type: ignore[arg-type]
+    assert local.local_summary("SELECT", complex_result) == (
+        "The query returned 2 rows with columns: a, b, n."
+    )
+    assert asyncio.run(auto.summarise("q", "SELECT", [])) == "LLM summary"
+    assert llm.calls == 1
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+from app.infra.metrics import GaugeFamily, MetricsRegistry
+
+
+def test_counter_renders_labelled_samples() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("lookups_total", "Cache lookups.", ("result",))
+    counter.inc(result="hit")
+    counter.inc(2, result="miss")
+    counter.inc(result="hit")
+
+    assert registry.render().splitlines() == [
+        "# HELP lookups_total Cache lookups.",
+        "# TYPE lookups_total counter",
+        'lookups_total{result="hit"} 2',
+        'lookups_total{result="miss"} 2',
+    ]
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency.", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="llm")
+
+    lines = registry.render().splitlines()
+
+    assert 'stage_seconds_bucket{stage="llm",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="llm",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="llm",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="llm"} 3.65' in lines
+    assert 'stage_seconds_count{stage="llm"} 4' in lines
+
+
+def test_gauge_tracks_in_flight_and_label_mismatch_raises() -> None:
+    registry = MetricsRegistry()
+    gauge = registry.gauge("in_flight", "In flight.", ("stage",))
+    gauge.inc(stage="query")
+    gauge.inc(stage="query")
+    gauge.dec(stage="query")
+
+    assert gauge.value(stage="query") == 1
+    with pytest.raises(ValueError):
+        gauge.inc(mode="query")
+    with pytest.raises(ValueError):
+        registry.gauge("in_flight", "Duplicate.")
+
+
+def test_scrape_time_families_are_appended_and_escaped() -> None:
+    registry = MetricsRegistry()
+    family = GaugeFamily("pool_size", "Pool size.", ("name",)).add(4, 'main "pool"')
+
+    assert registry.render([family]).splitlines()[-1] == 'pool_size{name="main \\"pool\\""} 4'
+
+
+def test_bound_series_share_state_with_labelled_calls() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("request_seconds", "Latency.", ("mode", "outcome"))
+    bound = histogram.labels("run", "cache_hit")
+
+    bound.observe(0.01)
+    histogram.observe(0.02, mode="run", outcome="cache_hit")
+
+    assert histogram.labels(mode="run", outcome="cache_hit") is bound
+    assert histogram.count(mode="run", outcome="cache_hit") == 2
+    with pytest.raises(ValueError):
+        histogram.labels("run")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from app.domain.prompts import PromptRegistry, compile_prompt
+from app.domain.services.prompt_builder import render_sql_prompt, render_summary_prompt
+
+
+def test_compile_prompt_prerenders_static_prefix() -> None:
+    template = "Table {table} has {{braces}}.\nQ: {question}\nLimit {limit} {{x}}"
+    compiled = compile_prompt(template, {"table": "ad_performance", "limit": 100})
+
+    assert compiled.prefix == "Table ad_performance has {braces}.\nQ: "
+    assert compiled.render(question="spend?") == (
+        "Table ad_performance has {braces}.\nQ: spend?\nLimit 100 {x}"
+    )
+
+
+def test_sql_prompts_share_a_byte_identical_prefix() -> None:
+    first = render_sql_prompt("Spend by source", [])
+    second = render_sql_prompt("Clicks by country last week", ["Q: Spend by source"])
+
+    prefix = os.path.commonprefix([first, second])
+    assert "ad_performance" in prefix
+    assert "Sanity before returning" in prefix
+    assert first.rstrip().endswith("New question:\nSpend by source")
+    assert second.rstrip().endswith("New question:\nClicks by country last week")
+
+
+def test_summary_prompt_keeps_instructions_before_dataset() -> None:
+    prompt = render_summary_prompt("Spend by source", "SELECT 1", [{"source": "google"}])
+
+    assert prompt.index("Task:") < prompt.index("User question: Spend by source")
+    assert prompt.rstrip().endswith('[{"source": "google"}]')
+
+
+def test_registry_reloads_changed_templates_when_enabled(tmp_path: Path) -> None:
+    path = tmp_path / "greeting.txt"
+    path.write_text("Hello {name}", encoding="utf-8")
+    cached = PromptRegistry(tmp_path)
+    watching = PromptRegistry(tmp_path, reload=True)
+    assert cached.get("greeting").render(name="a") == "Hello a"
+    assert watching.get("greeting").render(name="a") == "Hello a"
+
+    path.write_text("Hi {name}", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+    assert cached.get("greeting").render(name="a") == "Hello a"
+    assert watching.get("greeting").render(name="a") == "Hi a"
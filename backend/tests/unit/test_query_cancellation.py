@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import Any
+
+import pytest
+from app.api.cancellation import (
+    ClientDisconnected,
+    RequestDeadlineExceeded,
+    iter_with_deadline,
+    run_cancellable,
+)
+from app.infra.clickhouse.client import ClickHouseClient
+from app.infra.config import Settings
+
+
+class FakeRequest:
+    class url:  # noqa: N801
+        path = "/api/v1/query"
+
+    def __init__(self, disconnect_after: int | None = None) -> None:
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.disconnect_after is not None and self.checks > self.disconnect_after
+
+
+class Work:
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.cancelled = False
+
+    async def __call__(self) -> str:
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "answer"
+
+
+def _run(request: FakeRequest, work: Work, *, timeout: float = 0.0) -> str:
+    async def scenario() -> str:
+        try:
+            return await run_cancellable(
+                request,  # type: ignore[arg-type]
+                work(),
+                timeout_seconds=timeout,
+                poll_interval_seconds=0.005,
+            )
+        finally:
+            await asyncio.sleep(0.01)  # let the cancelled work unwind
+
+    return asyncio.run(scenario())
+
+
+def test_completed_work_is_returned() -> None:
+    work = Work(0.01)
+
+    assert _run(FakeRequest(), work) == "answer"
+    assert not work.cancelled
+
+
+def test_disconnect_cancels_the_work() -> None:
+    work = Work(10)
+
+    with pytest.raises(ClientDisconnected):
+        _run(FakeRequest(disconnect_after=2), work)
+
+    assert work.cancelled
+
+
+def test_deadline_cancels_the_work() -> None:
+    work = Work(10)
+
+    with pytest.raises(RequestDeadlineExceeded):
+        _run(FakeRequest(), work, timeout=0.05)
+
+    assert work.cancelled
+
+
+def test_stream_deadline_stops_the_producer() -> None:
+    produced: list[int] = []
+
+    async def events() -> AsyncIterator[int]:
+        for index in range(100):
+            await asyncio.sleep(0.02)
+            produced.append(index)
+            yield index
+
+    async def scenario() -> list[int]:
+        received: list[int] = []
+        with pytest.raises(RequestDeadlineExceeded):
+            async for item in iter_with_deadline(events(), timeout_seconds=0.1):
+                received.append(item)
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert 0 < len(received) < 10
+    assert produced == received
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.cancel_sent = False
+
+    def send_cancel(self) -> None:
+        self.cancel_sent = True
+
+
+class FakeDriverClient:
+    """Streams rows slowly until cancelled; records statements on the side."""
+
+    def __init__(self, started: threading.Event) -> None:
+        self.started = started
+        self.connection = FakeConnection()
+        self.statements: list[tuple[str, Any]] = []
+        self.query_id: str | None = None
+
+    def execute_iter(self, sql: str, **kwargs: Any) -> Iterator[Any]:
+        self.query_id = kwargs["query_id"]
+        yield [("source", "String")]
+        self.started.set()
+        for _ in range(1_000):
+            threading.Event().wait(0.005)
+            yield ("google",)
+
+    def execute(self, sql: str, params: Any = None) -> list[Any]:
+        self.statements.append((sql, params))
+        return []
+
+    def packet_generator(self) -> Iterator[Any]:
+        return iter(())
+
+    def disconnect(self) -> None:
+        return None
+
+
+class FakeDriverClickHouse(ClickHouseClient):
+    def __init__(self, settings: Settings) -> None:
+        self.started = threading.Event()
+        self.connections: list[FakeDriverClient] = []
+        super().__init__(settings)
+
+    def _connect(self) -> Any:
+        connection = FakeDriverClient(self.started)
+        self.connections.append(connection)
+        return connection
+
+
+def test_cancelled_query_is_abandoned_and_killed(settings: Settings) -> None:
+    clickhouse = FakeDriverClickHouse(settings)
+
+    async def scenario() -> None:
+        query = asyncio.create_task(clickhouse.query_columnar("SELECT source FROM t"))
+        await asyncio.get_running_loop().run_in_executor(None, clickhouse.started.wait, 1)
+        query.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await query
+        for _ in range(100):  # the kill is sent from a worker thread
+            if len(clickhouse.connections) == 2 and clickhouse.connections[1].statements:
+                break
+            await asyncio.sleep(0.01)
+        await clickhouse.close()
+
+    asyncio.run(scenario())
+
+    pooled, control = clickhouse.connections
+    assert pooled.connection.cancel_sent
+    assert control.statements == [
+        ("KILL QUERY WHERE query_id = %(query_id)s ASYNC", {"query_id": pooled.query_id})
+    ]
+
+
+def test_queued_query_is_dropped_without_a_kill(make_settings: Callable[..., Settings]) -> None:
+    clickhouse = FakeDriverClickHouse(make_settings(CLICKHOUSE_POOL_SIZE=1))
+
+    async def scenario() -> None:
+        running = asyncio.create_task(clickhouse.query_columnar("SELECT source FROM t"))
+        await asyncio.get_running_loop().run_in_executor(None, clickhouse.started.wait, 1)
+        queued = asyncio.create_task(clickhouse.query_columnar("SELECT country FROM t"))
+        await asyncio.sleep(0.02)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        for _ in range(100):  # the kill is sent from a worker thread
+            if len(clickhouse.connections) == 2 and clickhouse.connections[1].statements:
+                break
+            await asyncio.sleep(0.01)
+        await clickhouse.close()
+
+    asyncio.run(scenario())
+
+    pooled, control = clickhouse.connections
+    assert control.statements == [
+        ("KILL QUERY WHERE query_id = %(query_id)s ASYNC", {"query_id": pooled.query_id})
+    ]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+from app.infra.clickhouse.client import ClickHouseClient
+from app.infra.clickhouse.guardrails import (
+    QueryBudget,
+    QueryCostExceeded,
+    QueryGuard,
+)
+from app.infra.config import Settings
+from clickhouse_driver.errors import ServerException
+from pydantic import ValidationError
+
+SQL = "SELECT source, sum(spend) AS spend FROM marketing.ad_performance GROUP BY source"
+
+
+class FakeClient:
+    """Answers EXPLAIN ESTIMATE and system.parts lookups, and streams one row."""
+
+    def __init__(self, *, rows: int = 1_000, fail_estimate: bool = False) -> None:
+        self.rows = rows
+        self.fail_estimate = fail_estimate
+        self.statements: list[str] = []
+        self.settings: dict[str, Any] = {}
+
+    def execute(self, sql: str, params: dict[str, Any] | None = None) -> list[tuple[Any, ...]]:
+        self.statements.append(sql)
+        if sql.startswith("EXPLAIN ESTIMATE"):
+            if self.fail_estimate:
+                raise ServerException("Not supported", code=48)
+            return [("marketing", "ad_performance", 3, self.rows, self.rows // 8192 + 1)]
+        if "system.parts" in sql:
+            return [(50 * 2_000_000, 2_000_000)]
+        raise AssertionError(sql)
+
+    def execute_iter(self, sql: str, **kwargs: Any) -> Iterator[Any]:
+        self.settings = kwargs["settings"]
+        yield [("source", "String"), ("spend", "Float64")]
+        yield ("google", 1.0)
+
+
+def _budget(**overrides: Any) -> QueryBudget:
+    values: dict[str, Any] = {
+        "max_execution_seconds": 30,
+        "max_rows_to_read": 0,
+        "max_memory_bytes": 2_000_000_000,
+        "estimate_max_rows": 0,
+        "estimate_max_bytes": 0,
+        "action": "reject",
+        "estimate_cache_seconds": 300,
+    }
+    values.update(overrides)
+    return QueryBudget(**values)
+
+
+def test_limits_are_sent_without_estimating_when_no_budget_is_set() -> None:
+    client = FakeClient()
+
+    decision = QueryGuard(_budget()).check(client, SQL)
+
+    assert decision.settings == {
+        "max_execution_time": 30,
+        "max_rows_to_read": 0,
+        "max_memory_usage": 2_000_000_000,
+    }
+    assert decision.estimate is None
+    assert client.statements == []
+
+
+def test_estimate_within_budget_is_allowed_and_cached_by_fingerprint() -> None:
+    client = FakeClient(rows=1_000)
+    guard = QueryGuard(_budget(estimate_max_rows=10_000))
+
+    first = guard.check(client, SQL)
+    second = guard.check(client, SQL.replace(" GROUP BY", "\nGROUP  BY"))
+
+    assert first.estimate is not None
+    assert first.estimate.rows == 1_000
+    assert first.estimate.bytes == 50_000
+    assert second.estimate == first.estimate
+    assert not first.limited
+    assert sum(sql.startswith("EXPLAIN") for sql in client.statements) == 1
+
+
+def test_query_over_the_row_budget_is_rejected() -> None:
+    guard = QueryGuard(_budget(estimate_max_rows=500))
+
+    with pytest.raises(QueryCostExceeded, match="1,000 rows"):
+        guard.check(FakeClient(rows=1_000), SQL)
+
+
+def test_query_over_the_byte_budget_is_capped_in_limit_mode() -> None:
+    guard = QueryGuard(_budget(estimate_max_bytes=10_000, action="limit"))
+
+    decision = guard.check(FakeClient(rows=1_000), SQL)
+
+    assert decision.limited
+    assert decision.settings["max_rows_to_read"] == 200
+    assert decision.settings["read_overflow_mode"] == "break"
+
+
+def test_unestimable_queries_run_with_the_server_limits() -> None:
+    guard = QueryGuard(_budget(estimate_max_rows=500))
+
+    decision = guard.check(FakeClient(fail_estimate=True), SQL)
+
+    assert decision.estimate is None
+    assert decision.settings["max_execution_time"] == 30
+
+
+def test_client_flags_limited_results_as_truncated(make_settings: Callable[..., Settings]) -> None:
+    settings = make_settings(CLICKHOUSE_ESTIMATE_MAX_ROWS=500, CLICKHOUSE_ESTIMATE_ACTION="limit")
+    fake = FakeClient(rows=1_000)
+
+    result, decision = ClickHouseClient(settings)._run_guarded(fake, SQL)
+
+    assert decision.limited
+    assert result["truncated"] is True
+    assert result["data"] == [["google"], [1.0]]
+    assert fake.settings["max_rows_to_read"] == 500
+    assert fake.settings["max_result_rows"] == settings.result_max_rows + 1
+
+
+def test_fractional_execution_limits_are_rejected(make_settings: Callable[..., Settings]) -> None:
+    # ClickHouse would truncate 0.5 seconds to 0, which means no limit at all.
+    with pytest.raises(ValidationError, match="CLICKHOUSE_MAX_EXECUTION_SECONDS"):
+        make_settings(CLICKHOUSE_MAX_EXECUTION_SECONDS=0.5)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from app.infra.cache.client import RedisCache
+from app.infra.cache.similarity import (
+    QuestionSimilarityIndex,
+    canonicalize_question,
+    jaccard,
+    shingles,
+)
+from app.infra.config import Settings
+from tests.fakes import FakeRedis
+
+
+@pytest.fixture
+def settings(make_settings: Callable[..., Settings]) -> Settings:
+    return make_settings(SIMILARITY_THRESHOLD=0.7)
+
+
+def test_paraphrases_share_canonical_form() -> None:
+    first = canonicalize_question("spend by source last week")
+    second = canonicalize_question("Spend per source for the last seven days?")
+    assert first == second == ("spend", "by", "source", "last_7_day")
+
+
+@pytest.mark.parametrize(
+    ("left", "right"),
+    [
+        ("spend in US", "spend"),
+        ("spend in US but not in GB", "spend in GB but not in US"),
+        ("revenue per click", "clicks per revenue"),
+        ("campaigns with spend over 100", "campaigns with spend 100"),
+        ("campaigns with more clicks than conversions", "campaigns with more conversions"),
+    ],
+)
+def test_questions_that_differ_in_meaning_do_not_match(left: str, right: str) -> None:
+    left_shingles = shingles(canonicalize_question(left))
+    right_shingles = shingles(canonicalize_question(right))
+    assert jaccard(left_shingles, right_shingles) < 0.7
+
+
+def test_canonical_form_keeps_metrics_and_numbers_apart() -> None:
+    spend = canonicalize_question("Top 5 campaigns by spend")
+    clicks = canonicalize_question("Top 5 campaigns by clicks")
+    top_ten = canonicalize_question("Top 10 campaigns by spend")
+    assert jaccard(spend, clicks) < 0.9
+    assert jaccard(spend, top_ten) < 0.9
+
+
+def test_index_returns_sql_of_similar_question(settings: Settings, redis: FakeRedis) -> None:
+    index = QuestionSimilarityIndex(RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+    sql = "SELECT source, sum(spend) FROM ad_performance GROUP BY source"
+
+    async def scenario() -> tuple[Any, Any]:
+        await index.add("Spend by source and country last week", sql)
+        paraphrase = await index.lookup("Spend per source and country, last 7 days")
+        nearby = await index.lookup("total spend by source and country for the past week")
+        return paraphrase, nearby
+
+    paraphrase, nearby = asyncio.run(scenario())
+
+    assert paraphrase is not None and paraphrase.sql == sql and paraphrase.score == 1.0
+    assert nearby is not None and 0.7 <= nearby.score < 1.0
+
+
+def test_index_ignores_dissimilar_questions(settings: Settings, redis: FakeRedis) -> None:
+    index = QuestionSimilarityIndex(RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+
+    async def scenario() -> Any:
+        await index.add("Spend by source last week", "SELECT 1")
+        return await index.lookup("Revenue by country this year")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_index_ignores_reordered_and_negated_questions(
+    settings: Settings, redis: FakeRedis
+) -> None:
+    index = QuestionSimilarityIndex(RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+
+    async def scenario() -> list[Any]:
+        await index.add("Spend in US but not in GB", "SELECT 1")
+        await index.add("Revenue per click by source", "SELECT 2")
+        return [
+            await index.lookup("Spend in GB but not in US"),
+            await index.lookup("Spend"),
+            await index.lookup("Clicks per revenue by source"),
+        ]
+
+    assert asyncio.run(scenario()) == [None, None, None]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from app.infra.clickhouse.bootstrap import ensure_rollups
+from app.infra.clickhouse.schema import (
+    ROLLUPS,
+    build_rollup_table_statement,
+    build_rollup_view_statement,
+)
+from app.infra.sql.rollups import rewrite_for_rollups
+
+
+def test_breakdown_by_source_reads_the_smallest_rollup() -> None:
+    rewrite = rewrite_for_rollups(
+        "SELECT source, sum(spend) AS total_spend FROM ad_performance "
+        "GROUP BY source ORDER BY total_spend DESC LIMIT 10"
+    )
+
+    assert rewrite is not None
+    assert rewrite.rollup == "ad_performance_daily_source"
+    assert rewrite.sql == (
+        "SELECT source, sum(spend) AS total_spend FROM ad_performance_daily_source "
+        "GROUP BY source ORDER BY total_spend DESC LIMIT 10"
+    )
+
+
+def test_country_filter_needs_the_country_rollup() -> None:
+    rewrite = rewrite_for_rollups(
+        "SELECT source, round((sum(clicks) / nullIf(sum(impressions), 0)) * 100, 2) AS ctr "
+        "FROM default.ad_performance WHERE country = 'US' AND date >= today() - 30 "
+        "GROUP BY source"
+    )
+
+    assert rewrite is not None
+    assert rewrite.rollup == "ad_performance_daily_source_country"
+    assert "FROM default.ad_performance_daily_source_country" in rewrite.sql
+    assert "sum(clicks) / nullIf(sum(impressions), 0)" in rewrite.sql
+
+
+def test_counts_and_averages_are_recomputed_from_row_counts() -> None:
+    rewrite = rewrite_for_rollups(
+        "SELECT source, count() AS rows, avg(spend) AS avg_spend, countIf(country = 'US') AS us "
+        "FROM ad_performance GROUP BY source"
+    )
+
+    assert rewrite is not None
+    assert "sum(row_count) AS rows" in rewrite.sql
+    assert "(sum(spend) / sum(row_count)) AS avg_spend" in rewrite.sql
+    assert "sumIf(row_count, country = 'US') AS us" in rewrite.sql
+
+
+def test_unaliased_count_keeps_its_column_name() -> None:
+    rewrite = rewrite_for_rollups("SELECT count(*) FROM ad_performance WHERE date = today()")
+
+    assert rewrite is not None
+    assert rewrite.sql.startswith('SELECT sum(row_count) AS "count()" FROM')
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT * FROM ad_performance LIMIT 5",
+        "SELECT source, spend FROM ad_performance LIMIT 5",
+        "SELECT campaign_id, sum(spend) AS spend FROM ad_performance GROUP BY campaign_id",
+        "SELECT source, max(spend) AS top FROM ad_performance GROUP BY source",
+        "SELECT source, sum(clicks / impressions) AS x FROM ad_performance GROUP BY source",
+        "SELECT source, sum(spend) AS s FROM ad_performance WHERE spend > 10 GROUP BY source",
+        "SELECT avg(spend) FROM ad_performance",
+        "SELECT source, quantile(0.5)(spend) AS p FROM ad_performance GROUP BY source",
+        "SELECT source, sum(spend) OVER () AS s FROM ad_performance",
+        "SELECT s FROM (SELECT source AS s, sum(spend) AS t FROM ad_performance GROUP BY s)",
+    ],
+)
+def test_queries_a_rollup_cannot_answer_are_left_alone(sql: str) -> None:
+    assert rewrite_for_rollups(sql) is None
+
+
+def test_rollup_ddl_sums_measures_from_the_base_table() -> None:
+    rollup = ROLLUPS[0]
+
+    table = build_rollup_table_statement(rollup, "marketing")
+    view = build_rollup_view_statement(rollup, "marketing")
+
+    assert "ENGINE = SummingMergeTree()" in table
+    assert "ORDER BY (source, date)" in table
+    assert "spend Float64" in table
+    assert view.startswith(
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS marketing.{rollup.view_name} "
+        f"TO marketing.{rollup.name} AS SELECT date, source, "
+    )
+    assert "count() AS row_count FROM marketing.ad_performance GROUP BY date, source" in view
+
+
+class RecordingClient:
+    database = "marketing"
+
+    def __init__(self, existing: set[str]) -> None:
+        self.existing = existing
+        self.statements: list[str] = []
+
+    def execute_sync(self, sql: str, *args: Any, **kwargs: Any) -> list[tuple[int]]:
+        self.statements.append(sql)
+        if sql.startswith("EXISTS TABLE"):
+            return [(int(sql.rpartition(".")[2] in self.existing),)]
+        return []
+
+
+def test_ensure_rollups_creates_and_backfills_only_missing_rollups() -> None:
+    client = RecordingClient(existing={ROLLUPS[0].name})
+
+    created = ensure_rollups(client, backfill=True)  # type: ignore[arg-type]
+
+    assert created == [ROLLUPS[1].name]
+    writes = [sql for sql in client.statements if not sql.startswith("EXISTS")]
+    assert [sql.split()[0] for sql in writes] == ["CREATE", "CREATE", "INSERT"]
+    assert all(ROLLUPS[0].name + " " not in sql for sql in writes)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from app.infra.cache.client import RedisCache
+from app.infra.cache.keys import lease_key
+from app.infra.cache.singleflight import SingleFlight
+from app.infra.config import Settings
+from tests.fakes import FakeRedis
+
+
+@pytest.fixture
+def settings(make_settings: Callable[..., Settings]) -> Settings:
+    return make_settings(SINGLEFLIGHT_POLL_INTERVAL_MS=5, SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS=2)
+
+
+def test_concurrent_callers_share_one_computation(settings: Settings, redis: FakeRedis) -> None:
+    flight = SingleFlight(RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+    calls = 0
+
+    async def compute() -> dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"summary": "done"}
+
+    async def lookup() -> dict[str, Any] | None:
+        return None
+
+    async def scenario() -> list[dict[str, Any]]:
+        return await asyncio.gather(*(flight.do("q", compute, lookup) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result == {"summary": "done"} for result in results)
+    assert lease_key("q") not in redis.store
+
+
+def test_follower_waits_for_remote_leader(settings: Settings, redis: FakeRedis) -> None:
+    redis.store[lease_key("q")] = "other-worker"
+    flight = SingleFlight(RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+    published: dict[str, Any] = {}
+
+    async def compute() -> dict[str, Any]:
+        raise AssertionError("follower must not compute while the lease is held")
+
+    async def lookup() -> dict[str, Any] | None:
+        return published or None
+
+    async def scenario() -> dict[str, Any]:
+        async def leader_finishes() -> None:
+            await asyncio.sleep(0.02)
+            published["summary"] = "from leader"
+            del redis.store[lease_key("q")]
+
+        waiter = asyncio.create_task(flight.do("q", compute, lookup))
+        await leader_finishes()
+        return await waiter
+
+    assert asyncio.run(scenario()) == {"summary": "from leader"}
+
+
+def test_computation_is_cancelled_when_every_caller_leaves(
+    settings: Settings, redis: FakeRedis
+) -> None:
+    flight = SingleFlight(RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+    computing = asyncio.Event()
+    cancelled = False
+
+    async def compute() -> dict[str, Any]:
+        nonlocal cancelled
+        computing.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return {"summary": "never"}
+
+    async def lookup() -> dict[str, Any] | None:
+        return None
+
+    async def scenario() -> None:
+        callers = [asyncio.create_task(flight.do("q", compute, lookup)) for _ in range(2)]
+        await computing.wait()
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+
+    assert cancelled
+    assert lease_key("q") not in redis.store
+
+
+def test_caller_arriving_after_abandonment_starts_a_new_computation(
+    settings: Settings, redis: FakeRedis
+) -> None:
+    flight = SingleFlight(RedisCache(redis, settings), settings)  # type: ignore[arg-type]
+    computing = asyncio.Event()
+    calls = 0
+
+    async def compute() -> dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            computing.set()
+            await asyncio.sleep(10)
+        return {"summary": f"call {calls}"}
+
+    async def lookup() -> dict[str, Any] | None:
+        return None
+
+    async def scenario() -> dict[str, Any]:
+        first = asyncio.create_task(flight.do("q", compute, lookup))
+        await computing.wait()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # The abandoned task is still unwinding here; joining it would inherit its cancellation.
+        return await flight.do("q", compute, lookup)
+
+    assert asyncio.run(scenario()) == {"summary": "call 2"}
@@ -43,3 +43,10 @@ def test_trim_trailing_semicolons(raw: str, expected: str) -> None:
 )
 def test_clean_sql_output_normalises(raw: str, expected: str) -> None:
     assert sql_builder.clean_sql_output(raw) == expected
+
+
+def test_think_block_filter_handles_tags_split_across_chunks() -> None:
+    think_filter = sql_builder.ThinkBlockFilter()
+    chunks = ["<thi", "nk>plan", " more</th", "ink>\n\nSpend rose", " 5% <", "b>ok"]
+    streamed = "".join(think_filter.feed(chunk) for chunk in chunks) + think_filter.flush()
+    assert streamed == "Spend rose 5% <b>ok"
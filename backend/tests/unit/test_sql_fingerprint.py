@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+from app.infra.cache.keys import result_key
+from app.infra.sql import fingerprint
+from app.infra.sql.fingerprint import canonical_sql, sql_fingerprint
+
+
+def test_formatting_and_quoting_do_not_change_fingerprint() -> None:
+    first = "SELECT source, sum(spend) AS total FROM ad_performance GROUP BY source"
+    second = 'select  "source",\n  SUM(spend) as total from ad_performance group by "source"'
+    assert sql_fingerprint(first) == sql_fingerprint(second)
+
+
+def test_commutative_predicates_are_sorted() -> None:
+    first = (
+        "SELECT sum(spend) AS total FROM ad_performance "
+        "WHERE source = 'google' AND country = 'US' AND date >= today() - 7"
+    )
+    second = (
+        "SELECT sum(spend) AS total FROM ad_performance "
+        "WHERE date >= today() - 7 AND 'US' = country AND source = 'google'"
+    )
+    assert canonical_sql(first) == canonical_sql(second)
+    assert result_key(first) == result_key(second)
+
+
+def test_literals_and_aliases_are_significant() -> None:
+    base = "SELECT sum(spend) AS total FROM ad_performance WHERE source = 'google'"
+    other_literal = "SELECT sum(spend) AS total FROM ad_performance WHERE source = 'facebook'"
+    other_alias = "SELECT sum(spend) AS spend FROM ad_performance WHERE source = 'google'"
+    assert sql_fingerprint(base) != sql_fingerprint(other_literal)
+    assert sql_fingerprint(base) != sql_fingerprint(other_alias)
+
+
+def test_unparsable_sql_falls_back_to_whitespace_collapse() -> None:
+    assert canonical_sql("SELECT *  FROM\n WHERE )") == "SELECT * FROM WHERE )"
+
+
+def test_repeated_fingerprints_parse_the_sql_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+    parse_one = fingerprint.sqlglot.parse_one
+
+    def counting_parse_one(sql: str, **kwargs: object) -> object:
+        calls.append(sql)
+        return parse_one(sql, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(fingerprint.sqlglot, "parse_one", counting_parse_one)
+    sql = "SELECT campaign_id FROM ad_performance WHERE clicks > 17 AND spend > 3"
+
+    keys = {result_key(sql) for _ in range(4)}
+
+    assert len(keys) == 1
+    assert calls == [sql]
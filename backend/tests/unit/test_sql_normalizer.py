@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import pytest
-
-from app.infra.sql.normalizer import SQLNormalizationError, normalize_sql_for_clickhouse
+from app.infra.sql.normalizer import (
+    SQLNormalizationError,
+    normalize_sql_for_clickhouse,
+    normalize_sql_statement,
+)
 from app.infra.sql.validator import validate_clickhouse_sql
 
 
@@ -48,3 +51,35 @@ def test_parsing_error_falls_back_to_raw_select() -> None:
 def test_validator_rejects_comments() -> None:
     with pytest.raises(ValueError, match="SQL comments are not permitted"):
         validate_clickhouse_sql("/* comment */ SELECT 1")
+
+
+def test_normalize_reads_clickhouse_syntax_without_fallback() -> None:
+    result = normalize_sql_statement(
+        "SELECT quantiles(0.25, 0.5)(spend) AS spend_quantiles FROM ad_performance"
+    )
+
+    assert result.read_dialect == "clickhouse"
+    assert result.expression is not None
+    assert result.sql == (
+        "SELECT quantiles(0.25, 0.5)(spend) AS spend_quantiles FROM ad_performance"
+    )
+
+
+def test_normalize_picks_read_dialect_from_syntax() -> None:
+    assert normalize_sql_statement("SELECT `source` FROM ad_performance").read_dialect == "mysql"
+    assert normalize_sql_statement("SELECT spend::int FROM ad_performance").read_dialect == (
+        "postgres"
+    )
+
+
+def test_normalize_memoizes_results_by_input() -> None:
+    sql = "SELECT source, sum(spend) AS total FROM ad_performance GROUP BY source"
+
+    assert normalize_sql_statement(sql) is normalize_sql_statement(f"  {sql}\n")
+
+
+def test_normalize_rejects_comments_and_nested_writes() -> None:
+    with pytest.raises(SQLNormalizationError, match="SQL comments are not permitted"):
+        normalize_sql_for_clickhouse("SELECT 1 -- trailing comment")
+    with pytest.raises(SQLNormalizationError, match="Forbidden SQL operation detected"):
+        normalize_sql_for_clickhouse("SYSTEM SHUTDOWN")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import pytest
+import sqlglot
+from app.infra.llm.stub_client import DEFAULT_SQL_COMPLETIONS
+from app.infra.sql.normalizer import SQLNormalizationError, normalize_sql_statement
+from app.infra.sql.validator import SQLPolicy, validate_clickhouse_ast, validate_clickhouse_sql
+
+POLICY = SQLPolicy.from_schema(database="marketing", max_complexity=12)
+
+
+def _analyze(sql: str, policy: SQLPolicy = POLICY) -> object:
+    return validate_clickhouse_ast(sqlglot.parse_one(sql, read="clickhouse"), policy)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT toStartOfMonth(date) AS month, round(sum(clicks) / nullIf(sum(impressions), 0)"
+        " * 100, 2) AS ctr_percent FROM ad_performance GROUP BY month ORDER BY month LIMIT 100",
+        "SELECT quantiles(0.25, 0.5, 0.75)(spend) AS spend_quantiles FROM ad_performance",
+        "SELECT source, uniqExact(campaign_id) AS campaigns, sumIf(spend, country = 'US') AS us"
+        " FROM marketing.ad_performance WHERE date >= subtractDays(today(), 7) GROUP BY source"
+        " LIMIT 10",
+        *(completion.text for completion in DEFAULT_SQL_COMPLETIONS),
+    ],
+)
+def test_schema_policy_accepts_prompt_style_queries(sql: str) -> None:
+    _analyze(sql)
+
+
+def test_string_values_resembling_keywords_are_not_rejected() -> None:
+    sql = "SELECT sum(spend) AS total FROM ad_performance WHERE campaign_name = 'merge drop'"
+    assert validate_clickhouse_sql(sql) == sql
+    _analyze(sql)
+
+
+@pytest.mark.parametrize(
+    ("sql", "message"),
+    [
+        ("SELECT name FROM system.tables LIMIT 1", "Database is not permitted"),
+        ("SELECT * FROM users LIMIT 1", "Table is not permitted: users"),
+        ("SELECT password FROM ad_performance LIMIT 1", "Unknown column: password"),
+        ("SELECT * FROM url('http://example.com', CSV) LIMIT 1", "Table functions"),
+        ("SELECT sleep(3) AS s FROM ad_performance LIMIT 1", "Function is not permitted: sleep"),
+    ],
+)
+def test_schema_policy_rejects_unknown_references(sql: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        _analyze(sql)
+
+
+def test_complexity_score_counts_joins_depth_and_missing_limit() -> None:
+    simple = validate_clickhouse_ast(
+        sqlglot.parse_one("SELECT source FROM ad_performance LIMIT 5", read="clickhouse")
+    )
+    heavy_sql = (
+        "SELECT a.source FROM ad_performance AS a JOIN ad_performance AS b ON a.date = b.date"
+        " WHERE a.campaign_id IN (SELECT campaign_id FROM ad_performance WHERE clicks > 0)"
+    )
+    heavy = validate_clickhouse_ast(sqlglot.parse_one(heavy_sql, read="clickhouse"))
+
+    assert simple.complexity == 0 and simple.has_limit
+    assert heavy.joins == 1
+    assert heavy.subquery_depth == 1
+    assert not heavy.has_limit
+    assert heavy.complexity == 3 + 2 + 4
+    with pytest.raises(ValueError, match="too complex"):
+        _analyze(heavy_sql, SQLPolicy.from_schema(max_complexity=5))
+
+
+def test_normalizer_applies_policy_and_rejects_unparsable_sql() -> None:
+    normalized = normalize_sql_statement(
+        "SELECT source, sum(spend) AS spend_total FROM ad_performance GROUP BY source LIMIT 5",
+        POLICY,
+    )
+    assert normalized.analysis is not None
+    assert normalized.analysis.tables == frozenset({"ad_performance"})
+
+    with pytest.raises(SQLNormalizationError, match="Table is not permitted"):
+        normalize_sql_statement("SELECT * FROM events LIMIT 5", POLICY)
+    with pytest.raises(SQLNormalizationError, match="Unable to parse SQL"):
+        normalize_sql_statement("SELECT * FROM ad_performance WHERE )", POLICY)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from app.domain.services.orchestrator import QueryOrchestrator
+from app.infra.cache.client import RedisCache
+from app.infra.cache.keys import question_key, revalidation_lease_key
+from app.infra.config import Settings
+from tests.fakes import FakeRedis
+
+QUESTION = "Spend by source"
+
+
+class CountingLLM:
+    def __init__(self) -> None:
+        self.sql_calls = 0
+        self.summary_calls = 0
+
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        if "JSON result" in prompt:
+            self.summary_calls += 1
+            return f"Summary {self.summary_calls}."
+        self.sql_calls += 1
+        return "SELECT source, sum(spend) AS spend FROM ad_performance GROUP BY source LIMIT 10"
+
+    async def stream_text(self, prompt: str, *, temperature: float | None = None) -> Any:
+        yield await self.generate_text(prompt, temperature=temperature)
+
+
+class CountingClickHouse:
+    database = "default"
+
+    def __init__(self) -> None:
+        self.queries = 0
+
+    async def query_columnar(self, sql: str) -> dict[str, Any]:
+        self.queries += 1
+        return {
+            "columns": ["source", "spend"],
+            "types": ["String", "Float64"],
+            "data": [["facebook"], [float(self.queries)]],
+        }
+
+
+@pytest.fixture
+def settings(make_settings: Callable[..., Settings]) -> Settings:
+    return make_settings(CACHE_TTL_SECONDS=60, CACHE_STALE_TTL_SECONDS=600)
+
+
+def _build(
+    settings: Settings,
+) -> tuple[QueryOrchestrator, FakeRedis, CountingLLM, CountingClickHouse]:
+    redis = FakeRedis()
+    llm = CountingLLM()
+    clickhouse = CountingClickHouse()
+    orchestrator = QueryOrchestrator(
+        settings=settings,
+        llm_client=llm,
+        clickhouse=clickhouse,  # type: ignore[arg-type]
+        cache=RedisCache(redis, settings),  # type: ignore[arg-type]
+    )
+    return orchestrator, redis, llm, clickhouse
+
+
+def _expire_softly(redis: FakeRedis) -> None:
+    """Move every answer entry past its soft TTL without dropping it."""
+    for key, raw in redis.store.items():
+        if key.startswith("cache:fingerprint:"):
+            entry = json.loads(raw)
+            entry["fresh_until"] -= 3600
+            redis.store[key] = json.dumps(entry)
+
+
+def test_entries_outlive_the_soft_ttl(settings: Settings) -> None:
+    orchestrator, redis, _, _ = _build(settings)
+
+    async def scenario() -> int | None:
+        await orchestrator.run(question=QUESTION, user_id=None)
+        return await orchestrator.cached_ttl(QUESTION)
+
+    remaining = asyncio.run(scenario())
+
+    assert remaining is not None and 0 < remaining <= 60
+    assert redis.expiry[question_key(QUESTION)] == 660
+
+
+def test_stale_hit_is_served_and_refreshed_in_background(settings: Settings) -> None:
+    orchestrator, redis, llm, clickhouse = _build(settings)
+
+    async def scenario() -> tuple[dict[str, Any], dict[str, Any]]:
+        await orchestrator.run(question=QUESTION, user_id=None)
+        _expire_softly(redis)
+        stale = await orchestrator.run(question=QUESTION, user_id=None)
+        await orchestrator.wait_for_revalidations()
+        fresh = await orchestrator.run(question=QUESTION, user_id=None)
+        return stale, fresh
+
+    stale, fresh = asyncio.run(scenario())
+
+    assert stale["stale"] is True
+    assert stale["data"] == [{"source": "facebook", "spend": 1.0}]
+    assert fresh["stale"] is False
+    assert fresh["data"] == [{"source": "facebook", "spend": 2.0}]
+    # The refresh re-ran the cached SQL; it did not ask the LLM for new SQL.
+    assert llm.sql_calls == 1
+    assert clickhouse.queries == 2
+
+
+def test_refresh_is_skipped_while_another_worker_holds_the_lease(settings: Settings) -> None:
+    orchestrator, redis, _, clickhouse = _build(settings)
+
+    async def scenario() -> dict[str, Any]:
+        await orchestrator.run(question=QUESTION, user_id=None)
+        _expire_softly(redis)
+        redis.store[revalidation_lease_key(question_key(QUESTION))] = "other-worker"
+        payload = await orchestrator.run(question=QUESTION, user_id=None)
+        await orchestrator.wait_for_revalidations()
+        return payload
+
+    payload = asyncio.run(scenario())
+
+    assert payload["stale"] is True
+    assert clickhouse.queries == 1
+
+
+def test_concurrent_stale_hits_start_one_refresh(settings: Settings) -> None:
+    orchestrator, redis, _, clickhouse = _build(settings)
+
+    async def scenario() -> None:
+        await orchestrator.run(question=QUESTION, user_id=None)
+        _expire_softly(redis)
+        await asyncio.gather(
+            *(orchestrator.run(question=QUESTION, user_id=None) for _ in range(5)),
+            orchestrator.run_batch([QUESTION, QUESTION]),
+        )
+        await orchestrator.wait_for_revalidations()
+
+    asyncio.run(scenario())
+
+    assert clickhouse.queries == 2
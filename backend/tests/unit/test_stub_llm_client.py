@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+
+from app.domain.services.prompt_builder import render_sql_prompt, render_summary_prompt
+from app.infra.config import Settings
+from app.infra.llm.factory import get_llm_client
+from app.infra.llm.stub_client import CannedCompletion, StubLLMClient
+
+
+def test_stub_provider_is_registered_without_api_key(settings: Settings) -> None:
+    assert isinstance(get_llm_client(settings), StubLLMClient)
+
+
+def test_stub_answers_sql_and_summary_prompts_deterministically(settings: Settings) -> None:
+    client = StubLLMClient(settings)
+    sql_prompt = render_sql_prompt("Spend by country last month", [])
+    summary_prompt = render_summary_prompt("Spend by country last month", "SELECT 1", [])
+
+    async def scenario() -> tuple[str, str, str]:
+        return (
+            await client.generate_text(sql_prompt),
+            await client.generate_text(sql_prompt),
+            await client.generate_text(summary_prompt),
+        )
+
+    first, second, summary = asyncio.run(scenario())
+
+    assert first == second
+    assert "GROUP BY country" in first
+    assert "Spend by country last month" in summary
+
+
+def test_stub_stream_reassembles_to_completion_and_honours_latency(
+    make_settings: Callable[..., Settings],
+) -> None:
+    client = StubLLMClient(
+        make_settings(LLM_STUB_LATENCY_MS=50),
+        sql_completions=[CannedCompletion((), "SELECT source FROM ad_performance LIMIT 5")],
+    )
+    prompt = render_sql_prompt("anything", [])
+
+    async def scenario() -> tuple[list[str], float]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        chunks = [chunk async for chunk in client.stream_text(prompt)]
+        return chunks, loop.time() - started
+
+    chunks, elapsed = asyncio.run(scenario())
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == "SELECT source FROM ad_performance LIMIT 5"
+    assert elapsed >= 0.04
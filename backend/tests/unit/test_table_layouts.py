@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from app.infra.clickhouse.layout import (
+    LayoutMigrationError,
+    current_layout,
+    migrate_table_layout,
+)
+from app.infra.clickhouse.schema import ROLLUPS, build_create_table_statement
+
+
+class FakeClickHouse:
+    """Records statements and answers the catalogue queries a migration makes."""
+
+    def __init__(self, *, comment: str | None = "", rows: int = 100, copied: int = 100) -> None:
+        self.comment = comment
+        self.rows = rows
+        self.copied = copied
+        self.views = {ROLLUPS[0].view_name}
+        self.statements: list[str] = []
+
+    def execute(self, sql: str, params: dict[str, Any] | None = None) -> list[tuple[Any, ...]]:
+        self.statements.append(sql)
+        if sql.startswith("SELECT comment"):
+            return [] if self.comment is None else [(self.comment,)]
+        if sql.startswith("SELECT count()"):
+            return [(self.copied if "__" in sql else self.rows,)]
+        if sql.startswith("EXISTS TABLE"):
+            return [(int(sql.rpartition(".")[2] in self.views),)]
+        return []
+
+    def writes(self) -> list[str]:
+        return [sql for sql in self.statements if not sql.startswith(("SELECT", "EXISTS"))]
+
+
+def test_basic_layout_keeps_the_original_ddl() -> None:
+    ddl = build_create_table_statement("marketing")
+
+    assert ddl.startswith("CREATE TABLE IF NOT EXISTS marketing.ad_performance (\n    date Date,")
+    assert ddl.endswith(
+        "ENGINE = MergeTree()\n"
+        "ORDER BY (source, date, campaign_id)\n"
+        "PRIMARY KEY (source, date, campaign_id)\n"
+    )
+    assert "CODEC" not in ddl and "COMMENT" not in ddl
+
+
+def test_compact_layout_adds_types_codecs_partitions_and_indexes() -> None:
+    ddl = build_create_table_statement("marketing", layout="compact")
+
+    assert "source LowCardinality(String)," in ddl
+    assert "country LowCardinality(String)," in ddl
+    assert "date Date CODEC(DoubleDelta, ZSTD(1))," in ddl
+    assert "clicks UInt32 CODEC(T64, ZSTD(1))," in ddl
+    assert "INDEX idx_campaign_name campaign_name TYPE bloom_filter(0.01) GRANULARITY 4" in ddl
+    assert "INDEX idx_country country TYPE set(256) GRANULARITY 4" in ddl
+    assert "PARTITION BY toYYYYMM(date)\n" in ddl
+    assert "SAMPLE BY" not in ddl
+    assert ddl.endswith("COMMENT 'layout:compact'\n")
+
+
+def test_sampled_layout_puts_the_sampling_expression_in_the_key() -> None:
+    ddl = build_create_table_statement("marketing", layout="sampled", table="copy")
+
+    assert ddl.startswith("CREATE TABLE IF NOT EXISTS marketing.copy (")
+    assert "ORDER BY (source, date, intHash32(campaign_id))\n" in ddl
+    assert "SAMPLE BY intHash32(campaign_id)\n" in ddl
+
+
+@pytest.mark.parametrize(
+    ("comment", "expected"),
+    [(None, None), ("", "basic"), ("owned by analytics", "basic"), ("layout:sampled", "sampled")],
+)
+def test_current_layout_reads_the_table_comment(comment: str | None, expected: str | None) -> None:
+    assert current_layout(FakeClickHouse(comment=comment).execute, "marketing") == expected
+
+
+def test_migration_copies_verifies_and_swaps_the_table() -> None:
+    clickhouse = FakeClickHouse()
+
+    migration = migrate_table_layout(clickhouse.execute, database="marketing", layout="compact")
+
+    assert (migration.source, migration.target, migration.rows) == ("basic", "compact", 100)
+    writes = [sql.split(" (")[0] for sql in clickhouse.writes()]
+    view = ROLLUPS[0].view_name
+    assert writes == [
+        "DROP TABLE IF EXISTS marketing.ad_performance__compact",
+        "CREATE TABLE IF NOT EXISTS marketing.ad_performance__compact",
+        "INSERT INTO marketing.ad_performance__compact SELECT * FROM marketing.ad_performance",
+        "EXCHANGE TABLES marketing.ad_performance AND marketing.ad_performance__compact",
+        f"DROP VIEW marketing.{view}",
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS marketing.{view} TO "
+        f"marketing.{ROLLUPS[0].name} AS SELECT date, source, sum(impressions) AS impressions, "
+        "sum(clicks) AS clicks, sum(spend) AS spend, sum(conversions) AS conversions, "
+        "sum(revenue) AS revenue, count() AS row_count FROM marketing.ad_performance "
+        "GROUP BY date, source",
+        "DROP TABLE marketing.ad_performance__compact",
+    ]
+
+
+def test_migration_can_keep_the_old_table() -> None:
+    clickhouse = FakeClickHouse(comment="layout:compact")
+
+    migration = migrate_table_layout(
+        clickhouse.execute, database="marketing", layout="basic", keep_backup=True
+    )
+
+    assert migration.backup == "ad_performance__backup_compact"
+    assert clickhouse.statements[-1] == (
+        "RENAME TABLE marketing.ad_performance__basic TO marketing.ad_performance__backup_compact"
+    )
+
+
+def test_migration_to_the_current_layout_is_a_no_op() -> None:
+    clickhouse = FakeClickHouse(comment="layout:sampled")
+
+    migration = migrate_table_layout(clickhouse.execute, database="marketing", layout="sampled")
+
+    assert not migration.changed
+    assert all(sql.startswith("SELECT") for sql in clickhouse.statements)
+
+
+def test_migration_aborts_when_rows_go_missing() -> None:
+    clickhouse = FakeClickHouse(copied=90)
+
+    with pytest.raises(LayoutMigrationError):
+        migrate_table_layout(clickhouse.execute, database="marketing", layout="compact")
+
+    assert not any(sql.startswith("EXCHANGE") for sql in clickhouse.statements)
+    assert clickhouse.statements[-1] == "DROP TABLE IF EXISTS marketing.ad_performance__compact"
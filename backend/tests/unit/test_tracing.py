@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from app.domain.services.orchestrator import QueryOrchestrator
+from app.infra.cache.client import RedisCache
+from app.infra.config import Settings
+from app.infra.tracing import (
+    NOOP_SPAN,
+    InMemoryExporter,
+    JsonFileExporter,
+    Tracer,
+    current_span,
+    span,
+    start_span,
+)
+from tests.fakes import FakeRedis
+
+
+@pytest.fixture
+def tracer() -> Iterator[Tracer]:
+    yield Tracer()
+
+
+def test_spans_nest_under_the_trace_and_export_root_last(tracer: Tracer) -> None:
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+
+    async def _request() -> None:
+        with tracer.start_trace("http.request", "req-1", path="/query") as root:
+            with span("orchestrator.sql_llm", prompt_chars=10) as llm:
+                llm.set(completion_chars=42)
+                with span("llm.generate"):
+                    await asyncio.sleep(0)
+            assert current_span() is root
+
+    asyncio.run(_request())
+
+    [trace] = exporter.traces
+    assert [s.name for s in trace] == ["llm.generate", "orchestrator.sql_llm", "http.request"]
+    generate, llm, root = trace
+    assert {s.trace_id for s in trace} == {"req-1"}
+    assert generate.parent_id == llm.span_id
+    assert llm.parent_id == root.span_id
+    assert llm.attributes == {"prompt_chars": 10, "completion_chars": 42}
+    assert root.duration_ms >= llm.duration_ms
+
+
+def test_errors_are_recorded_on_the_failing_span(tracer: Tracer) -> None:
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+
+    with pytest.raises(RuntimeError):
+        with tracer.start_trace("http.request", "req-2"):
+            with span("clickhouse.query"):
+                raise RuntimeError("boom")
+
+    query, root = exporter.traces[0]
+    assert query.status == "error"
+    assert query.error == "RuntimeError: boom"
+    assert root.status == "error"
+
+
+def test_spans_are_noops_without_an_active_trace(tracer: Tracer) -> None:
+    with span("cache.read") as read_span:
+        read_span.set(tier="l1")
+    assert read_span is NOOP_SPAN
+    assert NOOP_SPAN.attributes == {}
+
+    with tracer.start_trace("http.request", "req-3") as root:
+        assert root is NOOP_SPAN
+
+
+def test_spans_share_one_noop_context_until_tracing_is_configured(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(Tracer, "configured", False)
+
+    assert span("cache.read") is span("orchestrator.run", question_chars=3)
+    with span("cache.read") as read_span:
+        assert read_span is NOOP_SPAN
+    assert start_span("llm.stream") is NOOP_SPAN
+
+    Tracer().configure(InMemoryExporter())
+
+    assert Tracer.configured
+
+
+def test_detached_spans_ending_after_the_root_are_exported_alone(tracer: Tracer) -> None:
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+
+    with tracer.start_trace("http.request", "req-4"):
+        stream = start_span("llm.stream")
+        assert current_span() is not stream
+    stream.end()
+
+    assert [[s.name for s in trace] for trace in exporter.traces] == [
+        ["http.request"],
+        ["llm.stream"],
+    ]
+
+
+class StaticLLM:
+    async def generate_text(self, prompt: str, *, temperature: float | None = None) -> str:
+        return "SELECT sum(spend) AS spend FROM ad_performance"
+
+
+class FailingClickHouse:
+    database = "default"
+
+    async def query_columnar(self, sql: str) -> dict[str, Any]:
+        raise RuntimeError("clickhouse down")
+
+
+def test_stream_span_ends_when_the_stream_fails_or_is_closed(
+    tracer: Tracer, make_settings: Callable[..., Settings], redis: FakeRedis
+) -> None:
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+    settings = make_settings()
+    orchestrator = QueryOrchestrator(
+        settings=settings,
+        llm_client=StaticLLM(),  # type: ignore[arg-type]
+        clickhouse=FailingClickHouse(),  # type: ignore[arg-type]
+        cache=RedisCache(redis, settings),  # type: ignore[arg-type]
+    )
+
+    async def _consume(request_id: str, *, close_after_sql: bool) -> None:
+        with tracer.start_trace("http.request", request_id):
+            stream = orchestrator.stream(question="Total spend", user_id=None)
+            async for event, _ in stream:
+                if close_after_sql and event == "sql":
+                    await stream.aclose()
+                    return
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_consume("req-6", close_after_sql=False))
+    asyncio.run(_consume("req-7", close_after_sql=True))
+
+    streams = [s for trace in exporter.traces for s in trace if s.name == "orchestrator.stream"]
+    failed, closed = streams
+    assert (failed.trace_id, failed.status, failed.error) == (
+        "req-6",
+        "error",
+        "RuntimeError: clickhouse down",
+    )
+    assert closed.trace_id == "req-7" and closed.status == "error"
+    assert failed.duration_ms is not None and closed.duration_ms is not None
+
+
+def test_fast_traces_are_skipped_and_file_exporter_writes_json_lines(
+    tracer: Tracer, tmp_path: Path
+) -> None:
+    path = tmp_path / "traces.jsonl"
+    tracer.configure(JsonFileExporter(path), min_duration_ms=10_000)
+    with tracer.start_trace("http.request", "fast"):
+        pass
+    assert not path.exists()
+
+    tracer.configure(JsonFileExporter(path))
+    with tracer.start_trace("http.request", "slow"):
+        with span("cache.read", tier="redis"):
+            pass
+
+    [line] = path.read_text(encoding="utf-8").splitlines()
+    payload = json.loads(line)
+    assert payload["trace_id"] == "slow"
+    assert [s["name"] for s in payload["spans"]] == ["cache.read", "http.request"]
+    assert payload["spans"][0]["attributes"] == {"tier": "redis"}